@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the latency of sequential CoAP Property reads against a local aiocoap
+server started in a child process. Compares creating and shutting down a client
+context for each request with the client context shared by all the requests.
+
+Usage: python benchmarks/coap_read_latency.py [NUM_READS]
+"""
+
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+
+import aiocoap
+import aiocoap.resource
+
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.protocols.coap.client import CoAPClient
+from wotpy.wot.td import ThingDescription
+
+PORT = 15683
+THING_NAME = "bench"
+PROP_NAME = "temperature"
+
+TD_DOC = {
+    "@context": "https://www.w3.org/2019/wot/td/v1",
+    "id": "urn:wotpy:bench",
+    "title": THING_NAME,
+    "security": ["nosec_sc"],
+    "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+    "forms": [{
+        "href": "coap://127.0.0.1:{}/properties?thing={}".format(PORT, THING_NAME),
+        "op": ["readallproperties"]
+    }],
+    "properties": {
+        PROP_NAME: {
+            "type": "number",
+            "forms": [{
+                "href": "coap://127.0.0.1:{}/property?thing={}&name={}".format(PORT, THING_NAME, PROP_NAME),
+                "op": ["readproperty"],
+                "contentType": "application/json"
+            }]
+        }
+    }
+}
+
+
+class PropertyResource(aiocoap.resource.Resource):
+    """Resource that returns a constant Property value."""
+
+    async def render_get(self, request):
+        return aiocoap.Message(payload=JSON_CODEC.to_bytes({"value": 21.5}))
+
+
+class PerRequestContextClient(CoAPClient):
+    """CoAP client that shuts down its context after each request."""
+
+    async def read_property(self, td, name, timeout=None):
+        try:
+            return await super().read_property(td, name, timeout=timeout)
+        finally:
+            await self.close()
+
+
+def run_server(ready):
+    """Runs the aiocoap server until the process is terminated."""
+
+    async def serve():
+        site = aiocoap.resource.Site()
+        site.add_resource(["property"], PropertyResource())
+        await aiocoap.Context.create_server_context(site, bind=("127.0.0.1", PORT))
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def measure(client, td, num_reads):
+    """Returns the list of latencies in milliseconds of sequential Property reads."""
+
+    await client.read_property(td, PROP_NAME)
+
+    latencies = []
+
+    for _ in range(num_reads):
+        ini = time.perf_counter()
+        await client.read_property(td, PROP_NAME)
+        latencies.append((time.perf_counter() - ini) * 1e3)
+
+    await client.close()
+
+    return latencies
+
+
+async def run(num_reads):
+    """Prints the read latency with a context per request and with a shared context."""
+
+    td = ThingDescription(TD_DOC)
+
+    clients = [
+        ("per-request", PerRequestContextClient()),
+        ("shared", CoAPClient())
+    ]
+
+    baseline = None
+
+    for name, client in clients:
+        latencies = await measure(client, td, num_reads)
+        mean = statistics.mean(latencies)
+        p99 = sorted(latencies)[int(len(latencies) * 0.99) - 1]
+        baseline = baseline or mean
+
+        print("{:<11} :: mean {:7.3f} ms :: p99 {:7.3f} ms :: {:5.2f}x".format(
+            name, mean, p99, baseline / mean))
+
+
+def main():
+    num_reads = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    ready = multiprocessing.Event()
+    server_process = multiprocessing.Process(target=run_server, args=(ready,), daemon=True)
+    server_process.start()
+
+    try:
+        ready.wait(timeout=30)
+        asyncio.run(run(num_reads))
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+
+if __name__ == "__main__":
+    main()
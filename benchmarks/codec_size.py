@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the payload size and the encode/decode time
+of the JSON and CBOR codecs for typical Interaction payloads.
+
+Usage: python benchmarks/codec_size.py [NUMBER]
+"""
+
+import sys
+import timeit
+
+from wotpy.codecs.cbor_codec import CborCodec, cbor_available
+from wotpy.codecs.json_codec import JSON_CODEC
+
+PAYLOADS = {
+    "property": {"value": 21.5},
+    "action": {
+        "input": {
+            "drinkId": "latte", "size": "l", "quantity": 2,
+            "options": ["sugar", "cinnamon"], "meta": {"user": "alice", "priority": 3}
+        }
+    },
+    "event": {
+        "name": "outOfResource",
+        "data": {"resource": "milk", "levels": {"water": 72.5, "milk": 4.0, "coffeeBeans": 90.0}},
+        "time": 1700000000000
+    },
+    "samples": {
+        "value": {
+            "timestamp": 1700000000000,
+            "period": 10,
+            "samples": [round(20.0 + (idx % 37) * 0.137, 3) for idx in range(256)]
+        }
+    }
+}
+
+
+def measure(codec, value, number):
+    """Returns the encoded size in bytes and the mean encode and decode times in microseconds."""
+
+    encoded = codec.to_bytes(value)
+    encode_us = timeit.timeit(lambda: codec.to_bytes(value), number=number) / number * 1e6
+    decode_us = timeit.timeit(lambda: codec.to_value(encoded), number=number) / number * 1e6
+
+    return len(encoded), encode_us, decode_us
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    codecs = [("json", JSON_CODEC)]
+
+    if cbor_available():
+        codecs.append(("cbor", CborCodec()))
+    else:
+        print("cbor :: skipped (cbor2 is not installed)")
+
+    for name, value in PAYLOADS.items():
+        for codec_name, codec in codecs:
+            size, encode_us, decode_us = measure(codec, value, number)
+
+            print("{:<9} :: {:<4} :: {:6d} bytes :: encode {:8.2f} us :: decode {:8.2f} us".format(
+                name, codec_name, size, encode_us, decode_us))
+
+
+if __name__ == "__main__":
+    main()
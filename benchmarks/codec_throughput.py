@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark of the per-request cost of the JSON codec backends.
+Each request decodes a request body and encodes a response body
+with the same shapes that are used by the protocol bindings.
+
+Usage: python benchmarks/codec_throughput.py [NUMBER]
+"""
+
+import importlib.util
+import sys
+import timeit
+
+from wotpy.codecs.enums import JsonBackends
+from wotpy.codecs.json_codec import JsonCodec
+
+REQUEST_BODY = (
+    b'{"input": {"drinkId": "latte", "size": "l", "quantity": 2, '
+    b'"options": ["sugar", "cinnamon"], "meta": {"user": "alice", "priority": 3}}}'
+)
+
+RESPONSE_VALUE = {
+    "result": {
+        "result": True,
+        "message": "Your latte is in progress!",
+        "levels": {"water": 72.5, "milk": 41.0, "chocolate": 18.25, "coffeeBeans": 90.0},
+        "history": [{"drink": "espresso", "timestamp": 1700000000000 + idx} for idx in range(10)]
+    }
+}
+
+
+def measure(codec, number):
+    """Returns the mean time in microseconds to decode a request and encode a response."""
+
+    def request():
+        codec.to_value(REQUEST_BODY).get("input")
+        codec.to_bytes(RESPONSE_VALUE)
+
+    return timeit.timeit(request, number=number) / number * 1e6
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    baseline = measure(JsonCodec(backend=JsonBackends.STDLIB), number)
+
+    for backend in JsonBackends.list():
+        if backend != JsonBackends.STDLIB and importlib.util.find_spec(backend) is None:
+            print("{:<8} :: skipped (not installed)".format(backend))
+            continue
+
+        elapsed = baseline if backend == JsonBackends.STDLIB else measure(JsonCodec(backend=backend), number)
+
+        print("{:<8} :: {:8.2f} us/request :: {:5.2f}x".format(backend, elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
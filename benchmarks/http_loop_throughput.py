@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the HTTP Property read throughput of a Servient running
+on the default asyncio event loop and on uvloop (when available).
+
+Usage: python benchmarks/http_loop_throughput.py [NUM_REQUESTS] [CONCURRENCY]
+"""
+
+import asyncio
+import sys
+import time
+
+import tornado.httpclient
+
+from wotpy.cli.cli import build_event_loop
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.wot.servient import Servient
+from wotpy.wot.td import ThingDescription
+
+PORT = 18081
+
+TD = {
+    "id": "urn:bench:loop",
+    "title": "bench-loop",
+    "properties": {
+        "temperature": {"type": "number"}
+    }
+}
+
+
+async def measure(num_requests, concurrency):
+    """Starts a Servient and returns the Property reads per second served over HTTP."""
+
+    servient = Servient(
+        hostname="localhost", catalogue_port=None,
+        sqlite_db_path=":memory:", init_logging=False)
+
+    servient.add_server(HTTPServer(port=PORT))
+    wot = await servient.start()
+
+    exposed_thing = wot.produce(ThingDescription(TD).to_str())
+    exposed_thing.expose()
+    await exposed_thing.write_property("temperature", 21.5)
+
+    url = "http://localhost:{}/{}/property/temperature".format(PORT, exposed_thing.thing.url_name)
+    http_client = tornado.httpclient.AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    queue = list(range(num_requests))
+
+    async def worker():
+        while queue:
+            queue.pop()
+            await http_client.fetch(url)
+
+    ini = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - ini
+
+    http_client.close()
+    await servient.shutdown()
+
+    return num_requests / elapsed
+
+
+def main():
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    for name, use_uvloop in [("asyncio", False), ("uvloop", True)]:
+        loop = build_event_loop(use_uvloop=use_uvloop)
+        loop_name = type(loop).__module__.split(".")[0]
+
+        if use_uvloop and loop_name != "uvloop":
+            print("{:<8} :: skipped (uvloop is not installed)".format(name))
+            loop.close()
+            continue
+
+        reads_sec = loop.run_until_complete(measure(num_requests, concurrency))
+        loop.close()
+
+        print("{:<8} :: {:10.1f} reads/s".format(name, reads_sec))
+
+
+if __name__ == "__main__":
+    main()
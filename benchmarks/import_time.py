@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the import time of the main WoTPy entrypoints.
+Each module is imported in a fresh interpreter. The script exits with an
+error code if any of the optional heavy dependencies is imported eagerly.
+
+Usage: python benchmarks/import_time.py [REPEAT]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "wotpy.wot.servient",
+    "wotpy.cli.cli",
+    "wotpy.cli.default_servient"
+]
+
+HEAVY_MODULES = [
+    "influxdb_client",
+    "pandas",
+    "pmdarima",
+    "aiocoap",
+    "amqtt",
+    "oauthlib"
+]
+
+SNIPPET = """
+import json, sys, time
+ini = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - ini
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module):
+    """Imports the given module in a subprocess and returns the elapsed time and loaded heavy modules."""
+
+    code = SNIPPET.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, "-c", code])
+
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+
+    for module in MODULES:
+        results = [measure(module) for _ in range(repeat)]
+        median = statistics.median(item["elapsed"] for item in results)
+        heavy = sorted(set(name for item in results for name in item["heavy"]))
+        failed = failed or bool(heavy)
+
+        print("{:<30} :: {:8.1f} ms :: eager heavy imports: {}".format(
+            module, median * 1000, ", ".join(heavy) if heavy else "none"))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
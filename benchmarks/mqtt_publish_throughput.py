@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the QoS 1 publication throughput of an MQTT broker connection
+against a local amqtt broker started in a child process. A single publication
+in flight is equivalent to serializing all publications behind a lock.
+
+Usage: python benchmarks/mqtt_publish_throughput.py [NUM_MESSAGES] [MAX_INFLIGHT...]
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import time
+
+from amqtt.broker import Broker
+from amqtt.mqtt.constants import QOS_1
+
+from wotpy.protocols.mqtt.client import MQTTClient
+from wotpy.protocols.mqtt.connection import MQTTBrokerConnection
+
+PORT = 18883
+BROKER_URL = "mqtt://127.0.0.1:{}".format(PORT)
+
+BROKER_CONFIG = {
+    "listeners": {
+        "default": {
+            "type": "tcp",
+            "bind": "127.0.0.1:{}".format(PORT)
+        }
+    },
+    "sys_interval": 0,
+    "auth": {
+        "allow-anonymous": True
+    },
+    "topic-check": {
+        "enabled": False
+    }
+}
+
+PAYLOAD = b'{"value": 21.5}'
+
+
+async def measure(num_messages, max_inflight):
+    """Returns the QoS 1 publications per second with the given number of publications in flight."""
+
+    connection = MQTTBrokerConnection(
+        BROKER_URL, dict(MQTTClient.DEFAULT_CLIENT_CONFIG, auto_reconnect=False),
+        max_inflight=max_inflight)
+
+    await connection.connect()
+
+    ini = time.perf_counter()
+
+    await asyncio.gather(*[
+        connection.publish("bench/publish/{}".format(idx % 10), PAYLOAD, QOS_1)
+        for idx in range(num_messages)
+    ])
+
+    elapsed = time.perf_counter() - ini
+
+    await connection.close()
+
+    return num_messages / elapsed
+
+
+def run_broker(ready):
+    """Runs the amqtt broker until the process is terminated."""
+
+    async def serve():
+        broker = Broker(BROKER_CONFIG)
+        await broker.start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def run(num_messages, inflight_values):
+    """Prints the publication throughput for each number of publications in flight."""
+
+    baseline = None
+
+    for max_inflight in inflight_values:
+        msgs_sec = await measure(num_messages, max_inflight)
+        baseline = baseline or msgs_sec
+
+        print("inflight={:<4} :: {:10.1f} msg/s :: {:5.2f}x".format(
+            max_inflight, msgs_sec, msgs_sec / baseline))
+
+
+def main():
+    num_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    inflight_values = [int(item) for item in sys.argv[2:]] or [1, 8, 32, 128]
+
+    ready = multiprocessing.Event()
+    broker_process = multiprocessing.Process(target=run_broker, args=(ready,), daemon=True)
+    broker_process.start()
+
+    try:
+        ready.wait(timeout=30)
+        asyncio.run(run(num_messages, inflight_values))
+    finally:
+        broker_process.terminate()
+        broker_process.join()
+
+
+if __name__ == "__main__":
+    main()
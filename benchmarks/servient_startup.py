@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the time it takes to produce and expose a large number
+of Things in a Servient, and to retrieve their TDs afterwards.
+
+Usage: python benchmarks/servient_startup.py [NUM_THINGS ...]
+"""
+
+import sys
+import time
+
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.wot.servient import Servient
+from wotpy.wot.td import ThingDescription
+from wotpy.wot.wot import WoT
+
+DEFAULT_SIZES = [1000, 5000, 10000]
+
+
+def build_td(idx):
+    """Returns a TD document with a few interactions for the Thing with the given index."""
+
+    return {
+        "id": "urn:bench:thing:{}".format(idx),
+        "title": "bench-thing-{}".format(idx),
+        "properties": {
+            "temperature": {"type": "number", "observable": True},
+            "status": {"type": "string"}
+        },
+        "actions": {
+            "reset": {"input": {"type": "boolean"}}
+        },
+        "events": {
+            "alarm": {"data": {"type": "string"}}
+        }
+    }
+
+
+def run(num_things):
+    """Exposes the given number of Things and returns the elapsed times."""
+
+    servient = Servient(
+        hostname="localhost", catalogue_port=None,
+        sqlite_db_path=":memory:", init_logging=False)
+
+    servient.add_server(HTTPServer(port=18080))
+    wot = WoT(servient=servient)
+
+    ini = time.perf_counter()
+
+    for idx in range(num_things):
+        exposed_thing = wot.produce(ThingDescription(build_td(idx)).to_str())
+        exposed_thing.expose()
+
+    time_expose = time.perf_counter() - ini
+    ini = time.perf_counter()
+
+    for exposed_thing in servient.enabled_exposed_things:
+        exposed_thing.thing.thing_fragment
+
+    time_forms = time.perf_counter() - ini
+
+    return time_expose, time_forms
+
+
+def main():
+    sizes = [int(item) for item in sys.argv[1:]] or DEFAULT_SIZES
+
+    for num_things in sizes:
+        time_expose, time_forms = run(num_things)
+        print("{:>6} things :: expose {:8.3f} s :: first TD build {:8.3f} s".format(
+            num_things, time_expose, time_forms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the rate of TLS connections served by the HTTPS server
+with full handshakes and with resumed sessions (session tickets).
+A self-signed certificate is generated with the openssl command.
+
+Usage: python benchmarks/tls_handshake_rate.py [NUM_CONNECTIONS]
+"""
+
+import asyncio
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.protocols.http.tls import build_server_ssl_context, session_stats
+
+PORT = 18443
+
+REQUEST = b"GET /bench/property/none HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+
+def generate_certificate(path):
+    """Generates a self-signed certificate and returns the paths of the certificate and key."""
+
+    certfile = os.path.join(path, "cert.pem")
+    keyfile = os.path.join(path, "key.pem")
+
+    subprocess.check_call([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+        "-subj", "/CN=localhost", "-keyout", keyfile, "-out", certfile
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return certfile, keyfile
+
+
+def start_server(ssl_context):
+    """Starts the HTTPS server on an event loop running in a background thread."""
+
+    loop = asyncio.new_event_loop()
+    server = HTTPServer(port=PORT, ssl_context=ssl_context)
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return stop
+
+
+def measure(num_connections, resume):
+    """Opens the given number of HTTPS connections and returns
+    the connections per second and the number of resumed sessions."""
+
+    client_context = ssl.create_default_context()
+    client_context.check_hostname = False
+    client_context.verify_mode = ssl.CERT_NONE
+
+    session = None
+    reused = 0
+
+    ini = time.perf_counter()
+
+    for _ in range(num_connections):
+        with socket.create_connection(("localhost", PORT)) as sock:
+            with client_context.wrap_socket(sock, server_hostname="localhost", session=session) as tls_sock:
+                tls_sock.sendall(REQUEST)
+
+                while tls_sock.recv(4096):
+                    pass
+
+                reused += int(tls_sock.session_reused)
+                session = tls_sock.session if resume else None
+
+    return num_connections / (time.perf_counter() - ini), reused
+
+
+def main():
+    num_connections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as path:
+        certfile, keyfile = generate_certificate(path)
+
+        for name, session_tickets in [("full", False), ("resumed", True)]:
+            ssl_context = build_server_ssl_context(certfile, keyfile, session_tickets=session_tickets)
+            stop = start_server(ssl_context)
+
+            try:
+                rate, reused = measure(num_connections, resume=session_tickets)
+            finally:
+                stop()
+
+            print("{:<8} :: {:8.1f} connections/s :: client resumed {:5d} :: server {}".format(
+                name, rate, reused, session_stats(ssl_context)))
+
+
+if __name__ == "__main__":
+    main()
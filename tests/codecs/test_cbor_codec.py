@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import socket
+
+import pytest
+import tornado.httpclient
+
+from wotpy.codecs.cbor_codec import CborCodec
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.utils import default_codecs, parse_accept
+from wotpy.protocols.coap.enums import CoAPContentFormats
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.wot.form import Form
+from wotpy.wot.servient import Servient
+
+cbor2 = pytest.importorskip("cbor2")
+
+THING_MODEL = {
+    "@context": "https://www.w3.org/2019/wot/td/v1",
+    "id": "urn:wotpy:cbor-thing",
+    "title": "CBOR Thing",
+    "security": ["nosec_sc"],
+    "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+    "forms": [{"href": "http://localhost/cbor-thing", "op": ["readallproperties"]}],
+    "properties": {
+        "temperature": {"type": "number", "forms": [{"href": "http://localhost/cbor-thing/temperature"}]}
+    }
+}
+
+
+def test_round_trip():
+    """Values are encoded to CBOR and decoded back unchanged."""
+
+    codec = CborCodec()
+    value = {"value": 21.5, "items": [1, "two", None, True], "raw": b"\x00\x01"}
+
+    assert codec.to_value(codec.to_bytes(value)) == value
+    assert cbor2.loads(codec.to_bytes(value)) == value
+
+
+def test_text_content_rejected():
+    """Text strings are not valid CBOR content."""
+
+    with pytest.raises(ValueError):
+        CborCodec().to_value("{}")
+
+
+def test_default_codecs():
+    """The CBOR codec is registered by default when cbor2 is installed."""
+
+    assert any(MediaTypes.CBOR in codec.media_types for codec in default_codecs())
+
+
+def test_server_negotiation():
+    """Servers pick the first accepted structured media type and default to JSON."""
+
+    server = HTTPServer(port=0)
+
+    assert server.structured_media_types == [MediaTypes.JSON, MediaTypes.CBOR]
+    assert server.negotiate_codec(parse_accept("application/json;q=0.5, application/cbor")).media_types == [MediaTypes.CBOR]
+    assert server.negotiate_codec(parse_accept("application/cbor;q=0.5, application/json")).media_types == [MediaTypes.JSON]
+    assert server.negotiate_codec(parse_accept("application/xml")).media_types == [MediaTypes.JSON]
+    assert server.negotiate_codec([]).media_types == [MediaTypes.JSON]
+
+
+def test_media_type_forms():
+    """A CBOR copy of each JSON Form is advertised."""
+
+    server = HTTPServer(port=0)
+    form = Form(interaction=None, protocol=server.protocol, href="http://localhost/thing", contentType=MediaTypes.JSON)
+
+    forms = server.add_media_type_forms([form])
+
+    assert [item.content_type for item in forms] == [MediaTypes.JSON, MediaTypes.CBOR]
+    assert forms[1].href == form.href
+
+
+def test_coap_content_format():
+    """CBOR maps to its CoAP Content-Format number."""
+
+    assert CoAPContentFormats.from_media_type(MediaTypes.CBOR) == CoAPContentFormats.CBOR
+    assert CoAPContentFormats.to_media_type(CoAPContentFormats.CBOR) == MediaTypes.CBOR
+
+
+def test_http_read_negotiated(tmp_path):
+    """HTTP Property reads are encoded with the media type in the Accept header."""
+
+    async def run():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        servient = Servient(
+            hostname="127.0.0.1", catalogue_port=None, init_logging=False,
+            sqlite_db_path=str(tmp_path / "vo.db"))
+        servient.add_server(HTTPServer(port=port))
+        wot = await servient.start()
+
+        exposed_thing = wot.produce(json.dumps(THING_MODEL))
+        exposed_thing.expose()
+        await exposed_thing.write_property("temperature", 21.5)
+
+        url = "http://127.0.0.1:{}/{}/property/temperature".format(port, exposed_thing.thing.url_name)
+        http_client = tornado.httpclient.AsyncHTTPClient()
+
+        try:
+            response = await http_client.fetch(url, headers={"Accept": MediaTypes.CBOR})
+
+            assert response.headers["Content-Type"] == MediaTypes.CBOR
+            assert cbor2.loads(response.body) == {"value": 21.5}
+
+            response = await http_client.fetch(url, headers={"Accept": MediaTypes.JSON})
+
+            assert response.headers["Content-Type"].startswith(MediaTypes.JSON)
+            assert json.loads(response.body) == {"value": 21.5}
+        finally:
+            await servient.shutdown()
+
+    asyncio.run(run())
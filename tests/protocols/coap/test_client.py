@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import aiocoap
+import aiocoap.resource
+import pytest
+
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.protocols.coap.client import CoAPClient
+from wotpy.protocols.exceptions import ClientRequestTimeout
+from wotpy.wot.td import ThingDescription
+
+PORT = 15684
+THING_NAME = "thing"
+
+
+def build_td(prop_names):
+    """Returns a Thing Description with a CoAP form for each Property."""
+
+    def form(name):
+        return {
+            "href": "coap://127.0.0.1:{}/{}".format(PORT, name),
+            "op": ["readproperty", "writeproperty"],
+            "contentType": "application/json"
+        }
+
+    return ThingDescription({
+        "@context": "https://www.w3.org/2019/wot/td/v1",
+        "id": "urn:wotpy:{}".format(THING_NAME),
+        "title": THING_NAME,
+        "security": ["nosec_sc"],
+        "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+        "forms": [{
+            "href": "coap://127.0.0.1:{}/properties".format(PORT),
+            "op": ["readallproperties"]
+        }],
+        "properties": {name: {"type": "number", "forms": [form(name)]} for name in prop_names}
+    })
+
+
+class ValueResource(aiocoap.resource.Resource):
+    """Resource that returns a constant Property value."""
+
+    async def render_get(self, request):
+        return aiocoap.Message(payload=JSON_CODEC.to_bytes({"value": 21.5}))
+
+
+class SilentResource(aiocoap.resource.Resource):
+    """Resource that counts the requests and never responds to them."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    async def render_get(self, request):
+        self.requests += 1
+        await asyncio.Event().wait()
+
+
+def run_with_server(test_coro):
+    """Runs the test coroutine with a CoAP server and a client."""
+
+    async def run():
+        silent = SilentResource()
+        site = aiocoap.resource.Site()
+        site.add_resource(["value"], ValueResource())
+        site.add_resource(["silent"], silent)
+        server = await aiocoap.Context.create_server_context(site, bind=("127.0.0.1", PORT))
+        client = CoAPClient()
+
+        try:
+            await test_coro(client, silent)
+        finally:
+            await client.close()
+            await server.shutdown()
+
+    asyncio.run(run())
+
+
+def test_timeout_keeps_context():
+    """Request timeouts do not recreate the shared client context."""
+
+    async def test(client, silent):
+        td = build_td(["value", "silent"])
+
+        assert await client.read_property(td, "value") == 21.5
+        context = client._coap_client
+
+        with pytest.raises(ClientRequestTimeout):
+            await client.read_property(td, "silent", timeout=0.3)
+
+        assert silent.requests == 1
+        assert await client.read_property(td, "value") == 21.5
+        assert client._coap_client is context
+
+    run_with_server(test)
+
+
+def test_library_shutdown_resets_context():
+    """A client context that has been shut down is replaced on the next request."""
+
+    async def test(client, silent):
+        td = build_td(["value"])
+
+        assert await client.read_property(td, "value") == 21.5
+        context = client._coap_client
+        await context.shutdown()
+
+        with pytest.raises(Exception):
+            await client.read_property(td, "value", timeout=1)
+
+        assert await client.read_property(td, "value") == 21.5
+        assert client._coap_client is not context
+
+    run_with_server(test)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import socket
+
+from wotpy.protocols.enums import InteractionVerbs
+from wotpy.protocols.http.client import HTTPClient
+from wotpy.protocols.http.enums import HTTPClientBackends, HTTPSubprotocols
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.wot.consumed.thing import ConsumedThing
+from wotpy.wot.servient import Servient
+from wotpy.wot.td import ThingDescription
+
+THING_MODEL = {
+    "@context": "https://www.w3.org/2019/wot/td/v1",
+    "id": "urn:wotpy:batch-thing",
+    "title": "Batch Thing",
+    "security": ["nosec_sc"],
+    "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+    "forms": [{"href": "http://localhost/batch-thing", "op": ["readallproperties"]}],
+    "properties": {
+        "temperature": {"type": "number", "forms": [{"href": "http://localhost/batch-thing/temperature"}]},
+        "humidity": {"type": "number", "forms": [{"href": "http://localhost/batch-thing/humidity"}]}
+    },
+    "actions": {
+        "double": {"forms": [{"href": "http://localhost/batch-thing/double"}]}
+    }
+}
+
+
+def run_with_thing(test_coro, db_path):
+    """Runs the test coroutine with a servient that exposes a Thing through an HTTP server."""
+
+    async def run():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        servient = Servient(
+            hostname="127.0.0.1", catalogue_port=None, init_logging=False,
+            clients=[HTTPClient(backend=HTTPClientBackends.SIMPLE)],
+            sqlite_db_path=str(db_path))
+        servient.add_server(HTTPServer(port=port))
+        wot = await servient.start()
+
+        exposed_thing = wot.produce(json.dumps(THING_MODEL))
+
+        async def double(parameters):
+            return parameters["input"] * 2
+
+        exposed_thing.set_action_handler("double", double)
+        exposed_thing.expose()
+
+        await exposed_thing.write_property("temperature", 20)
+        await exposed_thing.write_property("humidity", 60)
+
+        try:
+            await test_coro(servient, exposed_thing)
+        finally:
+            await servient.shutdown()
+
+    asyncio.run(run())
+
+
+def test_batch_form(tmp_path):
+    """The batch resource is advertised in a Thing-level Form with the batch subprotocol."""
+
+    async def test(servient, exposed_thing):
+        forms = [
+            form for form in exposed_thing.thing.autogenerated_forms
+            if form.subprotocol == HTTPSubprotocols.BATCH
+        ]
+
+        assert len(forms) == 1
+        assert forms[0].href.endswith("/batch-thing/batch")
+
+    run_with_thing(test, tmp_path / "vo.db")
+
+
+def test_batch_mixed_operations(tmp_path):
+    """A single batch runs reads, writes and Action invocations, returning a document for each one."""
+
+    async def test(servient, exposed_thing):
+        td = ThingDescription.from_thing(exposed_thing.thing)
+        consumed_thing = ConsumedThing(servient=servient, td=td)
+
+        assert HTTPClient.pick_http_batch_href(td) is not None
+
+        results = await consumed_thing.batch([
+            {"op": InteractionVerbs.READ_PROPERTY, "name": "humidity"},
+            {"op": InteractionVerbs.WRITE_PROPERTY, "name": "temperature", "value": 30},
+            {"op": InteractionVerbs.INVOKE_ACTION, "name": "double", "input": 21},
+            {"op": InteractionVerbs.READ_PROPERTY, "name": "unknown"},
+            {"op": InteractionVerbs.OBSERVE_PROPERTY, "name": "humidity"}
+        ])
+
+        assert results[:3] == [{"value": 60}, {}, {"result": 42}]
+        assert "error" in results[3]
+        assert "error" in results[4]
+        assert await exposed_thing.read_property("temperature") == 30
+
+    run_with_thing(test, tmp_path / "vo.db")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+
+import pytest
+import tornado.httpclient
+import tornado.httpserver
+import tornado.netutil
+import tornado.web
+
+from wotpy.protocols.http.client import HTTPClient
+from wotpy.protocols.http.enums import HTTPClientBackends
+from wotpy.wot.td import ThingDescription
+
+THING_NAME = "thing"
+PROP_NAME = "temperature"
+
+
+class ValueHandler(tornado.web.RequestHandler):
+    """Responds with a constant Property value."""
+
+    def get(self):
+        self.write({"value": 21.5})
+
+
+class StreamHandler(tornado.web.RequestHandler):
+    """Server-Sent Events stream that sends one event and stays open."""
+
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.write("data: {}\n\n".format(json.dumps({"value": 20})))
+        await self.flush()
+        await asyncio.Event().wait()
+
+
+class ClosedStreamHandler(tornado.web.RequestHandler):
+    """Server-Sent Events stream that sends one event and records when the client closes the connection."""
+
+    def initialize(self, closed):
+        self._closed = closed
+        self._close_event = asyncio.Event()
+
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.write("data: {}\n\n".format(json.dumps({"value": 20})))
+        await self.flush()
+        await self._close_event.wait()
+
+    def on_connection_close(self):
+        self._closed.append(True)
+        self._close_event.set()
+
+
+class TokenHandler(tornado.web.RequestHandler):
+    """OAuth2 token endpoint that issues a new access token on each request."""
+
+    def initialize(self, issued):
+        self._issued = issued
+
+    def post(self):
+        self._issued.append("token-{}".format(len(self._issued)))
+        self.write({"access_token": self._issued[-1], "expires_in": 3600})
+
+
+class ProtectedValueHandler(tornado.web.RequestHandler):
+    """Responds with a constant Property value only to requests with the last issued token."""
+
+    def initialize(self, issued):
+        self._issued = issued
+
+    def get(self):
+        if self.request.headers.get("Authorization") != "Bearer {}".format(self._issued[-1]):
+            raise tornado.web.HTTPError(401)
+
+        self.write({"value": 21.5})
+
+
+@pytest.fixture(params=[HTTPClientBackends.SIMPLE, HTTPClientBackends.CURL])
+def backend(request):
+    """Runs the test with each HTTP client backend."""
+
+    if request.param == HTTPClientBackends.CURL:
+        pytest.importorskip("pycurl")
+
+    return request.param
+
+
+def build_td(port):
+    """Returns a Thing Description with regular and Server-Sent Events forms for the Property."""
+
+    base = "http://127.0.0.1:{}".format(port)
+
+    return ThingDescription({
+        "@context": "https://www.w3.org/2019/wot/td/v1",
+        "id": "urn:wotpy:{}".format(THING_NAME),
+        "title": THING_NAME,
+        "security": ["nosec_sc"],
+        "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+        "forms": [{"href": base + "/properties", "op": ["readallproperties"]}],
+        "properties": {
+            PROP_NAME: {
+                "type": "number",
+                "observable": True,
+                "forms": [
+                    {"href": base + "/value", "op": ["readproperty"], "contentType": "application/json"},
+                    {"href": base + "/stream", "op": ["observeproperty"], "subprotocol": "sse"}
+                ]
+            }
+        }
+    })
+
+
+def test_streams_do_not_take_request_slots(backend):
+    """Open Server-Sent Events streams do not block regular requests, even with a single client slot."""
+
+    async def run():
+        sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+        port = sockets[0].getsockname()[1]
+        server = tornado.httpserver.HTTPServer(tornado.web.Application([
+            (r"/value", ValueHandler),
+            (r"/stream", StreamHandler)
+        ]))
+        server.add_sockets(sockets)
+
+        td = build_td(port)
+        client = HTTPClient(backend=backend, max_clients=1, max_streams=2)
+        items = []
+        subscriptions = []
+
+        try:
+            for _ in range(2):
+                subscriptions.append(client.on_property_change(td, PROP_NAME).subscribe(on_next=items.append))
+
+            async def wait_items():
+                while len(items) < 2:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(wait_items(), timeout=5)
+
+            value = await asyncio.wait_for(client.read_property(td, PROP_NAME), timeout=5)
+
+            assert value == 21.5
+        finally:
+            for subscription in subscriptions:
+                subscription.dispose()
+
+            await client.close()
+            server.stop()
+
+    asyncio.run(run())
+
+
+def test_unauthorized_discards_cached_token(backend):
+    """A token rejected by the server is discarded and a new one is fetched for the next request."""
+
+    async def run():
+        issued = []
+        sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+        port = sockets[0].getsockname()[1]
+        server = tornado.httpserver.HTTPServer(tornado.web.Application([
+            (r"/token", TokenHandler, {"issued": issued}),
+            (r"/value", ProtectedValueHandler, {"issued": issued})
+        ]))
+        server.add_sockets(sockets)
+
+        td = build_td(port)
+        client = HTTPClient(backend=backend)
+        client.set_security(
+            {"scheme": "oauth2", "flow": "client", "token": "http://127.0.0.1:{}/token".format(port)},
+            {"clientId": "client", "clientSecret": "secret"})
+
+        try:
+            assert await client.read_property(td, PROP_NAME) == 21.5
+
+            issued.append("token-revoked")
+
+            with pytest.raises(tornado.httpclient.HTTPClientError):
+                await client.read_property(td, PROP_NAME)
+
+            assert await client.read_property(td, PROP_NAME) == 21.5
+            assert issued == ["token-0", "token-revoked", "token-2"]
+        finally:
+            await client.close()
+            server.stop()
+
+    asyncio.run(run())
+
+
+def test_unsubscribed_streams_closed(backend):
+    """Disposing a Server-Sent Events subscription closes its connection right away."""
+
+    async def run():
+        closed = []
+        sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+        port = sockets[0].getsockname()[1]
+        server = tornado.httpserver.HTTPServer(tornado.web.Application([
+            (r"/stream", ClosedStreamHandler, {"closed": closed})
+        ]))
+        server.add_sockets(sockets)
+
+        td = build_td(port)
+        client = HTTPClient(backend=backend, max_streams=1)
+
+        async def wait_until(predicate):
+            while not predicate():
+                await asyncio.sleep(0.01)
+
+        try:
+            for idx in range(3):
+                items = []
+                subscription = client.on_property_change(td, PROP_NAME).subscribe(on_next=items.append)
+                await asyncio.wait_for(wait_until(lambda: len(items) > 0), timeout=5)
+                subscription.dispose()
+                await asyncio.wait_for(wait_until(lambda: len(closed) > idx), timeout=5)
+        finally:
+            await client.close()
+            server.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("pycurl_available,expected", [
+    (True, HTTPClientBackends.CURL),
+    (False, HTTPClientBackends.SIMPLE)
+])
+def test_default_backend(monkeypatch, pycurl_available, expected):
+    """The curl backend is the default when pycurl is available."""
+
+    monkeypatch.setattr("wotpy.protocols.http.client.is_pycurl_available", lambda: pycurl_available)
+
+    assert HTTPClient().backend == expected
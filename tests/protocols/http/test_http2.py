@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import socket
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import pytest
+import tornado.iostream
+import tornado.web
+
+from wotpy.protocols.http.http2 import HTTP2CapableServer, HTTP2ServerConnection
+
+MAX_BODY_SIZE = 1024
+MAX_HEADER_SIZE = 2048
+MAX_STREAMS = 2
+
+
+class EchoHandler(tornado.web.RequestHandler):
+    """Responds with the remote IP and the size of the request body."""
+
+    def get(self):
+        self.write({"remote_ip": self.request.remote_ip})
+
+    def post(self):
+        self.write({"size": len(self.request.body)})
+
+
+class SlowHandler(tornado.web.RequestHandler):
+    """Responds when the test releases the request."""
+
+    async def get(self):
+        await self.application.settings["release"].wait()
+        self.write("done")
+
+
+@tornado.web.stream_request_body
+class StreamHandler(tornado.web.RequestHandler):
+    """Consumes each chunk of the body when the test releases it."""
+
+    async def data_received(self, chunk):
+        await self.application.settings["release"].wait()
+
+    def put(self):
+        self.write("done")
+
+
+class H2TestClient:
+    """Minimal HTTP/2 client on top of a socket connected to the server."""
+
+    def __init__(self, sock):
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=True, header_encoding="utf-8"))
+        self.sock = sock
+        self.reader = None
+        self.writer = None
+        self.responses = {}
+        self.resets = {}
+        self.ended = set()
+        self.window_updates = 0
+
+    async def connect(self, flush=True):
+        self.reader, self.writer = await asyncio.open_connection(sock=self.sock)
+        self.conn.initiate_connection()
+        flush and await self.flush()
+
+    async def flush(self):
+        self.writer.write(self.conn.data_to_send())
+        await self.writer.drain()
+
+    def request(self, method, path, headers=None, body=None):
+        stream_id = self.conn.get_next_available_stream_id()
+
+        self.conn.send_headers(stream_id, [
+            (":method", method), (":path", path),
+            (":scheme", "https"), (":authority", "localhost")
+        ] + (headers or []), end_stream=body is None)
+
+        if body is not None:
+            frame_size = self.conn.max_outbound_frame_size
+            chunks = [body[idx:idx + frame_size] for idx in range(0, len(body), frame_size)] or [b""]
+
+            for idx, chunk in enumerate(chunks):
+                self.conn.send_data(stream_id, chunk, end_stream=idx == len(chunks) - 1)
+
+        return stream_id
+
+    async def read_until(self, predicate, timeout=5):
+        async def read():
+            while not predicate():
+                data = await self.reader.read(65535)
+
+                if not data:
+                    return
+
+                for event in self.conn.receive_data(data):
+                    self._on_event(event)
+
+                await self.flush()
+
+        await asyncio.wait_for(read(), timeout=timeout)
+
+    def _on_event(self, event):
+        if isinstance(event, h2.events.ResponseReceived):
+            self.responses[event.stream_id] = [dict(event.headers), b""]
+        elif isinstance(event, h2.events.DataReceived):
+            self.responses[event.stream_id][1] += event.data
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            self.ended.add(event.stream_id)
+        elif isinstance(event, h2.events.StreamReset):
+            self.resets[event.stream_id] = event.error_code
+        elif isinstance(event, h2.events.WindowUpdated):
+            self.window_updates += 1
+
+    def status(self, stream_id):
+        return int(self.responses[stream_id][0][":status"])
+
+    def close(self):
+        self.writer.close()
+
+
+def tcp_socket_pair():
+    """Returns a pair of connected TCP sockets on the loopback interface."""
+
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        sock_client = socket.create_connection(listener.getsockname())
+        sock_server, _ = listener.accept()
+
+    sock_server.setblocking(False)
+    sock_client.setblocking(False)
+
+    return sock_server, sock_client
+
+
+def run_with_server(test_coro, xheaders=False, max_body_size=MAX_BODY_SIZE):
+    """Runs the test coroutine with a client connected to an HTTP/2 server connection."""
+
+    async def run():
+        release = asyncio.Event()
+
+        app = tornado.web.Application([
+            (r"/echo", EchoHandler),
+            (r"/slow", SlowHandler),
+            (r"/stream", StreamHandler)
+        ], release=release)
+
+        server = HTTP2CapableServer(
+            app, xheaders=xheaders, max_body_size=max_body_size, max_header_size=MAX_HEADER_SIZE)
+
+        sock_server, sock_client = tcp_socket_pair()
+        stream = tornado.iostream.IOStream(sock_server)
+
+        conn = HTTP2ServerConnection(
+            stream, sock_server.getpeername(), server, max_concurrent_streams=MAX_STREAMS)
+
+        serve_task = asyncio.ensure_future(conn.serve())
+        client = H2TestClient(sock_client)
+
+        try:
+            await test_coro(client, release)
+        finally:
+            client.close()
+            await conn.close()
+            await asyncio.gather(serve_task, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_request_response():
+    """Requests are dispatched to the application and answered on their stream."""
+
+    async def test(client, release):
+        await client.connect()
+        stream_get = client.request("GET", "/echo")
+        stream_post = client.request("POST", "/echo", body=b"x" * 100)
+        await client.flush()
+        await client.read_until(lambda: {stream_get, stream_post} <= client.ended)
+
+        assert client.status(stream_get) == 200
+        assert client.status(stream_post) == 200
+        assert b'"size": 100' in client.responses[stream_post][1]
+
+    run_with_server(test)
+
+
+@pytest.mark.parametrize("declare_length", [True, False])
+def test_body_too_large(declare_length):
+    """Bodies over the max_body_size of the server are rejected with 413."""
+
+    async def test(client, release):
+        await client.connect()
+        body = b"x" * (MAX_BODY_SIZE + 1)
+        headers = [("content-length", str(len(body)))] if declare_length else []
+        stream_id = client.request("POST", "/echo", headers=headers, body=body)
+        await client.flush()
+        await client.read_until(lambda: stream_id in client.ended or stream_id in client.resets)
+
+        assert client.status(stream_id) == 413
+
+    run_with_server(test)
+
+
+def test_headers_too_large():
+    """Header lists over the max_header_size of the server are rejected with 431."""
+
+    async def test(client, release):
+        await client.connect()
+        stream_id = client.request("GET", "/echo", headers=[("x-large", "x" * MAX_HEADER_SIZE)])
+        await client.flush()
+        await client.read_until(lambda: stream_id in client.ended or stream_id in client.resets)
+
+        assert client.status(stream_id) == 431
+
+    run_with_server(test)
+
+
+def test_max_concurrent_streams():
+    """Streams over the concurrency limit are refused while the others are served."""
+
+    async def test(client, release):
+        await client.connect(flush=False)
+        stream_ids = [client.request("GET", "/slow") for _ in range(MAX_STREAMS + 1)]
+        await client.flush()
+        await client.read_until(lambda: stream_ids[-1] in client.resets)
+
+        assert client.resets[stream_ids[-1]] == h2.errors.ErrorCodes.REFUSED_STREAM
+
+        release.set()
+        await client.read_until(lambda: set(stream_ids[:-1]) <= client.ended)
+
+        assert all(client.status(stream_id) == 200 for stream_id in stream_ids[:-1])
+
+    run_with_server(test)
+
+
+def test_data_acknowledged_after_consumed():
+    """The flow control window is only opened when the application has consumed the data."""
+
+    async def test(client, release):
+        await client.connect()
+        stream_id = client.request("PUT", "/stream", body=b"x" * 40000)
+        await client.flush()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.read_until(lambda: client.window_updates > 0, timeout=0.3)
+
+        release.set()
+        await client.read_until(lambda: stream_id in client.ended)
+
+        assert client.window_updates > 0
+        assert client.status(stream_id) == 200
+
+    run_with_server(test, max_body_size=100000)
+
+
+@pytest.mark.parametrize("xheaders,expected_ip", [(True, "10.1.2.3"), (False, "127.0.0.1")])
+def test_xheaders(xheaders, expected_ip):
+    """Requests go through HTTPServer.start_request, which applies the X-Real-Ip header."""
+
+    async def test(client, release):
+        await client.connect()
+        stream_id = client.request("GET", "/echo", headers=[("x-real-ip", "10.1.2.3")])
+        await client.flush()
+        await client.read_until(lambda: stream_id in client.ended)
+
+        assert expected_ip.encode() in client.responses[stream_id][1]
+
+    run_with_server(test, xheaders=xheaders)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import time
+import types
+
+import tornado.httpclient
+
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.protocols.http.enums import ActionInvocationStatus
+from wotpy.protocols.http.handlers.action import invocation_status
+from wotpy.protocols.http.server import HTTPServer
+from wotpy.wot.servient import Servient
+from wotpy.wot.shared_state import SharedStateBroker, SharedStateChannel
+
+THING_NAME = "thing"
+
+
+async def wait_until(predicate, timeout=5):
+    """Waits until the predicate holds."""
+
+    async def wait():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout=timeout)
+
+
+def run_with_workers(test_coro, action_ttl_secs=300):
+    """Runs the test coroutine with two HTTP servers connected through a shared state broker."""
+
+    async def run():
+        sock_dir = tempfile.mkdtemp()
+        broker = SharedStateBroker(os.path.join(sock_dir, "state.sock"))
+        await broker.start()
+
+        servers = []
+        channels = []
+
+        try:
+            for _ in range(2):
+                channel = SharedStateChannel(broker.path)
+                servient = types.SimpleNamespace(shared_state_channel=channel)
+                await channel.connect(servient)
+                server = HTTPServer(port=0, action_ttl_secs=action_ttl_secs)
+                await server.start(servient)
+                channels.append(channel)
+                servers.append(server)
+
+            await test_coro(*servers)
+        finally:
+            for server in servers:
+                await server.stop()
+
+            for channel in channels:
+                await channel.close()
+
+            await broker.stop()
+            shutil.rmtree(sock_dir)
+
+    asyncio.run(run())
+
+
+def test_invocation_shared_between_workers():
+    """The status of an invocation is available in the workers that did not run it."""
+
+    async def test(owner, other):
+        future = asyncio.get_event_loop().create_future()
+        invocation_id = owner.add_pending_action(THING_NAME, future)
+
+        remote = await other.find_pending_action(THING_NAME, invocation_id)
+
+        assert remote is not None
+        assert invocation_status(remote)["status"] == ActionInvocationStatus.RUNNING
+        assert await other.find_pending_action("other", invocation_id) is None
+
+        future.set_result(42)
+        await wait_until(remote.done)
+
+        assert invocation_status(remote) == invocation_status(future)
+
+    run_with_workers(test)
+
+
+def test_invocation_failure_shared_between_workers():
+    """Failed invocations are reported with their error in the other workers."""
+
+    async def test(owner, other):
+        future = asyncio.get_event_loop().create_future()
+        invocation_id = owner.add_pending_action(THING_NAME, future)
+        future.set_exception(ValueError("boom"))
+
+        remote = await other.find_pending_action(THING_NAME, invocation_id)
+        await wait_until(remote.done)
+
+        assert invocation_status(remote) == {"status": ActionInvocationStatus.FAILED, "error": "boom"}
+
+    run_with_workers(test)
+
+
+def test_cancel_forwarded_to_owner():
+    """Cancelling an invocation in another worker cancels it in the worker that runs it."""
+
+    async def test(owner, other):
+        future = asyncio.get_event_loop().create_future()
+        invocation_id = owner.add_pending_action(THING_NAME, future)
+
+        remote = await other.find_pending_action(THING_NAME, invocation_id)
+        other.cancel_pending_action(THING_NAME, invocation_id)
+        await wait_until(lambda: future.done() and remote.done())
+
+        assert future.cancelled()
+        assert remote.cancelled()
+
+    run_with_workers(test)
+
+
+def test_unchecked_running_invocations_expire():
+    """Running invocations that are not checked within the TTL are removed without being cancelled."""
+
+    async def test(owner, other):
+        future = asyncio.get_event_loop().create_future()
+        invocation_id = owner.add_pending_action(THING_NAME, future)
+        await wait_until(lambda: other.get_pending_action(THING_NAME, invocation_id) is not None)
+
+        owner._invocation_check_times[invocation_id] -= 120
+        other._invocation_check_times[invocation_id] -= 120
+        owner._purge_pending_actions()
+        other._purge_pending_actions()
+
+        assert owner.get_pending_action(THING_NAME, invocation_id) is None
+        assert other.get_pending_action(THING_NAME, invocation_id) is None
+        assert not future.done()
+
+        future.cancel()
+
+    run_with_workers(test, action_ttl_secs=60)
+
+
+def test_unknown_invocation():
+    """Unknown invocations are reported as missing after a short wait."""
+
+    async def test(owner, other):
+        other.SHARED_INVOCATION_WAIT_SECS = 0.1
+        assert await other.find_pending_action(THING_NAME, "unknown") is None
+
+    run_with_workers(test)
+
+
+def test_cancel_invocation_of_thing_with_url_name(tmp_path):
+    """Invocations of a Thing whose title differs from its URL name are cancelled by the DELETE handler."""
+
+    async def run():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        servient = Servient(
+            hostname="127.0.0.1", catalogue_port=None, init_logging=False,
+            sqlite_db_path=str(tmp_path / "vo.db"))
+        servient.add_server(HTTPServer(port=port, action_wait_secs=0.1))
+        wot = await servient.start()
+
+        exposed_thing = wot.produce(JSON_CODEC.to_bytes({
+            "@context": "https://www.w3.org/2019/wot/td/v1",
+            "id": "urn:wotpy:coffee-machine",
+            "title": "Coffee Machine",
+            "security": ["nosec_sc"],
+            "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+            "forms": [{"href": "http://localhost/coffee-machine", "op": ["readallproperties"]}],
+            "actions": {"brew": {"forms": [{"href": "http://localhost/coffee-machine/brew"}]}}
+        }).decode())
+
+        async def brew(parameters):
+            await asyncio.Event().wait()
+
+        exposed_thing.set_action_handler("brew", brew)
+        exposed_thing.expose()
+
+        http_client = tornado.httpclient.AsyncHTTPClient()
+
+        try:
+            response = await http_client.fetch(
+                "http://127.0.0.1:{}/{}/action/brew".format(port, exposed_thing.thing.url_name),
+                method="POST", body=JSON_CODEC.to_bytes({"input": None}))
+
+            assert response.code == 201
+
+            ini = time.perf_counter()
+            response = await http_client.fetch(
+                response.headers["Location"], method="DELETE", request_timeout=10)
+
+            assert time.perf_counter() - ini < 5
+            assert JSON_CODEC.to_value(response.body)["status"] == ActionInvocationStatus.CANCELLED
+        finally:
+            await servient.shutdown()
+
+    asyncio.run(run())
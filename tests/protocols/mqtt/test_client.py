@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import warnings
+
+import pytest
+
+from wotpy.protocols.mqtt.client import MQTTClient
+
+
+@pytest.mark.parametrize("name", ["msg_wait_timeout_secs", "msg_ttl_secs", "stop_loop_timeout_secs"])
+def test_deprecated_arguments(name):
+    """The arguments of the removed message polling loop are accepted with a deprecation warning."""
+
+    with pytest.warns(DeprecationWarning, match=name):
+        MQTTClient(**{name: 10})
+
+
+def test_no_warning_by_default():
+    """No deprecation warning is raised when the deprecated arguments are not given."""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        MQTTClient()
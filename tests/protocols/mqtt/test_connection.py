@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+from amqtt.broker import Broker
+from amqtt.client import MQTTClient
+from amqtt.mqtt.constants import QOS_0, QOS_1
+
+from wotpy.protocols.mqtt.connection import MQTTBrokerConnection, filter_covers, topic_matches
+
+PORT = 18885
+BROKER_URL = "mqtt://127.0.0.1:{}".format(PORT)
+
+BROKER_CONFIG = {
+    "listeners": {
+        "default": {
+            "type": "tcp",
+            "bind": "127.0.0.1:{}".format(PORT)
+        }
+    },
+    "sys_interval": 0,
+    "auth": {
+        "allow-anonymous": True
+    },
+    "topic-check": {
+        "enabled": False
+    }
+}
+
+CLIENT_CONFIG = {
+    "keep_alive": 90,
+    "auto_reconnect": True,
+    "reconnect_max_interval": 1,
+    "reconnect_retries": 20
+}
+
+
+async def wait_until(predicate, timeout=10):
+    """Waits until the predicate holds."""
+
+    async def wait():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout=timeout)
+
+
+def run_with_connection(test_coro, **kwargs):
+    """Runs the test coroutine with a broker, a connection and a publisher client."""
+
+    async def run():
+        broker = Broker(BROKER_CONFIG)
+        await broker.start()
+
+        connection = MQTTBrokerConnection(
+            BROKER_URL, dict(CLIENT_CONFIG), deliver_timeout_secs=0.2, **kwargs)
+        publisher = MQTTClient()
+        brokers = [broker]
+
+        try:
+            await connection.connect()
+            await publisher.connect(BROKER_URL)
+            await test_coro(connection, publisher, brokers)
+        finally:
+            await connection.close()
+            await publisher.disconnect()
+            await brokers[-1].shutdown()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("topic_filter,topic,expected", [
+    ("a/#", "a/b/c", True),
+    ("a/+/c", "a/b/c", True),
+    ("a/+", "a/b/c", False),
+    ("#", "$SYS/uptime", False),
+    ("a/b", "a/b", True)
+])
+def test_topic_matches(topic_filter, topic, expected):
+    """Topic names are matched against filters with the MQTT wildcard rules."""
+
+    assert topic_matches(topic_filter, topic) == expected
+
+
+def test_filter_covers():
+    """Wide wildcard filters cover narrower filters."""
+
+    assert filter_covers("a/#", "a/+/c")
+    assert filter_covers("a/+/c", "a/b/c")
+    assert not filter_covers("a/+/c", "a/#")
+
+
+def test_covered_filters_share_subscription():
+    """Filters covered by a subscribed wildcard are not subscribed on the broker,
+    and a filter is unsubscribed when its last listener is removed."""
+
+    async def test(connection, publisher, brokers):
+        received_wide = []
+        received_narrow = []
+
+        id_wide = await connection.add_listener("test/#", QOS_1, received_wide.append)
+        await connection.add_listener("test/a", QOS_1, received_narrow.append)
+        await connection.add_listener("test/a", QOS_0, received_narrow.append)
+
+        assert connection.subscribed_filters == {"test/#": QOS_1}
+
+        await publisher.publish("test/a", b"1", qos=QOS_1)
+        await wait_until(lambda: len(received_wide) == 1 and len(received_narrow) == 2)
+
+        await connection.remove_listener("test/#", id_wide)
+
+        assert connection.subscribed_filters == {"test/a": QOS_1}
+
+    run_with_connection(test)
+
+
+def test_resubscribe_after_reconnect():
+    """The broker subscriptions are restored when the connection is reestablished."""
+
+    async def test(connection, publisher, brokers):
+        received = []
+        await connection.add_listener("test/+", QOS_1, received.append)
+
+        await publisher.disconnect()
+        await brokers[0].shutdown()
+        brokers.append(Broker(BROKER_CONFIG))
+        await brokers[-1].start()
+        await publisher.connect(BROKER_URL)
+
+        async def publish_until_received():
+            while not len(received):
+                await publisher.publish("test/a", b"1", qos=QOS_1)
+                await asyncio.sleep(0.2)
+
+        await asyncio.wait_for(publish_until_received(), timeout=20)
+
+    run_with_connection(test)
+
+
+def test_close_fails_blocked_publications():
+    """Publishers waiting on the full publication queue are rejected when the connection closes."""
+
+    async def test(connection, publisher, brokers):
+        tasks = [
+            asyncio.ensure_future(connection.publish("test/a", b"1", QOS_1))
+            for _ in range(50)
+        ]
+
+        await asyncio.sleep(0)
+        await connection.close()
+
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=5)
+
+        assert any(isinstance(item, ConnectionError) for item in results)
+
+    run_with_connection(test, max_inflight=1)
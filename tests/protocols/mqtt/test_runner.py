@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+import types
+
+from amqtt.broker import Broker
+from amqtt.client import MQTTClient
+from amqtt.mqtt.constants import QOS_1
+
+from wotpy.protocols.mqtt.handlers.action import ActionMQTTHandler
+from wotpy.protocols.mqtt.handlers.base import BaseMQTTHandler
+from wotpy.protocols.mqtt.runner import MQTTHandlerRunner
+
+PORT = 18884
+BROKER_URL = "mqtt://127.0.0.1:{}".format(PORT)
+
+BROKER_CONFIG = {
+    "listeners": {
+        "default": {
+            "type": "tcp",
+            "bind": "127.0.0.1:{}".format(PORT)
+        }
+    },
+    "sys_interval": 0,
+    "auth": {
+        "allow-anonymous": True
+    },
+    "topic-check": {
+        "enabled": False
+    }
+}
+
+HANDLING_SECS = 0.5
+
+
+class SlowHandler(BaseMQTTHandler):
+    """Handler that takes a while to handle each message and records the order of the messages."""
+
+    def __init__(self, ordered, release=None):
+        super().__init__(types.SimpleNamespace(servient_id="test", shared_subscription_group=None))
+        self._ordered = ordered
+        self._release = release
+        self.handled = []
+        self.max_pending = 0
+        self.runner = None
+
+    @property
+    def topics(self):
+        return [("test/#", QOS_1)]
+
+    @property
+    def ordered_messages(self):
+        return self._ordered
+
+    async def handle_message(self, msg):
+        self.max_pending = max(self.max_pending, self.runner.pending_messages)
+
+        if self._release is not None:
+            await self._release.wait()
+        else:
+            await asyncio.sleep(HANDLING_SECS)
+
+        self.handled.append((msg.topic, bytes(msg.data)))
+
+
+async def wait_until(predicate, timeout=10):
+    """Waits until the predicate holds."""
+
+    async def wait():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout=timeout)
+
+
+def run_with_runner(test_coro, handler, **kwargs):
+    """Runs the test coroutine with a started runner for the handler and a publisher client."""
+
+    async def run():
+        broker = Broker(BROKER_CONFIG)
+        await broker.start()
+
+        runner = MQTTHandlerRunner(BROKER_URL, handler, **kwargs)
+        handler.runner = runner
+        publisher = MQTTClient()
+
+        try:
+            await runner.start()
+            await publisher.connect(BROKER_URL)
+            await test_coro(publisher)
+        finally:
+            await publisher.disconnect()
+            await runner.stop()
+            await broker.shutdown()
+
+    asyncio.run(run())
+
+
+def test_action_messages_not_ordered():
+    """Action invocations do not wait for the previous invocations of the same Action."""
+
+    assert not ActionMQTTHandler(types.SimpleNamespace()).ordered_messages
+
+
+def test_unordered_messages_handled_concurrently():
+    """Slow messages of the same topic are handled concurrently when the handler does not need ordering."""
+
+    handler = SlowHandler(ordered=False)
+    num_messages = 10
+
+    async def test(publisher):
+        ini = time.perf_counter()
+
+        for idx in range(num_messages):
+            await publisher.publish("test/action", str(idx).encode(), qos=QOS_1)
+
+        await wait_until(lambda: len(handler.handled) == num_messages)
+
+        assert time.perf_counter() - ini < HANDLING_SECS * num_messages / 2
+
+    run_with_runner(test, handler)
+
+
+def test_ordered_messages_keep_topic_order():
+    """Messages of the same topic are handled in order of arrival, while different topics run concurrently."""
+
+    handler = SlowHandler(ordered=True)
+    num_messages = 3
+    topics = ["test/property/a", "test/property/b"]
+
+    async def test(publisher):
+        ini = time.perf_counter()
+
+        for idx in range(num_messages):
+            for topic in topics:
+                await publisher.publish(topic, str(idx).encode(), qos=QOS_1)
+
+        await wait_until(lambda: len(handler.handled) == num_messages * len(topics))
+
+        assert time.perf_counter() - ini < HANDLING_SECS * num_messages * len(topics)
+
+        for topic in topics:
+            payloads = [payload for item_topic, payload in handler.handled if item_topic == topic]
+            assert payloads == [str(idx).encode() for idx in range(num_messages)]
+
+    run_with_runner(test, handler)
+
+
+def test_backpressure():
+    """The runner does not take more messages from the broker than fit in its buffer."""
+
+    release = asyncio.Event()
+    handler = SlowHandler(ordered=False, release=release)
+    buffer_size = 3
+    num_messages = 10
+
+    async def test(publisher):
+        for idx in range(num_messages):
+            await publisher.publish("test/action", str(idx).encode(), qos=QOS_1)
+
+        await asyncio.sleep(0.5)
+
+        assert handler.runner.pending_messages + len(handler.handled) <= buffer_size
+
+        release.set()
+        await wait_until(lambda: len(handler.handled) == num_messages)
+
+    run_with_runner(test, handler, messages_buffer_size=buffer_size)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+
+from amqtt.broker import Broker
+from amqtt.client import MQTTClient
+from amqtt.mqtt.constants import QOS_1
+
+from wotpy.protocols.enums import InteractionVerbs
+from wotpy.protocols.mqtt.server import MQTTServer
+from wotpy.wot.servient import Servient
+
+PORT = 18886
+BROKER_URL = "mqtt://127.0.0.1:{}".format(PORT)
+
+BROKER_CONFIG = {
+    "listeners": {
+        "default": {
+            "type": "tcp",
+            "bind": "127.0.0.1:{}".format(PORT)
+        }
+    },
+    "sys_interval": 0,
+    "auth": {
+        "allow-anonymous": True
+    },
+    "topic-check": {
+        "enabled": False
+    }
+}
+
+THING_NAME = "thing"
+PROP_NAME = "temperature"
+
+THING_MODEL = {
+    "@context": "https://www.w3.org/2019/wot/td/v1",
+    "id": "urn:wotpy:{}".format(THING_NAME),
+    "title": THING_NAME,
+    "security": ["nosec_sc"],
+    "securityDefinitions": {"nosec_sc": {"scheme": "nosec"}},
+    "forms": [{"href": "http://localhost/{}".format(THING_NAME), "op": ["readallproperties"]}],
+    "properties": {
+        PROP_NAME: {
+            "type": "number",
+            "observable": True,
+            "forms": [{"href": "http://localhost/{}/{}".format(THING_NAME, PROP_NAME)}]
+        }
+    }
+}
+
+
+async def receive_retained(topic, timeout=0.5):
+    """Subscribes with a new client and returns the payloads of the retained messages on the topic."""
+
+    client = MQTTClient()
+    await client.connect(BROKER_URL)
+    await client.subscribe([(topic, QOS_1)])
+    payloads = []
+
+    try:
+        while True:
+            msg = await client.deliver_message(timeout)
+            msg.topic == topic and payloads.append(bytes(msg.data))
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await client.disconnect()
+
+    return payloads
+
+
+def run_with_servient(test_coro, db_path, **kwargs):
+    """Runs the test coroutine with a servient that exposes a Thing through an MQTT server."""
+
+    async def run():
+        broker = Broker(BROKER_CONFIG)
+        await broker.start()
+
+        mqtt_server = MQTTServer(BROKER_URL, **kwargs)
+        servient = Servient(catalogue_port=None, init_logging=False, sqlite_db_path=str(db_path))
+        servient.add_server(mqtt_server)
+
+        try:
+            wot = await servient.start()
+            exposed_thing = wot.produce(json.dumps(THING_MODEL))
+            exposed_thing.expose()
+            await test_coro(mqtt_server, exposed_thing)
+        finally:
+            await servient.shutdown()
+            await broker.shutdown()
+
+    asyncio.run(run())
+
+
+def test_retained_values_cleared_on_remove(tmp_path):
+    """The retained Property values are cleared when the Thing is removed from the server."""
+
+    async def test(mqtt_server, exposed_thing):
+        topic_updates = "{}/property/updates/{}/{}".format(mqtt_server.servient_id, THING_NAME, PROP_NAME)
+        topic_state = "{}/property/state/{}".format(mqtt_server.servient_id, THING_NAME)
+
+        await asyncio.sleep(0.2)
+        await exposed_thing.write_property(PROP_NAME, 21.5)
+        await asyncio.sleep(0.5)
+
+        assert len(await receive_retained(topic_updates)) == 1
+        assert len(await receive_retained(topic_state)) == 1
+
+        exposed_thing.destroy()
+        await asyncio.sleep(0.5)
+
+        assert await receive_retained(topic_updates) == []
+        assert await receive_retained(topic_state) == []
+
+    run_with_servient(test, tmp_path / "vo.db", retain_property_values=True, property_state_flush_ms=10)
+
+
+def test_state_topic_form(tmp_path):
+    """The state topic is advertised in a Thing-level Form when the aggregated values are published."""
+
+    async def test(mqtt_server, exposed_thing):
+        forms = exposed_thing.thing.autogenerated_forms
+
+        assert len(forms) == 1
+        assert forms[0].href.endswith("/property/state/{}".format(THING_NAME))
+        assert InteractionVerbs.OBSERVE_ALL_PROPERTIES in forms[0].op
+
+    run_with_servient(test, tmp_path / "vo.db", property_state_flush_ms=10)
+
+
+def test_no_state_topic_form_by_default(tmp_path):
+    """No Thing-level Form is advertised when the aggregated values are not published."""
+
+    async def test(mqtt_server, exposed_thing):
+        assert exposed_thing.thing.autogenerated_forms == []
+
+    run_with_servient(test, tmp_path / "vo.db")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+
+import tornado.httpserver
+import tornado.netutil
+import tornado.web
+
+from wotpy.protocols.oauth2 import TokenIntrospector
+
+TOKEN = "token"
+
+
+class IntrospectionHandler(tornado.web.RequestHandler):
+    """Introspection endpoint that answers with the configured response after a short delay."""
+
+    def initialize(self, requests, response):
+        self._requests = requests
+        self._response = response
+
+    async def post(self):
+        self._requests.append(self.get_body_argument("token"))
+        await asyncio.sleep(0.1)
+        self.write(self._response())
+
+
+def run_with_endpoint(test_coro, response):
+    """Runs the test coroutine with an introspection endpoint that records the introspected tokens."""
+
+    async def run():
+        requests = []
+        sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+        port = sockets[0].getsockname()[1]
+        server = tornado.httpserver.HTTPServer(tornado.web.Application([
+            (r"/introspect", IntrospectionHandler, {"requests": requests, "response": response})
+        ]))
+        server.add_sockets(sockets)
+
+        try:
+            await test_coro("http://127.0.0.1:{}/introspect".format(port), requests)
+        finally:
+            server.stop()
+
+    asyncio.run(run())
+
+
+def test_concurrent_lookups_share_request():
+    """Concurrent lookups of the same token send a single introspection request."""
+
+    async def test(endpoint, requests):
+        introspector = TokenIntrospector(endpoint)
+        results = await asyncio.gather(*[introspector.is_active(TOKEN) for _ in range(10)])
+
+        assert results == [True] * 10
+        assert requests == [TOKEN]
+
+        assert await introspector.is_active(TOKEN)
+        assert requests == [TOKEN]
+
+    run_with_endpoint(test, lambda: {"active": True})
+
+
+def test_inactive_result_expires():
+    """Inactive results are cached only for the inactive time to live."""
+
+    async def test(endpoint, requests):
+        introspector = TokenIntrospector(endpoint, inactive_ttl=0.3)
+
+        assert not await introspector.is_active(TOKEN)
+        assert not await introspector.is_active(TOKEN)
+        assert len(requests) == 1
+
+        await asyncio.sleep(0.4)
+
+        assert not await introspector.is_active(TOKEN)
+        assert len(requests) == 2
+
+    run_with_endpoint(test, lambda: {"active": False})
+
+
+def test_active_result_expires_with_token():
+    """Active results are not cached past the expiration time of the token."""
+
+    async def test(endpoint, requests):
+        introspector = TokenIntrospector(endpoint)
+
+        assert await introspector.is_active(TOKEN)
+        assert await introspector.is_active(TOKEN)
+        assert len(requests) == 1
+
+        await asyncio.sleep(0.6)
+
+        assert await introspector.is_active(TOKEN)
+        assert len(requests) == 2
+
+    run_with_endpoint(test, lambda: {"active": True, "exp": time.time() + 0.5})
+
+
+def test_expired_token_not_active():
+    """Tokens reported as active with an expiration time in the past are rejected and not cached."""
+
+    async def test(endpoint, requests):
+        introspector = TokenIntrospector(endpoint)
+
+        assert not await introspector.is_active(TOKEN)
+        assert not await introspector.is_active(TOKEN)
+        assert len(requests) == 2
+
+    run_with_endpoint(test, lambda: {"active": True, "exp": time.time() - 1})
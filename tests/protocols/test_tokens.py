@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from wotpy.protocols.tokens import TokenManager
+
+
+def test_short_lived_tokens_not_refreshed_on_every_use():
+    """Tokens that live less than the refresh margin are reused until they are close to expiring."""
+
+    fetched = []
+
+    async def fetch(key):
+        fetched.append(key)
+        return "token-{}".format(len(fetched)), TokenManager.REFRESH_MARGIN_SECS / 2
+
+    async def run():
+        tokens = TokenManager(fetch)
+
+        for _ in range(5):
+            assert await tokens.get("key") == "token-1"
+
+        await asyncio.sleep(0)
+
+        assert fetched == ["key"]
+
+    asyncio.run(run())
+
+
+def test_invalidate():
+    """Invalidated tokens are fetched again on the next use."""
+
+    fetched = []
+
+    async def fetch(key):
+        fetched.append(key)
+        return "token-{}".format(len(fetched)), None
+
+    async def run():
+        tokens = TokenManager(fetch)
+
+        assert await tokens.get("key") == "token-1"
+
+        tokens.invalidate("key")
+
+        assert await tokens.get("key") == "token-2"
+
+    asyncio.run(run())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import types
+
+from wotpy.protocols.enums import Protocols, InteractionVerbs
+from wotpy.wot.consumed.thing import ConsumedThing
+
+
+class FailingBatchClient:
+    """HTTP client that advertises a batch resource but fails to reach it."""
+
+    def pick_http_batch_href(self, td):
+        return "http://localhost:1/thing/batch"
+
+    async def batch(self, td, operations, timeout=None):
+        raise ConnectionRefusedError("Connection refused")
+
+
+def test_batch_transport_error_returned_in_results():
+    """Transport errors of the batch request are returned as one error document per operation."""
+
+    servient = types.SimpleNamespace(clients={Protocols.HTTP: FailingBatchClient()})
+    consumed_thing = ConsumedThing(servient=servient, td=None)
+
+    operations = [
+        {"op": InteractionVerbs.READ_PROPERTY, "name": "temperature"},
+        {"op": InteractionVerbs.INVOKE_ACTION, "name": "reset"}
+    ]
+
+    results = asyncio.run(consumed_thing.batch(operations))
+
+    assert results == [{"error": "Connection refused"}] * len(operations)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from wotpy.protocols.client import BaseProtocolClient
+from wotpy.wot.servient import Servient
+
+
+class ClosableClient(BaseProtocolClient):
+    """Protocol client that records when it is closed."""
+
+    def __init__(self, protocol, fail=False):
+        self._protocol = protocol
+        self._fail = fail
+        self.closed = False
+
+    @property
+    def protocol(self):
+        return self._protocol
+
+    def is_supported_interaction(self, td, name):
+        return False
+
+    def invoke_action(self, td, name, input_value, timeout=None):
+        raise NotImplementedError()
+
+    def write_property(self, td, name, value, timeout=None):
+        raise NotImplementedError()
+
+    def read_property(self, td, name, timeout=None):
+        raise NotImplementedError()
+
+    def on_property_change(self, td, name):
+        raise NotImplementedError()
+
+    def on_event(self, td, name):
+        raise NotImplementedError()
+
+    def on_td_change(self, url):
+        raise NotImplementedError()
+
+    async def close(self):
+        self.closed = True
+
+        if self._fail:
+            raise Exception("Close error")
+
+
+def test_shutdown_closes_clients(tmp_path):
+    """Shutting down the servient closes all its clients, even if one of them fails."""
+
+    async def run():
+        clients = [ClosableClient("HTTP", fail=True), ClosableClient("MQTT")]
+        servient = Servient(
+            catalogue_port=None, clients=clients, init_logging=False,
+            sqlite_db_path=str(tmp_path / "vo.db"))
+
+        await servient.start()
+        await servient.shutdown()
+
+        assert all(client.closed for client in clients)
+
+    asyncio.run(run())
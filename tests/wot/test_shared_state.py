@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import shutil
+import tempfile
+import types
+
+from wotpy.wot.shared_state import SharedStateBroker, SharedStateChannel
+
+KIND = "test"
+
+
+class Receiver:
+    """Channel connected to the broker that records the received messages."""
+
+    def __init__(self, path):
+        self.channel = SharedStateChannel(path, connect_retries=100, connect_retry_secs=0.05)
+        self.channel.set_handler(KIND, lambda thing, name, data: self.messages.append((thing, name, data)))
+        self.messages = []
+
+    async def connect(self):
+        await self.channel.connect(types.SimpleNamespace())
+
+
+async def wait_until(predicate, timeout=5):
+    """Waits until the predicate holds."""
+
+    async def wait():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout=timeout)
+
+
+def run_with_broker(test_coro, num_receivers=2):
+    """Runs the test coroutine with a broker and connected receivers."""
+
+    async def run():
+        sock_dir = tempfile.mkdtemp()
+        broker = SharedStateBroker(os.path.join(sock_dir, "state.sock"))
+        await broker.start()
+        receivers = [Receiver(broker.path) for _ in range(num_receivers)]
+
+        try:
+            for receiver in receivers:
+                await receiver.connect()
+
+            await wait_until(lambda: broker.num_workers == num_receivers)
+
+            await test_coro(broker, receivers)
+        finally:
+            for receiver in receivers:
+                await receiver.channel.close()
+
+            await broker.stop()
+            shutil.rmtree(sock_dir)
+
+    asyncio.run(run())
+
+
+def test_messages_forwarded_to_other_workers():
+    """Messages are delivered to all the other workers but not to the publisher."""
+
+    async def test(broker, receivers):
+        publisher, *others = receivers
+        publisher.channel.publish("thing", KIND, "name", {"value": 1})
+
+        await wait_until(lambda: all(len(item.messages) for item in others))
+
+        assert all(item.messages == [("thing", "name", {"value": 1})] for item in others)
+        assert publisher.messages == []
+
+    run_with_broker(test, num_receivers=3)
+
+
+def test_non_serializable_data_not_published():
+    """Data that cannot be serialized is not published and does not raise."""
+
+    async def test(broker, receivers):
+        publisher, other = receivers
+        publisher.channel.publish("thing", KIND, "invalid", object())
+        publisher.channel.publish("thing", KIND, "valid", 1)
+
+        await wait_until(lambda: len(other.messages))
+
+        assert other.messages == [("thing", "valid", 1)]
+
+    run_with_broker(test)
+
+
+def test_reconnect_after_broker_restart():
+    """Channels reconnect when the broker is restarted."""
+
+    async def test(broker, receivers):
+        publisher, other = receivers
+        await broker.stop()
+
+        assert not os.path.exists(broker.path)
+
+        await broker.start()
+
+        def publish():
+            publisher.channel.publish("thing", KIND, "name", 1)
+            return len(other.messages) > 0
+
+        async def publish_until_received():
+            while not publish():
+                await asyncio.sleep(0.05)
+
+        await asyncio.wait_for(publish_until_received(), timeout=5)
+
+    run_with_broker(test)
@@ -7,20 +7,29 @@ CLI for the WoT runtime that handles servient configuration and execution of WoT
 
 import argparse
 import asyncio
+import atexit
 import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
 import time
 import yaml
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
+import tornado.process
 from tornado.httpclient import HTTPClientError
 from tornado.ioloop import PeriodicCallback
 
-from wotpy.functions import functions
 from wotpy.cli.default_servient import DefaultServient
 from wotpy.utils.proxy import build_prop_read_proxy, build_prop_write_proxy,\
     build_action_invoke_proxy, subscribe_event
+from wotpy.wot.shared_state import SharedStateBroker, SharedStateChannel
 
-def create_proxy_functions(consumed_vos, proxy_dict, exposed_thing):
+def create_proxy_functions(consumed_vos, proxy_dict, exposed_thing, proxy_events=True):
     """
     Creates proxy functions that propagate interactions with properties, actions
     and events to another thing. The operations that are proxied are:
@@ -54,7 +63,7 @@ def create_proxy_functions(consumed_vos, proxy_dict, exposed_thing):
                 build_action_invoke_proxy(consumed_vos[target_vo], action)
             )
 
-    if "eventsMap" in proxy_dict and proxy_dict["eventsMap"] is not None:
+    if proxy_events and "eventsMap" in proxy_dict and proxy_dict["eventsMap"] is not None:
         for event, target_vo in proxy_dict["eventsMap"].items():
             subscribe_event(consumed_vos[target_vo], exposed_thing, event)
 
@@ -114,7 +123,7 @@ async def subscribe_remote_events(consumed_vos, consumed_vos_dict, module):
                 on_error=on_error_handler
             )
 
-async def map_user_defined_code(TD, exposed_thing, module):
+async def map_user_defined_code(TD, exposed_thing, module, subscribe_handlers=True):
     """
     Maps the following user-defined code to the corresponding WoT constructs:
 
@@ -158,7 +167,7 @@ async def map_user_defined_code(TD, exposed_thing, module):
         on_completed_handler = getattr(module, on_completed_handler_name, None)
         on_error_handler = getattr(module, on_error_handler_name, None)
 
-        if on_next_handler is not None:
+        if subscribe_handlers and on_next_handler is not None:
             exposed_thing.properties[proprty].subscribe(
                 on_next=on_next_handler,
                 on_completed=on_completed_handler,
@@ -181,7 +190,7 @@ async def map_user_defined_code(TD, exposed_thing, module):
         on_completed_handler = getattr(module, on_completed_handler_name, None)
         on_error_handler = getattr(module, on_error_handler_name, None)
 
-        if on_next_handler is not None:
+        if subscribe_handlers and on_next_handler is not None:
             exposed_thing.events[event].subscribe(
                 on_next=on_next_handler,
                 on_completed=on_completed_handler,
@@ -202,19 +211,40 @@ def schedule_periodic_functions(periodic_function_data, module):
 def inject_generic_function(generic_function_data, module):
     """Inject generic function in the user-defined module's functions"""
 
+    if not generic_function_data:
+        return
+
+    from wotpy.functions import functions
+
     for generic_function in generic_function_data:
         function = getattr(functions, generic_function)
         setattr(module, generic_function, function)
 
-async def run_script(thing_description_path, script_path, config_path):
-    """Creates a Servient based on the config file and initializes the WoT runtime"""
+def load_config(config_path):
+    """Loads the YAML config file (if any) and returns it as a dict."""
 
     config = {}
     if config_path is not None:
         with open(config_path, "r") as config_file:
-            config = yaml.safe_load(config_file)
+            config = yaml.safe_load(config_file) or {}
+
+    return config
+
+async def run_script(thing_description_path, script_path, config_path,
+                     worker_id=None, shared_state_path=None):
+    """Creates a Servient based on the config file and initializes the WoT runtime.
+    When running as one of multiple workers, the remote event subscriptions,
+    user-defined subscription handlers and periodic functions are only
+    set up on the primary worker (worker_id 0)."""
 
-    default_servient = DefaultServient(config)
+    config = load_config(config_path)
+    is_primary = worker_id is None or worker_id == 0
+
+    shared_state_channel = SharedStateChannel(shared_state_path) \
+        if shared_state_path is not None else None
+
+    default_servient = DefaultServient(
+        config, worker_id=worker_id, shared_state_channel=shared_state_channel)
     wot = await default_servient.start()
 
     # Dynamically loads the python script with the user-defined code
@@ -242,10 +272,11 @@ async def run_script(thing_description_path, script_path, config_path):
         credentials_dict = None
     consumed_vos_dict = default_servient.config.get("consumedVOs", {})
     consumed_vos = await consume_vos(consumed_vos_dict, wot, credentials_dict)
-    await subscribe_remote_events(consumed_vos, consumed_vos_dict, module)
+    if is_primary:
+        await subscribe_remote_events(consumed_vos, consumed_vos_dict, module)
 
     proxy_data = default_servient.config.get("proxy", {})
-    create_proxy_functions(consumed_vos, proxy_data, exposed_thing)
+    create_proxy_functions(consumed_vos, proxy_data, exposed_thing, proxy_events=is_primary)
 
     generic_function_data = default_servient.config.get("genericFunction", [])
     inject_generic_function(generic_function_data, module)
@@ -254,21 +285,103 @@ async def run_script(thing_description_path, script_path, config_path):
     module.exposed_thing = exposed_thing
     module.consumed_vos = consumed_vos
 
-    await map_user_defined_code(TD, exposed_thing, module)
+    await map_user_defined_code(TD, exposed_thing, module, subscribe_handlers=is_primary)
 
     exposed_thing.expose()
 
-    periodic_function_data = default_servient.config.get("periodicFunction", {})
-    schedule_periodic_functions(periodic_function_data, module)
+    if is_primary:
+        periodic_function_data = default_servient.config.get("periodicFunction", {})
+        schedule_periodic_functions(periodic_function_data, module)
+
+def build_event_loop(use_uvloop=False, executor_workers=None, slow_callback_ms=None):
+    """Creates the event loop of the WoT runtime and sets it as the current loop.
+    Uses uvloop when requested and available, sets the size of the default
+    executor and, when a slow callback threshold is given, enables the loop
+    debug mode to log callbacks that take longer than the threshold."""
+
+    loop = None
+
+    if use_uvloop:
+        try:
+            import uvloop
+            loop = uvloop.new_event_loop()
+        except ImportError:
+            logging.getLogger(__name__).warning("Cannot use uvloop (cannot import package)")
+
+    loop = loop if loop is not None else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    if executor_workers:
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=executor_workers))
+
+    if slow_callback_ms is not None:
+        loop.set_debug(True)
+        loop.slow_callback_duration = slow_callback_ms / 1000
+
+    return loop
+
+def run_workers(num_workers, loop_options, thing_description_path, script_path, config_path):
+    """Forks a shared state broker process and the given number of servient worker
+    processes. The workers serve HTTP requests on the same ports (SO_REUSEPORT)
+    and keep their ExposedThing state consistent through the broker.
+    The directory of the broker socket is removed when the parent process exits."""
+
+    shared_state_dir = tempfile.mkdtemp(prefix="wotpy-")
+    shared_state_path = os.path.join(shared_state_dir, "state.sock")
+    parent_pid = os.getpid()
+
+    def remove_shared_state_dir():
+        if os.getpid() == parent_pid:
+            shutil.rmtree(shared_state_dir, ignore_errors=True)
+
+    atexit.register(remove_shared_state_dir)
+
+    # Exit on SIGTERM so that the exit handlers run in the parent process
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    task_id = tornado.process.fork_processes(num_workers + 1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    loop = build_event_loop(**loop_options)
+
+    if task_id == 0:
+        broker = SharedStateBroker(shared_state_path)
+        loop.run_until_complete(broker.start())
+    else:
+        loop.create_task(run_script(
+            thing_description_path, script_path, config_path,
+            worker_id=task_id - 1, shared_state_path=shared_state_path))
+
+    loop.run_forever()
 
 def main():
     parser = argparse.ArgumentParser(description="Run a WoT script optionally preconfigured by a config file.")
     parser.add_argument("script", help="user python script file")
     parser.add_argument("-f", "--config-file", help="path to the configuration file")
     parser.add_argument("-t", "--thing-description", help="path to the thing description")
+    parser.add_argument("-w", "--workers", type=int, help="number of servient worker processes")
+    parser.add_argument("--uvloop", action="store_true", default=None, help="use uvloop if available")
+    parser.add_argument("--executor-workers", type=int, help="size of the default executor of the event loop")
+    parser.add_argument("--slow-callback-ms", type=float, help="log event loop callbacks slower than this")
     args = parser.parse_args()
 
-    loop = asyncio.get_event_loop()
+    runtime_config = load_config(args.config_file).get("runtime") or {}
+    num_workers = args.workers if args.workers else runtime_config.get("workers", 1)
+
+    def runtime_option(arg_value, config_key):
+        return arg_value if arg_value is not None else runtime_config.get(config_key)
+
+    loop_options = {
+        "use_uvloop": bool(runtime_option(args.uvloop, "uvloop")),
+        "executor_workers": runtime_option(args.executor_workers, "executorWorkers"),
+        "slow_callback_ms": runtime_option(args.slow_callback_ms, "slowCallbackMs")
+    }
+
+    if num_workers > 1:
+        run_workers(num_workers, loop_options, args.thing_description, args.script, args.config_file)
+        return
+
+    loop = build_event_loop(**loop_options)
     loop.create_task(run_script(args.thing_description, args.script, args.config_file))
     loop.run_forever()
 
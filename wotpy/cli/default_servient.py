@@ -6,16 +6,12 @@ Default Servient class
 """
 
 import logging
-import ssl
 import urllib.parse
 
 from wotpy.utils.utils import dict_merge
 from wotpy.protocols.http.client import HTTPClient
 from wotpy.protocols.http.server import HTTPServer
-from wotpy.protocols.coap.client import CoAPClient
-from wotpy.protocols.coap.server import CoAPServer
-from wotpy.protocols.mqtt.client import MQTTClient
-from wotpy.protocols.mqtt.server import MQTTServer
+from wotpy.protocols.http.tls import ALPN_PROTOCOLS, build_server_ssl_context
 from wotpy.wot.servient import Servient
 
 
@@ -26,6 +22,12 @@ class DefaultServient(Servient):
         "type": "VO",
         "deploymentType": "A",
         "catalogue": 9090,
+        "runtime": {
+            "workers": 1,
+            "uvloop": False,
+            "executorWorkers": None,
+            "slowCallbackMs": None
+        },
         "bindingNB": {
             "bindingModeNB": ["U", "H"],
             "hostname": None,
@@ -36,7 +38,15 @@ class DefaultServient(Servient):
             "brokerIP": None,
             "serverCert": None,
             "serverKey": None,
+            "http2": False,
+            "compressionMinLength": 1024,
+            "tls": {
+                "sessionTickets": True,
+                "numTickets": 2,
+                "minVersion": None
+            },
             "mqttCAFile": None,
+            "mqttSharedGroup": None,
             "OSCORECredentialsMap": None,
             "securityNB": {
                 "securityScheme": "nosec",
@@ -47,6 +57,14 @@ class DefaultServient(Servient):
         },
         "bindingSB": {
             "bindingModeSB": None,
+            "contentTypeSB": "application/json",
+            "httpClient": {
+                "backend": None,
+                "maxClients": 100,
+                "maxClientsPerHost": None,
+                "maxStreams": 100,
+                "http2": False
+            },
             "mqttCAFile": None,
             "OSCORECredentialsMap": None,
             "securitySB": {
@@ -86,7 +104,13 @@ class DefaultServient(Servient):
         }
     }
 
-    def __init__(self, config):
+    def __init__(self, config, worker_id=None, shared_state_channel=None):
+        """When running as one of multiple worker processes (worker_id is not None)
+        the HTTP server shares its port with the other workers, while the TD catalogue
+        and the CoAP and MQTT servers only run on the primary worker (worker_id 0).
+        When mqttSharedGroup is set the MQTT server runs on every worker and the
+        requests are balanced by the broker, but only the primary publishes updates."""
+
         self._logr = logging.getLogger(__name__)
 
         default_config = dict(self.DEFAULT_CONFIG)
@@ -94,6 +118,8 @@ class DefaultServient(Servient):
         self.config = default_config
 
         vo_name = self.config["name"]
+        reuse_port = worker_id is not None
+        is_primary = worker_id is None or worker_id == 0
 
         servers = []
         server_bindings_north = self.config["bindingNB"]
@@ -122,18 +148,32 @@ class DefaultServient(Servient):
             ssl_context = None
             if server_bindings_north["serverCert"] is not None and\
                 server_bindings_north["serverKey"] is not None:
-                certfile = server_bindings_north["serverCert"]
-                keyfile = server_bindings_north["serverKey"]
+                tls_config = server_bindings_north["tls"]
+
+                ssl_context = build_server_ssl_context(
+                    certfile=server_bindings_north["serverCert"],
+                    keyfile=server_bindings_north["serverKey"],
+                    session_tickets=tls_config["sessionTickets"],
+                    num_tickets=tls_config["numTickets"],
+                    min_version=tls_config["minVersion"],
+                    alpn_protocols=ALPN_PROTOCOLS if server_bindings_north["http2"] else None)
+
+            http2 = server_bindings_north["http2"]
 
-                ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-                ssl_context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+            if http2 and ssl_context is None:
+                self._logr.warning("HTTP/2 requires a server certificate: serving HTTP/1.1")
+                http2 = False
 
             servers.append(HTTPServer(
                 port=port, security_scheme=security_scheme,
-                ssl_context=ssl_context, form_port=proxy_port
+                ssl_context=ssl_context, form_port=proxy_port,
+                reuse_port=reuse_port, http2=http2,
+                compression_min_length=server_bindings_north["compressionMinLength"]
             ))
 
-        if "U" in binding_modes_north:
+        if "U" in binding_modes_north and is_primary:
+            from wotpy.protocols.coap.server import CoAPServer
+
             port = int(server_bindings_north["ports"]["coapPort"])
 
             oscore_credentials_map_north = None
@@ -145,7 +185,11 @@ class DefaultServient(Servient):
                 security_scheme=security_scheme,
                 oscore_credentials_map=oscore_credentials_map_north))
 
-        if "M" in binding_modes_north:
+        mqtt_shared_group = server_bindings_north["mqttSharedGroup"]
+
+        if "M" in binding_modes_north and (is_primary or mqtt_shared_group):
+            from wotpy.protocols.mqtt.server import MQTTServer
+
             broker_url = server_bindings_north["brokerIP"]
 
             mqtt_ca_file_north = None
@@ -156,9 +200,12 @@ class DefaultServient(Servient):
                 url_parts = list(urllib.parse.urlparse(broker_url))
                 url_parts[1] = f"{username_north}:{password_north}@{url_parts[1]}"
                 broker_url = urllib.parse.urlunparse(url_parts)
-            servers.append(MQTTServer(broker_url, ca_file=mqtt_ca_file_north))
+            servers.append(MQTTServer(
+                broker_url, ca_file=mqtt_ca_file_north,
+                shared_subscription_group=mqtt_shared_group,
+                publish_updates=is_primary))
 
-        catalogue_port = int(self.config["catalogue"])
+        catalogue_port = int(self.config["catalogue"]) if is_primary else None
         server_bindings_south = self.config["bindingSB"]
         binding_modes_south = server_bindings_south["bindingModeSB"]\
             if server_bindings_south["bindingModeSB"] is not None else []
@@ -170,7 +217,14 @@ class DefaultServient(Servient):
 
         clients = []
         if "H" in binding_modes_south:
-            http_client = HTTPClient()
+            http_client_config = server_bindings_south["httpClient"]
+            http_client = HTTPClient(
+                backend=http_client_config["backend"],
+                max_clients=http_client_config["maxClients"],
+                max_clients_per_host=http_client_config["maxClientsPerHost"],
+                max_streams=http_client_config["maxStreams"],
+                http2=http_client_config["http2"],
+                content_type=server_bindings_south["contentTypeSB"])
             credentials_dict_south = {}
             security_scheme_dict = {
                 "scheme": security_south_http["securityScheme"]
@@ -189,10 +243,14 @@ class DefaultServient(Servient):
             clients.append(http_client)
 
         if "U" in binding_modes_south:
+            from wotpy.protocols.coap.client import CoAPClient
+
             oscore_credentials_map_south = None
             if server_bindings_south["OSCORECredentialsMap"] is not None:
                 oscore_credentials_map_south = server_bindings_south["OSCORECredentialsMap"]
-            coap_client = CoAPClient(credentials=oscore_credentials_map_south)
+            coap_client = CoAPClient(
+                credentials=oscore_credentials_map_south,
+                content_type=server_bindings_south["contentTypeSB"])
 
             credentials_dict_south = {}
             security_scheme_dict = {
@@ -209,6 +267,8 @@ class DefaultServient(Servient):
             clients.append(coap_client)
 
         if "M" in binding_modes_south:
+            from wotpy.protocols.mqtt.client import MQTTClient
+
             mqtt_ca_file_south = None
             if server_bindings_south["mqttCAFile"] is not None:
                 mqtt_ca_file_north = server_bindings_south["mqttCAFile"]
@@ -228,7 +288,8 @@ class DefaultServient(Servient):
         self._logr.info("Creating servient with TD catalogue on: %s", catalogue_port)
         super().__init__(hostname=hostname, clients=clients, catalogue_port=catalogue_port,
             influxdb_enabled=influxdb_enabled, influxdb_token=influxdb_token,
-            influxdb_url=influxdb_url, sqlite_db_path=sqlite_db_path)
+            influxdb_url=influxdb_url, sqlite_db_path=sqlite_db_path,
+            shared_state_channel=shared_state_channel)
 
         for server in servers:
             self.add_server(server)
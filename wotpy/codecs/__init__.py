@@ -8,7 +8,9 @@ Classes to serialize and deserialize messages.
     :toctree: _codecs
 
     wotpy.codecs.base
+    wotpy.codecs.cbor_codec
     wotpy.codecs.enums
     wotpy.codecs.json_codec
     wotpy.codecs.text
+    wotpy.codecs.utils
 """
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Class that implements the CBOR codec.
+"""
+
+import importlib.util
+
+from wotpy.codecs.base import BaseCodec
+from wotpy.codecs.enums import MediaTypes
+
+
+def cbor_available():
+    """Returns True if the cbor2 library is installed."""
+
+    return importlib.util.find_spec("cbor2") is not None
+
+
+class CborCodec(BaseCodec):
+    """CBOR (RFC 8949) codec class.
+    Depends on the optional cbor2 library."""
+
+    def __init__(self):
+        import cbor2
+        self._loads = cbor2.loads
+        self._dumps = cbor2.dumps
+
+    @property
+    def media_types(self):
+        """Returns the CBOR media types."""
+
+        return [MediaTypes.CBOR]
+
+    def to_value(self, value):
+        """Takes an encoded CBOR bytes string and decodes it to a Python object."""
+
+        if isinstance(value, str):
+            raise ValueError("CBOR content must be a bytes string")
+
+        return self._loads(value)
+
+    def to_bytes(self, value):
+        """Takes an object and serializes it to a CBOR bytes string."""
+
+        return self._dumps(value)
@@ -12,4 +12,14 @@ class MediaTypes(EnumListMixin):
     """Enumeration of media types."""
 
     JSON = "application/json"
+    CBOR = "application/cbor"
     TEXT = "text/plain"
+    EVENT_STREAM = "text/event-stream"
+
+
+class JsonBackends(EnumListMixin):
+    """Enumeration of the libraries that may be used to encode and decode JSON."""
+
+    ORJSON = "orjson"
+    MSGSPEC = "msgspec"
+    STDLIB = "json"
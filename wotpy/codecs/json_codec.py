@@ -5,14 +5,86 @@
 Class that implements the JSON codec.
 """
 
+import importlib.util
 import json
+import os
 
 from wotpy.codecs.base import BaseCodec
-from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.enums import MediaTypes, JsonBackends
+
+ENV_JSON_BACKEND = "WOTPY_JSON_BACKEND"
+
+
+def _stdlib_dumps(value):
+    """Serializes the given object to UTF8 JSON bytes with the standard library."""
+
+    return json.dumps(value).encode("utf8")
+
+
+def _build_backend(backend):
+    """Returns the pair of (loads, dumps) functions for the given JSON backend.
+    The dumps function always returns UTF8 bytes."""
+
+    if backend == JsonBackends.ORJSON:
+        import orjson
+
+        def dumps(value):
+            try:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                return _stdlib_dumps(value)
+
+        return orjson.loads, dumps
+
+    if backend == JsonBackends.MSGSPEC:
+        import msgspec
+
+        encoder = msgspec.json.Encoder()
+        decoder = msgspec.json.Decoder()
+
+        def loads(value):
+            return decoder.decode(value.encode("utf8") if isinstance(value, str) else value)
+
+        def dumps(value):
+            try:
+                return encoder.encode(value)
+            except TypeError:
+                return _stdlib_dumps(value)
+
+        return loads, dumps
+
+    if backend == JsonBackends.STDLIB:
+        return json.loads, _stdlib_dumps
+
+    raise ValueError("Unknown JSON backend: {}".format(backend))
+
+
+def default_json_backend():
+    """Returns the JSON backend selected with the WOTPY_JSON_BACKEND
+    environment variable or else the fastest available library."""
+
+    if os.environ.get(ENV_JSON_BACKEND):
+        return os.environ.get(ENV_JSON_BACKEND)
+
+    return next((
+        backend for backend in (JsonBackends.ORJSON, JsonBackends.MSGSPEC)
+        if importlib.util.find_spec(backend) is not None
+    ), JsonBackends.STDLIB)
 
 
 class JsonCodec(BaseCodec):
-    """JSON codec class."""
+    """JSON codec class.
+    Uses orjson or msgspec when available and falls back to the standard library."""
+
+    def __init__(self, backend=None):
+        self._backend = backend if backend else default_json_backend()
+        self._loads, self._dumps = _build_backend(self._backend)
+
+    @property
+    def backend(self):
+        """Returns the name of the library used by this codec."""
+
+        return self._backend
 
     @property
     def media_types(self):
@@ -24,11 +96,12 @@ class JsonCodec(BaseCodec):
         """Takes an encoded value from a request that may be an UTF8 bytes
         or unicode JSON string and deserializes it to a Python object."""
 
-        return json.loads(value)
+        return self._loads(value)
 
     def to_bytes(self, value):
         """Takes an object and serializes it to an UTF8 bytes JSON string."""
 
-        json_str = json.dumps(value)
+        return self._dumps(value)
+
 
-        return json_str if isinstance(json_str, bytes) else json_str.encode('utf8')
+JSON_CODEC = JsonCodec()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Utility functions to select codecs by media type.
+"""
+
+from wotpy.codecs.cbor_codec import CborCodec, cbor_available
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.codecs.text import TextCodec
+
+STRUCTURED_MEDIA_TYPES = [MediaTypes.JSON, MediaTypes.CBOR]
+
+
+def default_codecs():
+    """Returns the list of codecs that are registered by default in the protocol servers.
+    The CBOR codec is only included when the cbor2 library is installed."""
+
+    codecs = [JSON_CODEC, TextCodec()]
+
+    if cbor_available():
+        codecs.append(CborCodec())
+
+    return codecs
+
+
+def parse_media_type(value):
+    """Returns the lowercase media type of a Content-Type
+    or Accept value without its parameters (e.g. charset)."""
+
+    if not value:
+        return None
+
+    return value.split(";")[0].strip().lower()
+
+
+def parse_accept(value):
+    """Parses an HTTP Accept header and returns the list
+    of media types sorted by decreasing quality value."""
+
+    if not value:
+        return []
+
+    entries = []
+
+    for idx, item in enumerate(value.split(",")):
+        parts = item.split(";")
+        quality = 1.0
+
+        for param in parts[1:]:
+            key, _, val = param.partition("=")
+
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(val)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0 and parts[0].strip():
+            entries.append((-quality, idx, parts[0].strip().lower()))
+
+    return [media_type for _, _, media_type in sorted(entries)]
@@ -8,12 +8,14 @@ Generic function definitions.
 import time
 import datetime
 
-import pandas as pd
-import pmdarima as pm
 import tornado.httpclient
 
 
 async def forecasting(exposed_thing, property_name):
+    # pandas and pmdarima are heavy to import and only needed for forecasting
+    import pandas as pd
+    import pmdarima as pm
+
     servient = exposed_thing.servient
 
     query = 'from(bucket:"{}")\
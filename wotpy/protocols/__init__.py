@@ -14,6 +14,8 @@ Implementations of the supported Protocol Binding templates.
     wotpy.protocols.client
     wotpy.protocols.enums
     wotpy.protocols.exceptions
+    wotpy.protocols.oauth2
     wotpy.protocols.server
+    wotpy.protocols.tokens
     wotpy.protocols.utils
 """
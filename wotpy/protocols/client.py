@@ -32,6 +32,12 @@ class BaseProtocolClient(metaclass=ABCMeta):
 
         raise NotImplementedError()
 
+    async def close(self):
+        """Releases the connections held by this client.
+        Called when the servient shuts down."""
+
+        pass
+
     @abstractmethod
     def invoke_action(self, td, name, input_value, timeout=None):
         """Invokes an Action on a remote Thing.
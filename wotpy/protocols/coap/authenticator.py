@@ -5,17 +5,25 @@
 Authenticator classes that perform checks on the incoming requests.
 """
 
+import hashlib
+import inspect
 from base64 import b64decode
 from abc import ABCMeta, abstractmethod
 
+from wotpy.protocols.oauth2 import TokenIntrospector
+from wotpy.utils.cache import TTLCache
 from wotpy.wot.enums import SecuritySchemeType
 
 class BaseAuthenticator(metaclass=ABCMeta):
     """This is the base authenticator class describing
     the authentication interface."""
 
+    CACHE_SIZE = 1024
+    CACHE_TTL_SECS = 30
+
     def __init__(self, security_scheme_dict):
         self._security_scheme_dict = security_scheme_dict
+        self._verified = TTLCache(self.CACHE_SIZE, self.CACHE_TTL_SECS)
 
     @abstractmethod
     def authenticate(self, server_creds, request):
@@ -23,6 +31,38 @@ class BaseAuthenticator(metaclass=ABCMeta):
 
         raise NotImplementedError()
 
+    def request_credentials(self, request):
+        """Returns the raw credentials contained in the request as bytes.
+        Returns None if the result of checking the request should not be cached."""
+
+        return None
+
+    async def verify(self, server_creds, request, scope=None):
+        """Checks the credentials of a request, remembering the successful checks for a short time.
+        The scope identifies the server credentials the request was checked against
+        (e.g. the Thing name and the version of the servient credential store).
+        Only a digest of the request credentials is kept in the cache.
+        Authenticators may implement authenticate as a coroutine."""
+
+        raw_creds = self.request_credentials(request)
+
+        if raw_creds is None:
+            valid = self.authenticate(server_creds, request)
+            return (await valid) if inspect.isawaitable(valid) else valid
+
+        key = (scope, hashlib.blake2b(raw_creds, digest_size=16).digest())
+
+        if self._verified.get(key, False):
+            return True
+
+        valid = self.authenticate(server_creds, request)
+        valid = (await valid) if inspect.isawaitable(valid) else valid
+
+        if valid:
+            self._verified.set(key, True)
+
+        return valid
+
     @classmethod
     def build(cls, security_scheme_dict):
         """Builds an instance of the appropriate subclass for the given SecurityScheme."""
@@ -78,6 +118,13 @@ class ComboSecurityAuthenticator(BaseAuthenticator):
 class BasicSecurityAuthenticator(BaseAuthenticator):
     """Basic username and password authenticator."""
 
+    def request_credentials(self, request):
+        """Returns the raw value of the authorization option."""
+
+        option = request.opt.get_option(2048)
+
+        return bytes(option[0].value) if option else None
+
     def authenticate(self, server_creds, request):
         """Checks the credentials of a request."""
 
@@ -141,7 +188,24 @@ class PSKSecurityAuthenticator(BaseAuthenticator):
 class OAuth2SecurityAuthenticator(BaseAuthenticator):
     """OAuth2 authenticator."""
 
-    def authenticate(self, server_creds, request):
-        """Checks the credentials of a request."""
+    def __init__(self, security_scheme_dict):
+        super().__init__(security_scheme_dict)
+        self._endpoint = security_scheme_dict.get("endpoint", None)
+        self._introspector = TokenIntrospector.for_endpoint(self._endpoint)
 
-        raise NotImplementedError()
+    async def authenticate(self, server_creds, request):
+        """Checks the bearer token of a request with the introspection endpoint
+        provided in the constructor. Introspection results are cached and shared
+        with the authenticators of the other bindings."""
+
+        option = request.opt.get_option(2048)
+        if not option:
+            return False
+
+        auth_header = bytes(option[0].value)
+        if not auth_header.startswith(b"Bearer "):
+            return False
+
+        token = auth_header.replace(b"Bearer ", b"").decode("utf8")
+
+        return await self._introspector.is_active(token)
@@ -14,28 +14,91 @@ from urllib.parse import urlparse
 import aiocoap
 import reactivex
 
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.codecs.utils import STRUCTURED_MEDIA_TYPES, default_codecs
 from wotpy.protocols.client import BaseProtocolClient
-from wotpy.protocols.coap.enums import CoAPSchemes
+from wotpy.protocols.coap.enums import CoAPSchemes, CoAPContentFormats
 from wotpy.protocols.coap.credential import BaseCredential
 from wotpy.protocols.enums import Protocols, InteractionVerbs
 from wotpy.protocols.exceptions import FormNotFoundException, ProtocolClientException, ClientRequestTimeout
-from wotpy.protocols.utils import is_scheme_form
+from wotpy.protocols.utils import is_scheme_form, memoized_pick, memoized_content_type
 from wotpy.utils.utils import handle_observer_finalization
+from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.events import PropertyChangeEventInit, PropertyChangeEmittedEvent, EmittedEvent
 
 
 # noinspection PyCompatibility
 class CoAPClient(BaseProtocolClient):
-    """Implementation of the protocol client interface for the CoAP protocol."""
+    """Implementation of the protocol client interface for the CoAP protocol.
+    All requests and observations share one aiocoap client context, which is
+    created on the first request and only recreated when the context itself fails."""
+
+    CONTEXT_ERRORS = (aiocoap.error.LibraryShutdown, OSError)
+
+    def __init__(self, credentials=None, content_type=MediaTypes.JSON):
+        self._codecs = {codec.media_types[0]: codec for codec in default_codecs()}
+
+        if content_type not in STRUCTURED_MEDIA_TYPES or content_type not in self._codecs:
+            raise ValueError("Unsupported content type: {}".format(content_type))
 
-    def __init__(self, credentials=None):
         self._logr = logging.getLogger(__name__)
         self._credentials = credentials
+        self._content_type = content_type
         self._coap_client = None
         self._client_lock = asyncio.Lock()
         self._credential = None
         super().__init__()
 
+    async def _get_coap_client(self):
+        """Returns the aiocoap client context shared by all the requests, creating it if needed."""
+
+        async with self._client_lock:
+            if self._coap_client is None:
+                self._logr.debug("Creating CoAP client context")
+
+                coap_client = await aiocoap.Context.create_client_context()
+
+                if self._credentials:
+                    with open(self._credentials, "rb") as file:
+                        coap_client.client_credentials.load_from_dict(json.load(file))
+
+                self._coap_client = coap_client
+
+            return self._coap_client
+
+    async def _reset_coap_client(self, coap_client):
+        """Shuts down a failed client context so that the next request creates a new one."""
+
+        async with self._client_lock:
+            if self._coap_client is not coap_client:
+                return
+
+            self._coap_client = None
+
+        self._logr.debug("Shutting down CoAP client context")
+
+        try:
+            await coap_client.shutdown()
+        except Exception as ex:
+            self._logr.warning("Error shutting down CoAP client context: {}".format(ex))
+
+    async def _reset_on_context_error(self, coap_client, ex):
+        """Resets the client context when the error means that it can no longer be used:
+        the library was shut down or the socket failed. Timeouts, exceeded retransmissions
+        and resolution errors only affect one request, so the context is kept."""
+
+        cause = ex.__cause__ if isinstance(ex, aiocoap.error.NetworkError) else ex
+
+        if isinstance(cause, self.CONTEXT_ERRORS) and not isinstance(cause, TimeoutError):
+            await self._reset_coap_client(coap_client)
+
+    async def close(self):
+        """Shuts down the client context shared by all the requests."""
+
+        if self._coap_client is not None:
+            await self._reset_coap_client(self._coap_client)
+
     @classmethod
     def _pick_coap_href(cls, td, forms, op=None):
         """Picks the most appropriate CoAP form href from the given list of forms."""
@@ -58,6 +121,38 @@ class CoAPClient(BaseProtocolClient):
 
         return form_coaps if form_coaps is not None else find_href(CoAPSchemes.COAP)
 
+    @property
+    def content_type(self):
+        """Preferred media type of the request and response payloads.
+        JSON is used for the Interactions that do not have a Form with this content type."""
+
+        return self._content_type
+
+    def _pick_content_format(self, td, intrct_type, name):
+        """Returns the Content-Format number that will be used to exchange data with the given Interaction."""
+
+        if self._content_type == MediaTypes.JSON:
+            return CoAPContentFormats.JSON
+
+        media_type = memoized_content_type(
+            td, intrct_type, name, CoAPSchemes.list(), self._content_type)
+
+        return CoAPContentFormats.from_media_type(media_type)
+
+    def _encode_payload(self, content_format, value):
+        """Encodes the given value with the codec for the Content-Format number."""
+
+        return self._codecs[CoAPContentFormats.to_media_type(content_format)].to_bytes(value)
+
+    def _decode_payload(self, response):
+        """Decodes the payload of a CoAP response with the codec for its Content-Format (JSON by default)."""
+
+        content_format = response.opt.content_format
+        media_type = CoAPContentFormats.to_media_type(content_format) if content_format is not None else None
+        codec = self._codecs.get(media_type, JSON_CODEC)
+
+        return codec.to_value(response.payload)
+
     @classmethod
     def _assert_success(cls, res):
         """Asserts that the given CoAP response was successful and raises an Exception if not."""
@@ -65,9 +160,10 @@ class CoAPClient(BaseProtocolClient):
         if not res.code.is_successful():
             raise ProtocolClientException("Unsuccessful CoAP response: {}".format(res))
 
-    def _build_subscribe(self, href, next_item_builder):
+    def _build_subscribe(self, href, content_format, next_item_builder):
         """Builds the subscribe function that should be passed when
-        constructing an Observable linked to an observable CoAP resurce."""
+        constructing an Observable linked to an observable CoAP resurce.
+        The next_item_builder function takes each CoAP response and returns the next item."""
 
         def subscribe(observer, scheduler):
             """Subscription function to observe resources using the CoAP protocol."""
@@ -82,15 +178,12 @@ class CoAPClient(BaseProtocolClient):
 
             @handle_observer_finalization(observer)
             async def callback():
-                self._logr.debug("Creating CoAP client for observation: {}".format(query))
+                self._logr.debug("Starting CoAP observation: {}".format(query))
 
-                coap_client = await aiocoap.Context.create_client_context()
-                if self._credentials:
-                    with open(self._credentials, "rb") as file:
-                        coap_client.client_credentials.load_from_dict(json.load(file))
+                coap_client = await self._get_coap_client()
 
                 try:
-                    msg = aiocoap.Message(code=aiocoap.Code.GET, uri=href, observe=0)
+                    msg = aiocoap.Message(code=aiocoap.Code.GET, uri=href, observe=0, accept=content_format)
                     state["request"] = coap_client.request(await self.sign_request(msg))
 
                     self._logr.debug("Sending observation request: {}".format(msg))
@@ -100,7 +193,7 @@ class CoAPClient(BaseProtocolClient):
                     first_resp = await future_first_resp
                     state["pending"] = None
                     self._assert_success(first_resp)
-                    next_item = next_item_builder(first_resp.payload)
+                    next_item = next_item_builder(first_resp)
                     next_item is not None and observer.on_next(next_item)
 
                     while state["active"]:
@@ -110,12 +203,16 @@ class CoAPClient(BaseProtocolClient):
                         resp = await future_resp
                         state["pending"] = None
                         self._assert_success(resp)
-                        next_item = next_item_builder(resp.payload)
+                        next_item = next_item_builder(resp)
                         next_item is not None and observer.on_next(next_item)
 
                     self._logr.debug("Terminated subscription callback for: {}".format(query))
+                except Exception as ex:
+                    await self._reset_on_context_error(coap_client, ex)
+                    raise
                 finally:
-                    await coap_client.shutdown()
+                    if state["request"] and not state["request"].observation.cancelled:
+                        state["request"].observation.cancel()
 
             def unsubscribe():
                 self._logr.debug("Unsubscribing from: {}".format(query))
@@ -171,35 +268,52 @@ class CoAPClient(BaseProtocolClient):
 
         return request
 
-    async def _invocation_create(self, coap_client, href, input_value, timeout=None):
-        """Creates a new action invocation by sending a POST request."""
-
-        payload = json.dumps({"input": input_value}).encode("utf-8")
-        msg = aiocoap.Message(code=aiocoap.Code.POST, payload=payload, uri=href)
-        request = coap_client.request(await self.sign_request(msg))
+    @classmethod
+    async def _wait_response(cls, request, timeout=None):
+        """Waits for the response of a request. On timeout the
+        request and its observation are cancelled before raising."""
 
         try:
-            response = await asyncio.wait_for(request.response, timeout=timeout)
+            return await asyncio.wait_for(request.response, timeout=timeout)
         except asyncio.TimeoutError:
+            request.response.cancel()
+
+            if request.observation is not None and not request.observation.cancelled:
+                request.observation.cancel()
+
             raise ClientRequestTimeout
 
+    async def _invocation_create(self, coap_client, href, content_format, input_value, timeout=None):
+        """Creates a new action invocation by sending a POST request."""
+
+        payload = self._encode_payload(content_format, {"input": input_value})
+
+        msg = aiocoap.Message(
+            code=aiocoap.Code.POST, payload=payload, uri=href,
+            content_format=content_format, accept=content_format)
+
+        request = coap_client.request(await self.sign_request(msg))
+
+        response = await self._wait_response(request, timeout=timeout)
+
         self._assert_success(response)
 
-        invocation_id = json.loads(response.payload).get("id")
+        invocation_id = self._decode_payload(response).get("id")
 
         return invocation_id
 
-    async def _invocation_observe(self, coap_client, href, invocation_id, timeout=None):
+    async def _invocation_observe(self, coap_client, href, content_format, invocation_id, timeout=None):
         """Starts observing an existing action invocation by sending a GET request."""
 
-        payload = json.dumps({"id": invocation_id}).encode("utf-8")
-        msg = aiocoap.Message(code=aiocoap.Code.GET, payload=payload, uri=href, observe=0)
+        payload = self._encode_payload(content_format, {"id": invocation_id})
+
+        msg = aiocoap.Message(
+            code=aiocoap.Code.GET, payload=payload, uri=href, observe=0,
+            content_format=content_format, accept=content_format)
+
         request = coap_client.request(await self.sign_request(msg))
 
-        try:
-            response = await asyncio.wait_for(request.response, timeout=timeout)
-        except asyncio.TimeoutError:
-            raise ClientRequestTimeout
+        response = await self._wait_response(request, timeout=timeout)
 
         self._assert_success(response)
 
@@ -222,26 +336,26 @@ class CoAPClient(BaseProtocolClient):
     async def invoke_action(self, td, name, input_value, timeout=None):
         """Invokes an Action on a remote Thing."""
 
-        href = self._pick_coap_href(
-            td, td.get_action_forms(name),
-            op=InteractionVerbs.INVOKE_ACTION)
+        href = memoized_pick(
+            td, Protocols.COAP, InteractionTypes.ACTION, name,
+            self._pick_coap_href, op=InteractionVerbs.INVOKE_ACTION)
 
         if href is None:
             raise FormNotFoundException()
 
-        coap_client = await aiocoap.Context.create_client_context()
-        if self._credentials:
-            with open(self._credentials, "rb") as file:
-                coap_client.client_credentials.load_from_dict(json.load(file))
+        content_format = self._pick_content_format(td, InteractionTypes.ACTION, name)
+
+        coap_client = await self._get_coap_client()
+        request_obsv = None
 
         try:
             invocation_id = await self._invocation_create(
-                coap_client, href, input_value, timeout=timeout)
+                coap_client, href, content_format, input_value, timeout=timeout)
 
             request_obsv, response_obsv = await self._invocation_observe(
-                coap_client, href, invocation_id, timeout=timeout)
+                coap_client, href, content_format, invocation_id, timeout=timeout)
 
-            invocation_status = json.loads(response_obsv.payload)
+            invocation_status = self._decode_payload(response_obsv)
 
             now = time.time()
 
@@ -250,96 +364,97 @@ class CoAPClient(BaseProtocolClient):
                     raise ClientRequestTimeout
 
                 response_obsv = await self._invocation_next(request_obsv, timeout=timeout)
-                invocation_status = json.loads(response_obsv.payload)
-
-            if not request_obsv.observation.cancelled:
-                request_obsv.observation.cancel()
+                invocation_status = self._decode_payload(response_obsv)
 
             if invocation_status.get("error"):
                 raise Exception(invocation_status.get("error"))
             else:
                 return invocation_status.get("result")
+        except Exception as ex:
+            await self._reset_on_context_error(coap_client, ex)
+            raise
         finally:
-            await coap_client.shutdown()
+            if request_obsv is not None and not request_obsv.observation.cancelled:
+                request_obsv.observation.cancel()
 
     async def write_property(self, td, name, value, timeout=None):
         """Updates the value of a Property on a remote Thing."""
 
-        href = self._pick_coap_href(
-            td, td.get_property_forms(name),
-            op=InteractionVerbs.WRITE_PROPERTY)
+        href = memoized_pick(
+            td, Protocols.COAP, InteractionTypes.PROPERTY, name,
+            self._pick_coap_href, op=InteractionVerbs.WRITE_PROPERTY)
 
         if href is None:
             raise FormNotFoundException()
 
-        coap_client = await aiocoap.Context.create_client_context()
-        if self._credentials:
-            with open(self._credentials, "rb") as file:
-                coap_client.client_credentials.load_from_dict(json.load(file))
+        content_format = self._pick_content_format(td, InteractionTypes.PROPERTY, name)
+
+        coap_client = await self._get_coap_client()
 
         try:
-            payload = json.dumps({"value": value}).encode("utf-8")
-            msg = aiocoap.Message(code=aiocoap.Code.PUT, payload=payload, uri=href)
+            payload = self._encode_payload(content_format, {"value": value})
+
+            msg = aiocoap.Message(
+                code=aiocoap.Code.PUT, payload=payload, uri=href,
+                content_format=content_format, accept=content_format)
+
             request = coap_client.request(await self.sign_request(msg))
 
-            try:
-                response = await asyncio.wait_for(request.response, timeout=timeout)
-            except asyncio.TimeoutError:
-                raise ClientRequestTimeout
+            response = await self._wait_response(request, timeout=timeout)
 
             self._assert_success(response)
-        finally:
-            await coap_client.shutdown()
+        except Exception as ex:
+            await self._reset_on_context_error(coap_client, ex)
+            raise
 
     async def read_property(self, td, name, timeout=None):
         """Reads the value of a Property on a remote Thing."""
 
-        href = self._pick_coap_href(
-            td, td.get_property_forms(name),
-            op=InteractionVerbs.READ_PROPERTY)
+        href = memoized_pick(
+            td, Protocols.COAP, InteractionTypes.PROPERTY, name,
+            self._pick_coap_href, op=InteractionVerbs.READ_PROPERTY)
 
         if href is None:
             raise FormNotFoundException()
 
-        coap_client = await aiocoap.Context.create_client_context()
-        if self._credentials:
-            with open(self._credentials, "rb") as file:
-                coap_client.client_credentials.load_from_dict(json.load(file))
+        content_format = self._pick_content_format(td, InteractionTypes.PROPERTY, name)
+
+        coap_client = await self._get_coap_client()
 
         try:
-            msg = aiocoap.Message(code=aiocoap.Code.GET, uri=href)
+            msg = aiocoap.Message(code=aiocoap.Code.GET, uri=href, accept=content_format)
             request = coap_client.request(await self.sign_request(msg))
 
-            try:
-                response = await asyncio.wait_for(request.response, timeout=timeout)
-            except asyncio.TimeoutError:
-                raise ClientRequestTimeout
+            response = await self._wait_response(request, timeout=timeout)
 
             self._assert_success(response)
 
-            prop_value = json.loads(response.payload).get("value")
+            prop_value = self._decode_payload(response).get("value")
 
             return prop_value
-        finally:
-            await coap_client.shutdown()
+        except Exception as ex:
+            await self._reset_on_context_error(coap_client, ex)
+            raise
 
     def on_property_change(self, td, name):
         """Subscribes to property changes on a remote Thing.
         Returns an Observable"""
 
-        href = self._pick_coap_href(
-            td, td.get_property_forms(name),
-            op=InteractionVerbs.OBSERVE_PROPERTY)
+        href = memoized_pick(
+            td, Protocols.COAP, InteractionTypes.PROPERTY, name,
+            self._pick_coap_href, op=InteractionVerbs.OBSERVE_PROPERTY)
 
         if href is None:
             raise FormNotFoundException()
 
-        def next_item_builder(payload):
-            value = json.loads(payload).get("value")
+        content_format = self._pick_content_format(td, InteractionTypes.PROPERTY, name)
+
+        def next_item_builder(response):
+            value = self._decode_payload(response).get("value")
             init = PropertyChangeEventInit(name=name, value=value)
             return PropertyChangeEmittedEvent(init=init)
 
-        subscribe = self._build_subscribe(href, next_item_builder)
+        subscribe = self._build_subscribe(href, content_format, next_item_builder)
 
         # noinspection PyUnresolvedReferences
         return reactivex.create(subscribe)
@@ -348,21 +463,23 @@ class CoAPClient(BaseProtocolClient):
         """Subscribes to an event on a remote Thing.
         Returns an Observable."""
 
-        href = self._pick_coap_href(
-            td, td.get_event_forms(name),
-            op=InteractionVerbs.SUBSCRIBE_EVENT)
+        href = memoized_pick(
+            td, Protocols.COAP, InteractionTypes.EVENT, name,
+            self._pick_coap_href, op=InteractionVerbs.SUBSCRIBE_EVENT)
 
         if href is None:
             raise FormNotFoundException()
 
-        def next_item_builder(payload):
-            if payload:
-                data = json.loads(payload).get("data")
+        content_format = self._pick_content_format(td, InteractionTypes.EVENT, name)
+
+        def next_item_builder(response):
+            if response.payload:
+                data = self._decode_payload(response).get("data")
                 return EmittedEvent(init=data, name=name)
             else:
                 return None
 
-        subscribe = self._build_subscribe(href, next_item_builder)
+        subscribe = self._build_subscribe(href, content_format, next_item_builder)
 
         # noinspection PyUnresolvedReferences
         return reactivex.create(subscribe)
@@ -5,6 +5,7 @@
 Enumeration classes related to the CoAP server.
 """
 
+from wotpy.codecs.enums import MediaTypes
 from wotpy.utils.enums import EnumListMixin
 
 
@@ -13,3 +14,30 @@ class CoAPSchemes(EnumListMixin):
 
     COAP = "coap"
     COAPS = "coaps"
+
+
+class CoAPContentFormats:
+    """Enumeration of the CoAP Content-Format numbers
+    (RFC 7252) of the media types supported by the codecs."""
+
+    TEXT = 0
+    JSON = 50
+    CBOR = 60
+
+    _MEDIA_TYPES = {
+        TEXT: MediaTypes.TEXT,
+        JSON: MediaTypes.JSON,
+        CBOR: MediaTypes.CBOR
+    }
+
+    @classmethod
+    def to_media_type(cls, content_format):
+        """Returns the media type for the given Content-Format number or None if it is unknown."""
+
+        return cls._MEDIA_TYPES.get(int(content_format))
+
+    @classmethod
+    def from_media_type(cls, media_type):
+        """Returns the Content-Format number for the given media type or None if it is unknown."""
+
+        return next((key for key, val in cls._MEDIA_TYPES.items() if val == media_type), None)
@@ -7,7 +7,6 @@ CoAP resources to deal with Action interactions.
 
 import asyncio
 import datetime
-import json
 import logging
 import uuid
 
@@ -15,9 +14,8 @@ import aiocoap
 import aiocoap.error
 import aiocoap.resource
 
-from wotpy.protocols.coap.resources.utils import parse_request_opt_query
-
-JSON_CONTENT_FORMAT = 50
+from wotpy.protocols.coap.resources.utils import \
+    build_response, decode_request_payload, parse_request_opt_query
 
 
 async def get_thing_action(server, request):
@@ -63,7 +61,7 @@ class ActionResource(aiocoap.resource.ObservableResource):
     async def render_get(self, request):
         """Handler to check the status of an ongoing invocation."""
 
-        request_payload = json.loads(request.payload)
+        request_payload = decode_request_payload(self._server, request)
         invocation_id = request_payload.get("id", None)
 
         self._logr.debug("Action GET request for invocation: {}".format(invocation_id))
@@ -77,10 +75,7 @@ class ActionResource(aiocoap.resource.ObservableResource):
         future_result = self._pending_actions[invocation_id]
 
         def raise_response(the_resp_dict):
-            response_payload = json.dumps(the_resp_dict).encode("utf-8")
-            response = aiocoap.Message(code=aiocoap.Code.CONTENT, payload=response_payload)
-            response.opt.content_format = JSON_CONTENT_FORMAT
-            return response
+            return build_response(self._server, request, aiocoap.Code.CONTENT, the_resp_dict)
 
         if not future_result.done(): # TODO propably change
             self._logr.debug("Invocation ({}) is still pending".format(invocation_id))
@@ -107,8 +102,8 @@ class ActionResource(aiocoap.resource.ObservableResource):
             return
 
         try:
-            request_payload = json.loads(request.payload)
-        except (TypeError, json.decoder.JSONDecodeError):
+            request_payload = decode_request_payload(self._server, request)
+        except aiocoap.error.Error:
             return
 
         invocation_id = request_payload.get("id", None)
@@ -139,7 +134,7 @@ class ActionResource(aiocoap.resource.ObservableResource):
 
         self._logr.debug("Action POST request: {}".format(thing_action))
 
-        request_payload = json.loads(request.payload)
+        request_payload = decode_request_payload(self._server, request)
 
         if "input" not in request_payload:
             raise aiocoap.error.BadRequest("Missing input value")
@@ -161,8 +156,5 @@ class ActionResource(aiocoap.resource.ObservableResource):
         fut_action = asyncio.ensure_future(thing_action.invoke(input_value))
         fut_action.add_done_callback(done_cb)
         self._pending_actions[invocation_id] = fut_action
-        response_payload = json.dumps({"id": invocation_id}).encode("utf-8")
-        response = aiocoap.Message(code=aiocoap.Code.CREATED, payload=response_payload)
-        response.opt.content_format = JSON_CONTENT_FORMAT
 
-        return response
+        return build_response(self._server, request, aiocoap.Code.CREATED, {"id": invocation_id})
@@ -5,7 +5,6 @@
 CoAP resources to deal with Event interactions.
 """
 
-import json
 import logging
 import time
 
@@ -13,9 +12,7 @@ import aiocoap
 import aiocoap.error
 import aiocoap.resource
 
-from wotpy.protocols.coap.resources.utils import parse_request_opt_query
-
-JSON_CONTENT_FORMAT = 50
+from wotpy.protocols.coap.resources.utils import build_response, parse_request_opt_query
 
 
 async def get_thing_event(server, request):
@@ -100,8 +97,5 @@ class EventResource(aiocoap.resource.ObservableResource):
 
         thing_event = await get_thing_event(self._server, request)
         last_item = self._last_events.get(self._event_key(thing_event), None)
-        payload = json.dumps(last_item).encode("utf-8") if last_item else b""
-        response = aiocoap.Message(code=aiocoap.Code.CONTENT, payload=payload)
-        response.opt.content_format = JSON_CONTENT_FORMAT
 
-        return response
+        return build_response(self._server, request, aiocoap.Code.CONTENT, last_item)
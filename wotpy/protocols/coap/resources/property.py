@@ -5,27 +5,22 @@
 CoAP resources to deal with Property interactions.
 """
 
-import json
 import logging
 
 import aiocoap
 import aiocoap.error
 import aiocoap.resource
 
-from wotpy.protocols.coap.resources.utils import parse_request_opt_query
+from wotpy.protocols.coap.resources.utils import \
+    build_response, decode_request_payload, parse_request_opt_query
 
-JSON_CONTENT_FORMAT = 50
 
-
-async def _build_property_value_response(thing_property):
-    """Reads the current property value and builds
-    the CoAP response containing said value."""
+async def _build_property_value_response(server, request, thing_property):
+    """Reads the current property value and builds the CoAP
+    response containing said value in the negotiated Content-Format."""
 
     value = await thing_property.read()
-    payload = json.dumps({"value": value}).encode("utf-8")
-    response = aiocoap.Message(code=aiocoap.Code.CONTENT, payload=payload)
-    response.opt.content_format = JSON_CONTENT_FORMAT
-    return response
+    return build_response(server, request, aiocoap.Code.CONTENT, {"value": value})
 
 
 async def get_thing_property(server, request):
@@ -95,14 +90,14 @@ class PropertyResource(aiocoap.resource.ObservableResource):
         """Returns a CoAP response with the current property value."""
 
         thing_property = await get_thing_property(self._server, request)
-        response = await _build_property_value_response(thing_property)
+        response = await _build_property_value_response(self._server, request, thing_property)
         return response
 
     async def render_put(self, request):
         """Updates the property with the value retrieved from the CoAP request payload."""
 
         thing_property = await get_thing_property(self._server, request)
-        request_payload = json.loads(request.payload)
+        request_payload = decode_request_payload(self._server, request)
 
         if "value" not in request_payload:
             raise aiocoap.error.BadRequest()
@@ -7,6 +7,12 @@ Utility functions for CoAP resources.
 
 from urllib import parse
 
+import aiocoap
+import aiocoap.error
+
+from wotpy.codecs.enums import MediaTypes
+from wotpy.protocols.coap.enums import CoAPContentFormats
+
 
 def parse_request_opt_query(request):
     """Takes a CoAP Request and returns a dict containing
@@ -14,3 +20,46 @@ def parse_request_opt_query(request):
 
     parsed_dict = parse.parse_qs("&".join(request.opt.uri_query))
     return {key: val[0] for key, val in parsed_dict.items() if len(val)}
+
+
+def _request_media_type(request):
+    """Returns the media type of the payload of a CoAP Request (JSON by default)."""
+
+    if request.opt.content_format is None:
+        return MediaTypes.JSON
+
+    media_type = CoAPContentFormats.to_media_type(request.opt.content_format)
+
+    if media_type is None:
+        raise aiocoap.error.UnsupportedContentFormat()
+
+    return media_type
+
+
+def decode_request_payload(server, request):
+    """Decodes the payload of a CoAP Request with
+    the server codec for its Content-Format option."""
+
+    try:
+        codec = server.codec_for_media_type(_request_media_type(request))
+    except ValueError:
+        raise aiocoap.error.UnsupportedContentFormat()
+
+    try:
+        return codec.to_value(request.payload)
+    except (TypeError, ValueError) as ex:
+        raise aiocoap.error.BadRequest("Error decoding payload: {}".format(ex))
+
+
+def build_response(server, request, code, value):
+    """Builds a CoAP response that contains the given value encoded with the Content-Format
+    in the Accept option of the Request, or else the same Content-Format of the Request."""
+
+    option = request.opt.accept if request.opt.accept is not None else request.opt.content_format
+    media_types = [CoAPContentFormats.to_media_type(option)] if option is not None else []
+    codec = server.negotiate_codec(media_types)
+    payload = codec.to_bytes(value) if value is not None else b""
+    response = aiocoap.Message(code=code, payload=payload)
+    response.opt.content_format = CoAPContentFormats.from_media_type(codec.media_types[0])
+
+    return response
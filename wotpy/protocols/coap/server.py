@@ -44,6 +44,17 @@ class CoAPServer(BaseProtocolServer):
         self._servient = None
         self._security_scheme = security_scheme if security_scheme.get("scheme", None) in\
             SecuritySchemeType.list() else self.DEFAULT_SECURITY_SCHEME
+        self._authenticator = None
+
+    @property
+    def authenticator(self):
+        """Returns the authenticator for the security scheme of this server.
+        It is built on first use and shared by all the requests."""
+
+        if self._authenticator is None:
+            self._authenticator = BaseAuthenticator.build(self._security_scheme)
+
+        return self._authenticator
 
     @property
     def protocol(self):
@@ -145,7 +156,9 @@ class CoAPServer(BaseProtocolServer):
         if interaction.interaction_type not in intrct_type_map:
             raise ValueError("Unsupported interaction")
 
-        return intrct_type_map[interaction.interaction_type](interaction, hostname)
+        forms = intrct_type_map[interaction.interaction_type](interaction, hostname)
+
+        return self.add_media_type_forms(forms)
 
     def build_base_url(self, hostname, thing):
         """Returns the base URL for the given Thing in the context of this server."""
@@ -206,8 +219,8 @@ class CoAPServer(BaseProtocolServer):
 
         if self._servient:
             creds = self._servient.retrieve_credentials(exposed_thing_name)
-            authenticator = BaseAuthenticator.build(self._security_scheme)
-            return authenticator.authenticate(creds, request)
+            scope = (exposed_thing_name, self._servient.credentials_version)
+            return await self.authenticator.verify(creds, request, scope=scope)
         else:
             #TODO: If the server is created without a servient should it try to check credentials in some other way?
             return True
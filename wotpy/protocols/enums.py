@@ -28,3 +28,7 @@ class InteractionVerbs(EnumListMixin):
     INVOKE_ACTION = "invokeaction"
     SUBSCRIBE_EVENT = "subscribeevent"
     UNSUBSCRIBE_EVENT = "unsubscribeevent"
+    OBSERVE_ALL_PROPERTIES = "observeallproperties"
+    READ_MULTIPLE_PROPERTIES = "readmultipleproperties"
+    WRITE_MULTIPLE_PROPERTIES = "writemultipleproperties"
+    SUBSCRIBE_ALL_EVENTS = "subscribeallevents"
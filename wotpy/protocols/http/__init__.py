@@ -12,5 +12,8 @@ HTTP Protocol Binding implementation.
     wotpy.protocols.http.client
     wotpy.protocols.http.credential
     wotpy.protocols.http.enums
+    wotpy.protocols.http.http2
     wotpy.protocols.http.server
+    wotpy.protocols.http.tls
+    wotpy.protocols.http.transforms
 """
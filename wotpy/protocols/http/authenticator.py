@@ -5,20 +5,25 @@
 Authenticator classes that perform checks on the incoming requests.
 """
 
-import json
+import hashlib
+import inspect
 from base64 import b64decode
 from abc import ABCMeta, abstractmethod
 
-from tornado import httpclient
-
+from wotpy.protocols.oauth2 import TokenIntrospector
+from wotpy.utils.cache import TTLCache
 from wotpy.wot.enums import SecuritySchemeType
 
 class BaseAuthenticator(metaclass=ABCMeta):
     """This is the base authenticator class describing
     the authentication interface."""
 
+    CACHE_SIZE = 1024
+    CACHE_TTL_SECS = 30
+
     def __init__(self, security_scheme_dict):
         self._security_scheme_dict = security_scheme_dict
+        self._verified = TTLCache(self.CACHE_SIZE, self.CACHE_TTL_SECS)
 
     @abstractmethod
     def authenticate(self, server_creds, request):
@@ -26,6 +31,38 @@ class BaseAuthenticator(metaclass=ABCMeta):
 
         raise NotImplementedError()
 
+    def request_credentials(self, request):
+        """Returns the raw credentials contained in the request as bytes.
+        Returns None if the result of checking the request should not be cached."""
+
+        return None
+
+    async def verify(self, server_creds, request, scope=None):
+        """Checks the credentials of a request, remembering the successful checks for a short time.
+        The scope identifies the server credentials the request was checked against
+        (e.g. the Thing name and the version of the servient credential store).
+        Only a digest of the request credentials is kept in the cache.
+        Authenticators may implement authenticate as a coroutine."""
+
+        raw_creds = self.request_credentials(request)
+
+        if raw_creds is None:
+            valid = self.authenticate(server_creds, request)
+            return (await valid) if inspect.isawaitable(valid) else valid
+
+        key = (scope, hashlib.blake2b(raw_creds, digest_size=16).digest())
+
+        if self._verified.get(key, False):
+            return True
+
+        valid = self.authenticate(server_creds, request)
+        valid = (await valid) if inspect.isawaitable(valid) else valid
+
+        if valid:
+            self._verified.set(key, True)
+
+        return valid
+
     @classmethod
     def build(cls, security_scheme_dict):
         """Builds an instance of the appropriate subclass for the given SecurityScheme."""
@@ -82,6 +119,13 @@ class ComboSecurityAuthenticator(BaseAuthenticator):
 class BasicSecurityAuthenticator(BaseAuthenticator):
     """Basic username and password authenticator."""
 
+    def request_credentials(self, request):
+        """Returns the raw value of the Authorization header."""
+
+        auth_header = request.headers.get("Authorization", None)
+
+        return auth_header.encode("utf8") if auth_header else None
+
     def authenticate(self, server_creds, request):
         """Checks the credentials of a request."""
 
@@ -123,6 +167,13 @@ class APIKeySecurityAuthenticator(BaseAuthenticator):
 class BearerSecurityAuthenticator(BaseAuthenticator):
     """Bearer token authenticator."""
 
+    def request_credentials(self, request):
+        """Returns the raw value of the Authorization header."""
+
+        auth_header = request.headers.get("Authorization", None)
+
+        return auth_header.encode("utf8") if auth_header else None
+
     def authenticate(self, server_creds, request):
         """Checks the credentials of a request."""
 
@@ -155,12 +206,14 @@ class OAuth2SecurityAuthenticator(BaseAuthenticator):
     def __init__(self, security_scheme_dict):
         super().__init__(security_scheme_dict)
         self._endpoint = security_scheme_dict.get("endpoint", None)
+        self._introspector = TokenIntrospector.for_endpoint(self._endpoint)
 
-    def authenticate(self, server_creds, request):
+    async def authenticate(self, server_creds, request):
         """Checks the credentials of a request. Assumes that the endpoint provided
         in the constructor receives a token in the body of a POST request and replies
         with a dictionary containing the `active` key signifying if the token is
-        currently active or not."""
+        currently active or not. Introspection results are cached and shared
+        with the authenticators of the other bindings."""
 
         auth_header = request.headers.get("Authorization", "")
         if not auth_header.startswith("Bearer "):
@@ -168,22 +221,8 @@ class OAuth2SecurityAuthenticator(BaseAuthenticator):
 
         token = auth_header.replace("Bearer ", "")
 
-        request = httpclient.HTTPRequest(
-            self._endpoint,
-            method="POST",
-            headers={"content-type": "application/x-www-form-urlencoded"},
-            body=f"token={token}",
-            validate_cert=True
-        )
-
-        http_client = httpclient.HTTPClient()
-        response = http_client.fetch(request)
-        json_response = json.loads(response.body.decode("utf-8"))
-        valid_token = json_response["active"]
-
-        http_client.close()
+        return await self._introspector.is_active(token)
 
-        return valid_token
 
 class OIDC4VPAuthenticator(BaseAuthenticator):
     """OpenID Connect for Verifiable Presentations authenticator."""
@@ -6,41 +6,127 @@ Classes that contain the client logic for the HTTP protocol.
 """
 
 import asyncio
-import json
+import collections
 import logging
 import time
+import urllib.parse
 
 import tornado.httpclient
+import tornado.httputil
 import reactivex
-from tornado.simple_httpclient import HTTPTimeoutError
+from tornado.iostream import StreamClosedError
+from tornado.simple_httpclient import HTTPTimeoutError, SimpleAsyncHTTPClient
+from tornado.tcpclient import TCPClient
 
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.codecs.utils import STRUCTURED_MEDIA_TYPES, default_codecs, parse_media_type
 from wotpy.protocols.client import BaseProtocolClient
 from wotpy.protocols.enums import Protocols, InteractionVerbs
 from wotpy.protocols.exceptions import FormNotFoundException, ClientRequestTimeout
-from wotpy.protocols.http.enums import HTTPSchemes
-from wotpy.protocols.utils import is_scheme_form
+from wotpy.protocols.http.enums import HTTPSchemes, HTTPClientBackends, HTTPSubprotocols, ActionInvocationStatus
+from wotpy.protocols.utils import is_scheme_form, memoized_pick, memoized_content_type
+from wotpy.support import is_pycurl_available
 from wotpy.utils.utils import handle_observer_finalization
+from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.events import EmittedEvent, PropertyChangeEmittedEvent, PropertyChangeEventInit
 from wotpy.protocols.http.credential import BaseCredential
 
 
+class StreamTCPClient(TCPClient):
+    """TCP client that keeps the streams it opens, so that they can be closed on demand."""
+
+    def __init__(self, resolver=None):
+        super().__init__(resolver=resolver)
+        self._streams = set()
+
+    async def connect(self, *args, **kwargs):
+        """Opens a new stream and keeps it until it is closed."""
+
+        stream = await super().connect(*args, **kwargs)
+        self._streams = {item for item in self._streams if not item.closed()}
+        self._streams.add(stream)
+
+        return stream
+
+    def close_streams(self):
+        """Closes all the open streams."""
+
+        for stream in self._streams:
+            stream.close()
+
+        self._streams.clear()
+
+
+class StreamHTTPClient(SimpleAsyncHTTPClient):
+    """Simple HTTP client that can close the connections of its requests in progress."""
+
+    # noinspection PyMethodOverriding
+    def initialize(self, **kwargs):
+        super().initialize(**kwargs)
+        self.tcp_client = StreamTCPClient(resolver=self.resolver)
+
+    def close_streams(self):
+        """Closes the connections of the requests in progress, which then fail."""
+
+        self.tcp_client.close_streams()
+
+
 class HTTPClient(BaseProtocolClient):
-    """Implementation of the protocol client interface for the HTTP protocol."""
+    """Implementation of the protocol client interface for the HTTP protocol.
+    All requests share one pooled AsyncHTTPClient per event loop. The curl
+    backend keeps connections alive between requests and can negotiate HTTP/2,
+    while the simple backend opens a new connection for each request. The default
+    backend is curl when pycurl is installed and simple otherwise.
+    Long-lived requests (Server-Sent Events streams and long-polling) use a separate
+    pool of up to max_streams connections, so they never take the slots of other requests."""
 
-    JSON_HEADERS = {"Content-Type": "application/json"}
     DEFAULT_CON_TIMEOUT = 60
     DEFAULT_REQ_TIMEOUT = 60
+    DEFAULT_MAX_CLIENTS = 100
+    DEFAULT_MAX_STREAMS = 100
+    ACTION_STATUS_WAIT_SECS = 20
+    READ_CACHE_SIZE = 1024
+
+    def __init__(self, connect_timeout=DEFAULT_CON_TIMEOUT, request_timeout=DEFAULT_REQ_TIMEOUT,
+                 backend=None, max_clients=DEFAULT_MAX_CLIENTS,
+                 max_clients_per_host=None, http2=False, content_type=MediaTypes.JSON,
+                 max_streams=DEFAULT_MAX_STREAMS):
+        if backend is None:
+            backend = HTTPClientBackends.CURL if is_pycurl_available() else HTTPClientBackends.SIMPLE
+
+        if backend not in HTTPClientBackends.list():
+            raise ValueError("Unknown HTTP client backend: {}".format(backend))
+
+        self._codecs = {codec.media_types[0]: codec for codec in default_codecs()}
+
+        if content_type not in STRUCTURED_MEDIA_TYPES or content_type not in self._codecs:
+            raise ValueError("Unsupported content type: {}".format(content_type))
+
+        if http2 and backend != HTTPClientBackends.CURL:
+            raise ValueError("HTTP/2 is only available with the curl backend")
 
-    def __init__(self, connect_timeout=DEFAULT_CON_TIMEOUT, request_timeout=DEFAULT_REQ_TIMEOUT):
         self._connect_timeout = connect_timeout
         self._request_timeout = request_timeout
+        self._backend = backend
+        self._max_clients = max_clients
+        self._max_clients_per_host = max_clients_per_host
+        self._max_streams = max_streams
+        self._http2 = http2
+        self._content_type = content_type
+        self._http_client = None
+        self._stream_http_client = None
+        self._http_client_loop = None
+        self._host_semaphores = {}
+        self._read_cache = collections.OrderedDict()
         self._logr = logging.getLogger(__name__)
         self._credential = None
         super().__init__()
 
     @classmethod
-    def pick_http_href(cls, td, forms, op=None):
-        """Picks the most appropriate HTTP form href from the given list of forms."""
+    def pick_http_href(cls, td, forms, op=None, subprotocol=None):
+        """Picks the most appropriate HTTP form href from the given list of forms.
+        Forms for streaming subprotocols are only picked when explicitly requested."""
 
         def is_op_form(form):
             try:
@@ -48,11 +134,18 @@ class HTTPClient(BaseProtocolClient):
             except TypeError:
                 return False
 
+        def is_subprotocol_form(form):
+            if subprotocol is None:
+                return form.subprotocol != HTTPSubprotocols.SSE
+
+            return form.subprotocol == subprotocol
+
         def find_href(scheme):
             try:
                 return next(
                     form.href for form in forms
-                    if is_scheme_form(form, td.base, scheme) and is_op_form(form))
+                    if is_scheme_form(form, td.base, scheme) and
+                    is_op_form(form) and is_subprotocol_form(form))
             except StopIteration:
                 return None
 
@@ -60,6 +153,41 @@ class HTTPClient(BaseProtocolClient):
 
         return form_https if form_https is not None else find_href(HTTPSchemes.HTTP)
 
+    @classmethod
+    def pick_http_batch_href(cls, td):
+        """Returns the href of the batch resource advertised in the Thing-level Forms of the TD
+        or None if the remote Thing does not support batches of operations."""
+
+        return td.memoize(
+            (Protocols.HTTP, HTTPSubprotocols.BATCH),
+            lambda: cls.pick_http_href(td, td.forms, subprotocol=HTTPSubprotocols.BATCH))
+
+    @classmethod
+    def pick_http_sse_href(cls, td, forms, op=None):
+        """Picks the most appropriate Server-Sent Events HTTP form href from the given list of forms."""
+
+        return cls.pick_http_href(td, forms, op=op, subprotocol=HTTPSubprotocols.SSE)
+
+    @classmethod
+    def _parse_sse_events(cls, buffer):
+        """Parses the complete Server-Sent Events contained in the given buffer.
+        Returns the list of decoded event data items and the unparsed remainder."""
+
+        *blocks, rest = buffer.replace(b"\r\n", b"\n").split(b"\n\n")
+        items = []
+
+        for block in blocks:
+            data_lines = [
+                line[len(b"data:"):].lstrip()
+                for line in block.split(b"\n")
+                if line.startswith(b"data:")
+            ]
+
+            if len(data_lines):
+                items.append(JSON_CODEC.to_value(b"\n".join(data_lines)))
+
+        return items, rest
+
     @property
     def protocol(self):
         """Protocol of this client instance.
@@ -79,6 +207,156 @@ class HTTPClient(BaseProtocolClient):
 
         return self._request_timeout
 
+    @property
+    def backend(self):
+        """Returns the implementation used by the underlying HTTP client."""
+
+        return self._backend
+
+    @property
+    def max_clients(self):
+        """Returns the maximum number of simultaneous requests."""
+
+        return self._max_clients
+
+    @property
+    def max_clients_per_host(self):
+        """Returns the maximum number of simultaneous requests to the same host."""
+
+        return self._max_clients_per_host
+
+    @property
+    def max_streams(self):
+        """Maximum number of simultaneous long-lived requests (Server-Sent Events and long-polling)."""
+
+        return self._max_streams
+
+    @property
+    def content_type(self):
+        """Preferred media type of the request and response bodies.
+        JSON is used for the Interactions that do not have a Form with this content type."""
+
+        return self._content_type
+
+    def _pick_media_type(self, td, intrct_type, name):
+        """Returns the media type that will be used to exchange data with the given Interaction."""
+
+        if self._content_type == MediaTypes.JSON:
+            return MediaTypes.JSON
+
+        return memoized_content_type(
+            td, intrct_type, name, HTTPSchemes.list(), self._content_type)
+
+    def _decode_body(self, response):
+        """Decodes the body of a response with the codec for its Content-Type (JSON by default)."""
+
+        media_type = parse_media_type(response.headers.get("Content-Type"))
+        codec = self._codecs.get(media_type, JSON_CODEC)
+
+        return codec.to_value(response.body)
+
+    def _build_http_client(self, max_clients):
+        """Builds a new instance of the AsyncHTTPClient for the configured backend."""
+
+        if self._backend != HTTPClientBackends.CURL:
+            return tornado.httpclient.AsyncHTTPClient(
+                force_instance=True, max_clients=max_clients)
+
+        from tornado.curl_httpclient import CurlAsyncHTTPClient
+
+        return CurlAsyncHTTPClient(
+            force_instance=True, max_clients=max_clients,
+            defaults={"prepare_curl_callback": self._prepare_curl})
+
+    def _prepare_curl(self, curl):
+        """Sets the options of the curl handle of each request sent with the curl backend."""
+
+        import pycurl
+
+        if self._http2:
+            curl.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+
+    @classmethod
+    def _abort_curl_transfer(cls, curl):
+        """Makes curl run the transfer of the given handle right away, so that
+        its progress callback is called and can abort the transfer.
+        Unpausing is what schedules the transfer, so it is paused first."""
+
+        import pycurl
+
+        try:
+            curl.pause(pycurl.PAUSE_ALL)
+            curl.pause(pycurl.PAUSE_CONT)
+        except pycurl.error:
+            pass
+
+    def _get_http_client(self, long_lived=False):
+        """Returns the pooled AsyncHTTPClient of the running event loop
+        for regular requests or for long-lived requests."""
+
+        loop = asyncio.get_running_loop()
+
+        if self._http_client_loop is not loop:
+            self._http_client = None
+            self._stream_http_client = None
+            self._http_client_loop = loop
+            self._host_semaphores = {}
+
+        if long_lived:
+            if self._stream_http_client is None:
+                self._stream_http_client = self._build_http_client(self._max_streams)
+
+            return self._stream_http_client
+
+        if self._http_client is None:
+            self._http_client = self._build_http_client(self._max_clients)
+
+        return self._http_client
+
+    async def _fetch(self, http_request, long_lived=False, http_client=None):
+        """Sends the request through the pooled HTTP client (or the given one),
+        waiting for a free slot if the per-host limit is reached.
+        Long-lived requests go through their own pool and are not limited per host.
+        The cached token of the credential is discarded when the request is unauthorized."""
+
+        try:
+            if http_client is not None:
+                return await http_client.fetch(http_request)
+
+            return await self._fetch_pooled(http_request, long_lived=long_lived)
+        except tornado.httpclient.HTTPClientError as ex:
+            if ex.code == 401 and self._credential:
+                self._credential.invalidate(http_request)
+
+            raise
+
+    async def _fetch_pooled(self, http_request, long_lived=False):
+        """Sends the request through the appropriate pooled HTTP client."""
+
+        http_client = self._get_http_client(long_lived=long_lived)
+
+        if long_lived or not self._max_clients_per_host:
+            return await http_client.fetch(http_request)
+
+        host = urllib.parse.urlparse(http_request.url).netloc
+
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self._max_clients_per_host)
+
+        async with self._host_semaphores[host]:
+            return await http_client.fetch(http_request)
+
+    async def close(self):
+        """Closes the pooled HTTP clients and their open connections."""
+
+        for http_client in (self._http_client, self._stream_http_client):
+            http_client is not None and http_client.close()
+
+        self._http_client = None
+        self._stream_http_client = None
+        self._http_client_loop = None
+        self._host_semaphores = {}
+
     def is_supported_interaction(self, td, name):
         """Returns True if the any of the Forms for the Interaction
         with the given name is supported in this Protocol Binding client."""
@@ -116,33 +394,92 @@ class HTTPClient(BaseProtocolClient):
 
         now = time.time()
 
-        href = self.pick_http_href(td, td.get_action_forms(name))
+        href = memoized_pick(td, Protocols.HTTP, InteractionTypes.ACTION, name, self.pick_http_href)
 
         if href is None:
             raise FormNotFoundException()
 
-        body = json.dumps({"input": input_value})
-        http_client = tornado.httpclient.AsyncHTTPClient()
+        media_type = self._pick_media_type(td, InteractionTypes.ACTION, name)
+        body = self._codecs[media_type].to_bytes({"input": input_value})
 
         try:
             http_request = tornado.httpclient.HTTPRequest(
                 href, method="POST",
                 body=body,
-                headers=self.JSON_HEADERS,
+                headers={"Content-Type": media_type, "Accept": media_type},
                 connect_timeout=con_timeout,
                 request_timeout=req_timeout,
                 validate_cert=False)
         except HTTPTimeoutError:
             raise ClientRequestTimeout
 
-        response = await http_client.fetch(await self.sign_request(http_request))
-        resp_body = json.loads(response.body)
+        response = await self._fetch(await self.sign_request(http_request))
+        resp_body = self._decode_body(response)
+
+        if response.code == 201:
+            status_url = response.headers.get("Location", resp_body.get("invocation"))
+            resp_body = await self._wait_action_invocation(status_url, media_type, deadline=now + req_timeout)
 
         if resp_body.get("error") is not None:
             raise Exception(resp_body.get("error"))
         else:
             return resp_body.get("result")
 
+    async def batch(self, td, operations, timeout=None):
+        """Runs a list of operations on a remote Thing with a single request.
+        Each operation is a dict with the op (readproperty, writeproperty or invokeaction)
+        and the Interaction name, plus the value or input when required.
+        Returns the list of result dicts (value, result or error) in the same order."""
+
+        href = self.pick_http_batch_href(td)
+
+        if href is None:
+            raise FormNotFoundException()
+
+        con_timeout = timeout if timeout else self._connect_timeout
+        req_timeout = timeout if timeout else self._request_timeout
+
+        try:
+            http_request = tornado.httpclient.HTTPRequest(
+                href, method="POST",
+                body=JSON_CODEC.to_bytes({"operations": list(operations)}),
+                headers={"Content-Type": MediaTypes.JSON, "Accept": MediaTypes.JSON},
+                connect_timeout=con_timeout,
+                request_timeout=req_timeout,
+                validate_cert=False)
+        except HTTPTimeoutError:
+            raise ClientRequestTimeout
+
+        response = await self._fetch(await self.sign_request(http_request))
+
+        return self._decode_body(response).get("results")
+
+    async def _wait_action_invocation(self, status_url, media_type, deadline):
+        """Long-polls the status resource of an asynchronous
+        Action invocation until it finishes or the deadline expires."""
+
+        while True:
+            remaining = deadline - time.time()
+
+            if remaining <= 0:
+                raise ClientRequestTimeout
+
+            wait_secs = min(remaining, self.ACTION_STATUS_WAIT_SECS)
+
+            http_request = tornado.httpclient.HTTPRequest(
+                tornado.httputil.url_concat(status_url, {"wait": wait_secs}),
+                method="GET",
+                headers={"Accept": media_type},
+                connect_timeout=self._connect_timeout,
+                request_timeout=wait_secs + self._connect_timeout,
+                validate_cert=False)
+
+            response = await self._fetch(await self.sign_request(http_request), long_lived=True)
+            status = self._decode_body(response)
+
+            if status.get("status") != ActionInvocationStatus.RUNNING:
+                return status
+
     async def write_property(self, td, name, value, timeout=None):
         """Updates the value of a Property on a remote Thing.
         Returns a Future."""
@@ -150,25 +487,25 @@ class HTTPClient(BaseProtocolClient):
         con_timeout = timeout if timeout else self._connect_timeout
         req_timeout = timeout if timeout else self._request_timeout
 
-        href = self.pick_http_href(td, td.get_property_forms(name))
+        href = memoized_pick(td, Protocols.HTTP, InteractionTypes.PROPERTY, name, self.pick_http_href)
 
         if href is None:
             raise FormNotFoundException()
 
-        http_client = tornado.httpclient.AsyncHTTPClient()
-        body = json.dumps({"value": value})
+        media_type = self._pick_media_type(td, InteractionTypes.PROPERTY, name)
+        body = self._codecs[media_type].to_bytes({"value": value})
 
         try:
             http_request = tornado.httpclient.HTTPRequest(
                 href, method="PUT", body=body,
-                headers=self.JSON_HEADERS,
+                headers={"Content-Type": media_type, "Accept": media_type},
                 connect_timeout=con_timeout,
                 request_timeout=req_timeout,
                 validate_cert=False)
         except HTTPTimeoutError:
             raise ClientRequestTimeout
 
-        await http_client.fetch(http_request)
+        await self._fetch(http_request)
 
     async def read_property(self, td, name, timeout=None):
         """Reads the value of a Property on a remote Thing.
@@ -177,37 +514,155 @@ class HTTPClient(BaseProtocolClient):
         con_timeout = timeout if timeout else self._connect_timeout
         req_timeout = timeout if timeout else self._request_timeout
 
-        href = self.pick_http_href(td, td.get_property_forms(name))
+        href = memoized_pick(td, Protocols.HTTP, InteractionTypes.PROPERTY, name, self.pick_http_href)
 
         if href is None:
             raise FormNotFoundException()
 
-        http_client = tornado.httpclient.AsyncHTTPClient()
+        media_type = self._pick_media_type(td, InteractionTypes.PROPERTY, name)
+
+        cache_key = (href, media_type)
+        headers = {"Accept": media_type}
+
+        if cache_key in self._read_cache:
+            headers["If-None-Match"] = self._read_cache[cache_key][0]
 
         try:
             http_request = tornado.httpclient.HTTPRequest(
                 href, method="GET",
+                headers=headers,
                 connect_timeout=con_timeout,
                 request_timeout=req_timeout,
                 validate_cert=False)
         except HTTPTimeoutError:
             raise ClientRequestTimeout
 
-        response = await http_client.fetch(await self.sign_request(http_request))
-        result = json.loads(response.body)
+        try:
+            response = await self._fetch(await self.sign_request(http_request))
+        except tornado.httpclient.HTTPClientError as ex:
+            if ex.code != 304 or cache_key not in self._read_cache:
+                raise
+
+            self._read_cache.move_to_end(cache_key)
+
+            return self._read_cache[cache_key][1]
+
+        result = self._decode_body(response)
         result = result.get("value", result)
 
+        self._cache_read(cache_key, response.headers.get("Etag"), result)
+
         return result
 
+    def _cache_read(self, cache_key, etag, value):
+        """Keeps the last value read from a Property along with its ETag
+        so that the next read only downloads the value if it has changed."""
+
+        self._read_cache.pop(cache_key, None)
+
+        if etag is None:
+            return
+
+        self._read_cache[cache_key] = (etag, value)
+
+        while len(self._read_cache) > self.READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+
+    def _observe_sse(self, href, next_item_builder):
+        """Builds an Observable that keeps a single Server-Sent Events connection open
+        and emits the items built from each received event. Reconnects if the stream ends.
+        The connection is closed as soon as the subscription is disposed: the curl backend
+        aborts the transfer of the stream, while the simple backend opens the stream with
+        a dedicated client and closes its connection."""
+
+        def subscribe(observer, scheduler):
+            """Subscription function to observe a Server-Sent Events stream."""
+
+            state = {"active": True, "buffer": b"", "curl": None}
+            stream_client = None
+
+            if self._backend != HTTPClientBackends.CURL:
+                stream_client = StreamHTTPClient(force_instance=True, max_clients=1)
+
+            def streaming_callback(chunk):
+                if not state["active"]:
+                    return
+
+                items, state["buffer"] = self._parse_sse_events(state["buffer"] + chunk)
+
+                for item in items:
+                    observer.on_next(next_item_builder(item))
+
+            def prepare_curl(curl):
+                import pycurl
+
+                self._prepare_curl(curl)
+                state["curl"] = curl
+                curl.setopt(pycurl.NOPROGRESS, 0)
+                curl.setopt(pycurl.XFERINFOFUNCTION, lambda *args: 0 if state["active"] else 1)
+
+            @handle_observer_finalization(observer)
+            async def callback():
+                try:
+                    while state["active"]:
+                        state["buffer"] = b""
+
+                        http_request = tornado.httpclient.HTTPRequest(
+                            href, method="GET",
+                            headers={"Accept": MediaTypes.EVENT_STREAM},
+                            streaming_callback=streaming_callback,
+                            prepare_curl_callback=prepare_curl,
+                            connect_timeout=self._connect_timeout,
+                            request_timeout=0,
+                            validate_cert=False)
+
+                        try:
+                            await self._fetch(
+                                await self.sign_request(http_request),
+                                long_lived=True, http_client=stream_client)
+                        except (HTTPTimeoutError, StreamClosedError):
+                            pass
+                        except Exception:
+                            if state["active"]:
+                                raise
+                        finally:
+                            state["curl"] = None
+                finally:
+                    stream_client is not None and stream_client.close()
+
+            def unsubscribe():
+                state["active"] = False
+                stream_client is not None and stream_client.close_streams()
+                state["curl"] is not None and self._abort_curl_transfer(state["curl"])
+
+            loop = asyncio.get_running_loop()
+            loop.create_task(callback())
+
+            return unsubscribe
+
+        # noinspection PyUnresolvedReferences
+        return reactivex.create(subscribe)
+
     def on_event(self, td, name):
         """Subscribes to an event on a remote Thing.
+        Uses a Server-Sent Events stream if available and falls back to long-polling.
         Returns an Observable."""
 
-        href = self.pick_http_href(td, td.get_event_forms(name))
+        href_sse = memoized_pick(
+            td, Protocols.HTTP, InteractionTypes.EVENT, name,
+            self.pick_http_sse_href, op=InteractionVerbs.SUBSCRIBE_EVENT)
+
+        if href_sse is not None:
+            return self._observe_sse(
+                href_sse, lambda data: EmittedEvent(init=data.get("payload"), name=name))
+
+        href = memoized_pick(td, Protocols.HTTP, InteractionTypes.EVENT, name, self.pick_http_href)
 
         if href is None:
             raise FormNotFoundException()
 
+        media_type = self._pick_media_type(td, InteractionTypes.EVENT, name)
+
         def subscribe(observer, scheduler):
             """Subscription function to observe events using the HTTP protocol."""
 
@@ -215,13 +670,13 @@ class HTTPClient(BaseProtocolClient):
 
             @handle_observer_finalization(observer)
             async def callback():
-                http_client = tornado.httpclient.AsyncHTTPClient()
-                http_request = tornado.httpclient.HTTPRequest(href, method="GET", validate_cert=False)
+                http_request = tornado.httpclient.HTTPRequest(
+                    href, method="GET", headers={"Accept": media_type}, validate_cert=False)
 
                 while state["active"]:
                     try:
-                        response = await http_client.fetch(await self.sign_request(http_request))
-                        payload = json.loads(response.body).get("payload")
+                        response = await self._fetch(await self.sign_request(http_request), long_lived=True)
+                        payload = self._decode_body(response).get("payload")
                         observer.on_next(EmittedEvent(init=payload, name=name))
                     except HTTPTimeoutError:
                         pass
@@ -239,13 +694,26 @@ class HTTPClient(BaseProtocolClient):
 
     def on_property_change(self, td, name):
         """Subscribes to property changes on a remote Thing.
+        Uses a Server-Sent Events stream if available and falls back to long-polling.
         Returns an Observable"""
 
-        href = self.pick_http_href(td, td.get_property_forms(name), op=InteractionVerbs.OBSERVE_PROPERTY)
+        href_sse = memoized_pick(
+            td, Protocols.HTTP, InteractionTypes.PROPERTY, name,
+            self.pick_http_sse_href, op=InteractionVerbs.OBSERVE_PROPERTY)
+
+        if href_sse is not None:
+            return self._observe_sse(href_sse, lambda data: PropertyChangeEmittedEvent(
+                init=PropertyChangeEventInit(name=name, value=data.get("value"))))
+
+        href = memoized_pick(
+            td, Protocols.HTTP, InteractionTypes.PROPERTY, name,
+            self.pick_http_href, op=InteractionVerbs.OBSERVE_PROPERTY)
 
         if href is None:
             raise FormNotFoundException()
 
+        media_type = self._pick_media_type(td, InteractionTypes.PROPERTY, name)
+
         def subscribe(observer, scheduler):
             """Subscription function to observe property updates using the HTTP protocol."""
 
@@ -253,13 +721,13 @@ class HTTPClient(BaseProtocolClient):
 
             @handle_observer_finalization(observer)
             async def callback():
-                http_client = tornado.httpclient.AsyncHTTPClient()
-                http_request = tornado.httpclient.HTTPRequest(href, method="GET", validate_cert=False)
+                http_request = tornado.httpclient.HTTPRequest(
+                    href, method="GET", headers={"Accept": media_type}, validate_cert=False)
 
                 while state["active"]:
                     try:
-                        response = await http_client.fetch(await self.sign_request(http_request))
-                        value = json.loads(response.body)
+                        response = await self._fetch(await self.sign_request(http_request), long_lived=True)
+                        value = self._decode_body(response)
                         value = value.get("value", value)
                         init = PropertyChangeEventInit(name=name, value=value)
                         observer.on_next(PropertyChangeEmittedEvent(init=init))
@@ -8,13 +8,12 @@ Credential classes that add the proper authorization creds to the outgoing reque
 import json
 from base64 import b64encode
 from abc import ABCMeta, abstractmethod
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 
-from oauthlib.oauth2 import BackendApplicationClient
-from requests_oauthlib import OAuth2Session
 from tornado.httpclient import AsyncHTTPClient, HTTPRequest
 from tornado.web import HTTPError
 
+from wotpy.protocols.tokens import TokenManager, token_expires_in
 from wotpy.wot.enums import SecuritySchemeType
 
 
@@ -32,6 +31,12 @@ class BaseCredential(metaclass=ABCMeta):
 
         raise NotImplementedError()
 
+    def invalidate(self, request):
+        """Discards any cached token used to sign the request
+        after the server rejected it as unauthorized."""
+
+        pass
+
     @classmethod
     def build(cls, security_scheme_dict, security_credentials):
         """Builds an instance of the appropriate subclass for the given SecurityScheme."""
@@ -156,36 +161,68 @@ class PSKSecurityCredential(BaseCredential):
 
 
 class OAuth2SecurityCredential(BaseCredential):
-    """OAuth2 credential."""
+    """OAuth2 credential. Access tokens of the client credentials flow are fetched
+    asynchronously on first use and refreshed in the background before they expire."""
+
+    TOKEN_KEY = "access_token"
 
     def __init__(self, security_scheme_dict, security_credentials):
         super().__init__(security_scheme_dict, security_credentials)
 
         self._flow = security_scheme_dict.get("flow", None)
-        if self._flow == "client":
-            self._client_id = security_credentials.get("clientId", None)
-            self._client_secret = security_credentials.get("clientSecret", None)
+        self._client_id = security_credentials.get("clientId", None)
+        self._client_secret = security_credentials.get("clientSecret", None)
+        self._token_uri = security_scheme_dict.get("token", None)
+        self._scopes = security_scheme_dict.get("scopes", None)
+        self._tokens = TokenManager(self._fetch_token)
+
+        if self._flow != "client":
+            raise ValueError("Unsupported OAuth2 flow: {}".format(self._flow))
 
-            self._token_uri = security_scheme_dict.get("token", None)
-            self._scopes = security_scheme_dict.get("scopes", None)
+    async def _fetch_token(self, key):
+        """Requests a new access token to the token endpoint with the client credentials grant.
+        Returns the token and its lifetime in seconds."""
 
-            client = BackendApplicationClient(client_id=self._client_id)
-            oauth = OAuth2Session(client=client, scope=self._scopes)
+        scopes = self._scopes if isinstance(self._scopes, list) else [self._scopes]
 
-            self._token = oauth.fetch_token(
-                token_url=self._token_uri, client_id=self._client_id, client_secret=self._client_secret)
+        body = {
+            "grant_type": "client_credentials",
+            "client_id": self._client_id,
+            "client_secret": self._client_secret
+        }
+
+        if self._scopes:
+            body["scope"] = " ".join(scopes)
+
+        http_request = HTTPRequest(
+            self._token_uri, method="POST",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            body=urlencode(body))
 
+        response = await AsyncHTTPClient().fetch(http_request)
+        token = json.loads(response.body)
+
+        return token[self.TOKEN_KEY], token.get("expires_in", None)
 
     async def sign(self, request):
         """Adds the appropriate authorization header to the request."""
 
-        auth_header = f"Bearer {self._token['access_token']}"
-        request.headers["Authorization"] = auth_header
+        access_token = await self._tokens.get(self.TOKEN_KEY)
+        request.headers["Authorization"] = f"Bearer {access_token}"
 
         return request
 
+    def invalidate(self, request):
+        """Discards the cached access token so that the next request fetches a new one."""
+
+        self._tokens.invalidate(self.TOKEN_KEY)
+
+
 class OIDC4VPCredential(BaseCredential):
-    """OpenID Connect for Verifiable Presentations credential."""
+    """OpenID Connect for Verifiable Presentations credential.
+    Tokens are reused for the same device, method and resource until they expire."""
+
+    _token_managers = {}
 
     def __init__(self, security_scheme_dict, security_credentials):
         super().__init__(security_scheme_dict, security_credentials)
@@ -197,6 +234,34 @@ class OIDC4VPCredential(BaseCredential):
         if self._requester is None:
             raise ValueError("Missing Verifiable credentials requester URL/IP")
 
+        self._tokens = self.token_manager(self._holder_url, self._requester)
+
+    @classmethod
+    def token_manager(cls, holder_url, requester):
+        """Returns the TokenManager for the given holder and requester.
+        The manager is shared by the clients and the TD fetches of the process."""
+
+        key = (holder_url, requester)
+
+        if key not in cls._token_managers:
+            async def fetch(token_key):
+                device, method, resource = token_key
+                token = await cls.holder_token_request(holder_url, device + resource, method, requester)
+                return token, token_expires_in(token)
+
+            cls._token_managers[key] = TokenManager(fetch)
+
+        return cls._token_managers[key]
+
+    @staticmethod
+    def token_key(target_url, method):
+        """Returns the (device, method, resource) key of the token for the given request.
+        The query string is not part of the resource."""
+
+        url = urlparse(target_url)
+
+        return f"{url.scheme}://{url.netloc}", method, url.path or "/"
+
     @staticmethod
     async def holder_token_request(holder_url, target_url, method, requester):
         """Function that makes a call to the holder to create a new token
@@ -239,10 +304,13 @@ class OIDC4VPCredential(BaseCredential):
     async def sign(self, request):
         """Adds the appropriate authorization header to the request."""
 
-        token = await self.holder_token_request(
-            self._holder_url, request.url, request.method, self._requester
-        )
+        token = await self._tokens.get(self.token_key(request.url, request.method))
 
         request.headers["X-Auth-Token"] = token
 
         return request
+
+    def invalidate(self, request):
+        """Discards the cached token for the device, method and resource of the request."""
+
+        self._tokens.invalidate(self.token_key(request.url, request.method))
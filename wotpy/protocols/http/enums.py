@@ -13,3 +13,28 @@ class HTTPSchemes(EnumListMixin):
 
     HTTP = "http"
     HTTPS = "https"
+
+
+class HTTPClientBackends(EnumListMixin):
+    """Enumeration of the implementations available for the HTTP client."""
+
+    SIMPLE = "simple"
+    CURL = "curl"
+
+
+class HTTPSubprotocols(EnumListMixin):
+    """Enumeration of the HTTP subprotocols of the Forms exposed by the HTTP server.
+    The batch resource runs readproperty, writeproperty and invokeaction operations."""
+
+    LONGPOLL = "longpoll"
+    SSE = "sse"
+    BATCH = "batch"
+
+
+class ActionInvocationStatus(EnumListMixin):
+    """Enumeration of the states of an asynchronous Action invocation."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
@@ -8,7 +8,9 @@ HTTP request handlers that implement each of the Interaction verbs.
     :toctree: _handlers
 
     wotpy.protocols.http.handlers.action
+    wotpy.protocols.http.handlers.batch
     wotpy.protocols.http.handlers.event
     wotpy.protocols.http.handlers.property
+    wotpy.protocols.http.handlers.sse
     wotpy.protocols.http.handlers.utils
 """
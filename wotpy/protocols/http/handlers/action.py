@@ -2,12 +2,30 @@
 # -*- coding: utf-8 -*-
 
 """
-Request handler for Action interactions.
+Request handlers for Action interactions.
 """
 
-from tornado.web import RequestHandler
+import asyncio
+
+from tornado.web import RequestHandler, HTTPError
 
 import wotpy.protocols.http.handlers.utils as handler_utils
+from wotpy.protocols.http.enums import ActionInvocationStatus
+
+
+def invocation_status(future):
+    """Returns the status document of the Action invocation represented by the given Future."""
+
+    if not future.done():
+        return {"status": ActionInvocationStatus.RUNNING}
+
+    if future.cancelled():
+        return {"status": ActionInvocationStatus.CANCELLED, "error": "Action invocation cancelled"}
+
+    if future.exception() is not None:
+        return {"status": ActionInvocationStatus.FAILED, "error": str(future.exception())}
+
+    return {"status": ActionInvocationStatus.COMPLETED, "result": future.result()}
 
 
 # noinspection PyAbstractClass,PyAttributeOutsideInit
@@ -19,16 +37,95 @@ class ActionInvokeHandler(RequestHandler):
         self._server = http_server
 
     async def post(self, thing_name, name):
-        """Invokes the action and returns the invocation result."""
+        """Invokes the action and returns the invocation result if it is available
+        before the server wait time expires. Otherwise, returns 201 Created with
+        the URL of the invocation status resource in the Location header."""
 
         exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
         valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
         if not valid_creds:
             handler_utils.request_auth(self, self._server.security_scheme, thing_name)
-        else:
-            input_value = handler_utils.get_argument(self, "input")
-            try:
-                result = await exposed_thing.actions[name].invoke(input_value)
-                self.write({"result": result})
-            except Exception as ex:
-                self.write({"error": str(ex)})
+            return
+
+        input_value = handler_utils.get_argument(self, "input")
+        future = asyncio.ensure_future(exposed_thing.actions[name].invoke(input_value))
+
+        await asyncio.wait([future], timeout=self._server.action_wait)
+
+        if future.done():
+            status = invocation_status(future)
+            body = {"error": status["error"]} if "error" in status else {"result": status["result"]}
+            handler_utils.write_value(self, body)
+            return
+
+        invocation_id = self._server.add_pending_action(exposed_thing.title, future)
+
+        status_url = "{}://{}/{}/invocation/{}".format(
+            self.request.protocol, self.request.host, thing_name, invocation_id)
+
+        self.set_status(201)
+        self.set_header("Location", status_url)
+        handler_utils.write_value(self, {"status": ActionInvocationStatus.RUNNING, "invocation": status_url})
+
+
+# noinspection PyAbstractClass,PyAttributeOutsideInit
+class ActionInvocationHandler(RequestHandler):
+    """Handler for the status resources of pending Action invocations."""
+
+    # noinspection PyMethodOverriding
+    def initialize(self, http_server):
+        self._server = http_server
+
+    async def _get_invocation(self, thing_name, invocation_id):
+        """Returns the ExposedThing and the Future of the invocation after checking
+        the request credentials. Returns None if authentication was requested from the client."""
+
+        exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
+        valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
+        if not valid_creds:
+            handler_utils.request_auth(self, self._server.security_scheme, thing_name)
+            return None
+
+        future = await self._server.find_pending_action(exposed_thing.title, invocation_id)
+
+        if future is None:
+            raise HTTPError(404, log_message="Unknown invocation: {}".format(invocation_id))
+
+        return exposed_thing, future
+
+    async def get(self, thing_name, invocation_id):
+        """Returns the status of the invocation. If the wait argument is given,
+        waits (long-polling) up to that many seconds for the invocation to finish."""
+
+        invocation = await self._get_invocation(thing_name, invocation_id)
+
+        if invocation is None:
+            return
+
+        _, future = invocation
+
+        try:
+            wait_secs = min(float(self.get_argument("wait", 0)), self._server.MAX_INVOCATION_WAIT_SECS)
+        except ValueError:
+            raise HTTPError(400, log_message="Invalid wait argument")
+
+        if wait_secs > 0 and not future.done():
+            await asyncio.wait([future], timeout=wait_secs)
+
+        self._server.add_invocation_check(invocation_id)
+        handler_utils.write_value(self, invocation_status(future))
+
+    async def delete(self, thing_name, invocation_id):
+        """Cancels the invocation if it is still running and returns its status."""
+
+        invocation = await self._get_invocation(thing_name, invocation_id)
+
+        if invocation is None:
+            return
+
+        exposed_thing, future = invocation
+        self._server.cancel_pending_action(exposed_thing.title, invocation_id)
+        await asyncio.wait([future], timeout=self._server.MAX_INVOCATION_WAIT_SECS)
+
+        self._server.add_invocation_check(invocation_id)
+        handler_utils.write_value(self, invocation_status(future))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Request handler to run multiple Interactions in a single request.
+"""
+
+import asyncio
+
+from tornado.web import RequestHandler, HTTPError
+
+import wotpy.protocols.http.handlers.utils as handler_utils
+from wotpy.protocols.enums import InteractionVerbs
+
+
+async def run_operation(exposed_thing, operation):
+    """Runs a batch operation on the ExposedThing and returns its result document.
+    Errors are returned in the document instead of being raised."""
+
+    if not isinstance(operation, dict):
+        return {"error": "Invalid operation: {}".format(operation)}
+
+    verb = operation.get("op")
+    name = operation.get("name")
+
+    try:
+        if verb == InteractionVerbs.READ_PROPERTY:
+            return {"value": await exposed_thing.properties[name].read()}
+
+        if verb == InteractionVerbs.WRITE_PROPERTY:
+            await exposed_thing.handle_write_property(name, operation.get("value"))
+            return {}
+
+        if verb == InteractionVerbs.INVOKE_ACTION:
+            return {"result": await exposed_thing.actions[name].invoke(operation.get("input"))}
+    except KeyError as ex:
+        return {"error": ex.args[0] if ex.args else str(ex)}
+    except Exception as ex:
+        return {"error": str(ex)}
+
+    return {"error": "Unsupported operation: {}".format(verb)}
+
+
+# noinspection PyAbstractClass,PyAttributeOutsideInit
+class BatchHandler(RequestHandler):
+    """Handler for requests that contain a list of read, write and invoke operations.
+    The body is {"operations": [...]} where each operation is a dict with the op
+    (readproperty, writeproperty or invokeaction), the Interaction name and the
+    value or input when required. The response is {"results": [...]} with a
+    value, result or error document for each operation."""
+
+    # noinspection PyMethodOverriding
+    def initialize(self, http_server):
+        self._server = http_server
+
+    async def post(self, thing_name):
+        """Runs all the operations concurrently and returns the list of results in the same order.
+        There are no ordering guarantees between the operations of the same request."""
+
+        exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
+        valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
+        if not valid_creds:
+            handler_utils.request_auth(self, self._server.security_scheme, thing_name)
+            return
+
+        operations = handler_utils.get_argument(self, "operations")
+
+        if not isinstance(operations, list):
+            raise HTTPError(400, log_message="Missing list of operations")
+
+        if len(operations) > self._server.MAX_BATCH_OPERATIONS:
+            raise HTTPError(400, log_message="Too many operations: {}".format(len(operations)))
+
+        results = await asyncio.gather(*[
+            run_operation(exposed_thing, operation) for operation in operations
+        ])
+
+        handler_utils.write_value(self, {"results": list(results)})
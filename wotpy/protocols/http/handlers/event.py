@@ -45,7 +45,7 @@ class EventObserverHandler(RequestHandler):
 
             self.subscription = thing_event.subscribe(on_next=on_next, on_error=on_error)
             event_payload = await future_next
-            self.write({"payload": event_payload})
+            handler_utils.write_value(self, {"payload": event_payload})
 
     def on_finish(self):
         """Destroys the subscription to the observable when the request finishes."""
@@ -22,15 +22,22 @@ class PropertyReadWriteHandler(RequestHandler):
         self._server = http_server
 
     async def get(self, thing_name, name):
-        """Reads and returns the Property value."""
+        """Reads and returns the Property value.
+        Responds with 304 Not Modified without reading the value
+        when the version in the If-None-Match header is the current one."""
 
         exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
         valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
         if not valid_creds:
             handler_utils.request_auth(self, self._server.security_scheme, thing_name)
         else:
+            version = exposed_thing.property_version(name)
+
+            if version is not None and handler_utils.check_version_etag(self, version):
+                return
+
             value = await exposed_thing.properties[name].read()
-            self.write({"value": value})
+            handler_utils.write_value(self, {"value": value})
 
     async def put(self, thing_name, name):
         """Updates the Property value."""
@@ -79,7 +86,7 @@ class PropertyObserverHandler(RequestHandler):
 
             self.subscription = thing_property.subscribe(on_next=on_next, on_error=on_error)
             updated_value = await future_next
-            self.write({"value": updated_value})
+            handler_utils.write_value(self, {"value": updated_value})
 
     def on_finish(self):
         """Destroys the subscription to the observable when the request finishes."""
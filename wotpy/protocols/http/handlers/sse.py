@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Request handlers that stream Property updates and Event emissions as Server-Sent Events.
+"""
+
+import asyncio
+import logging
+
+import reactivex
+from reactivex import operators as ops
+from reactivex.scheduler.eventloop import IOLoopScheduler
+from tornado import ioloop
+from tornado.iostream import StreamClosedError
+from tornado.web import RequestHandler
+
+import wotpy.protocols.http.handlers.utils as handler_utils
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.utils.utils import to_json_obj
+
+SSE_EVENT_PROPERTY = "property"
+SSE_EVENT_EVENT = "event"
+
+
+def encode_sse_data(data):
+    """Encodes the data of an SSE event to JSON bytes, converting
+    non-serializable objects only when the direct encoding fails."""
+
+    try:
+        return JSON_CODEC.to_bytes(data)
+    except TypeError:
+        return JSON_CODEC.to_bytes(to_json_obj(data))
+
+
+def property_item_to_sse(item):
+    """Maps a Property change emission to an SSE event name and data."""
+
+    return SSE_EVENT_PROPERTY, {"name": item.data.name, "value": item.data.value}
+
+
+def event_item_to_sse(item):
+    """Maps an Event emission to an SSE event name and data."""
+
+    return SSE_EVENT_EVENT, {"name": item.name, "payload": item.data}
+
+
+# noinspection PyAbstractClass,PyAttributeOutsideInit
+class BaseSSEHandler(RequestHandler):
+    """Base handler that keeps the connection open and writes
+    each item emitted by an Observable as a Server-Sent Event."""
+
+    KEEPALIVE_SECS = 15
+
+    # noinspection PyMethodOverriding
+    def initialize(self, http_server):
+        self._server = http_server
+        self._queue = asyncio.Queue()
+        self._closed = False
+        self._logr = logging.getLogger(__name__)
+
+    async def _write_chunk(self, chunk):
+        """Writes and flushes the given chunk of the event stream."""
+
+        self.write(chunk)
+        await self.flush()
+
+    async def stream(self, observable, item_to_sse):
+        """Streams the items of the Observable until the client closes the connection.
+        The item_to_sse function maps each item to a tuple of SSE event name and data."""
+
+        def on_next(item):
+            self._queue.put_nowait(item_to_sse(item))
+
+        def on_error(err):
+            self._logr.warning("Error on SSE subscription: {}".format(err))
+            self._queue.put_nowait(None)
+
+        self.set_header("Content-Type", MediaTypes.EVENT_STREAM)
+        self.set_header("Cache-Control", "no-cache")
+
+        scheduler = IOLoopScheduler(ioloop.IOLoop.current())
+        subscription = observable.subscribe(on_next=on_next, on_error=on_error, scheduler=scheduler)
+
+        try:
+            await self._write_chunk(": stream\n\n")
+
+            while not self._closed:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=self.KEEPALIVE_SECS)
+                except asyncio.TimeoutError:
+                    await self._write_chunk(": keepalive\n\n")
+                    continue
+
+                if item is None:
+                    break
+
+                event_name, data = item
+
+                await self._write_chunk(b"event: %s\ndata: %s\n\n" % (
+                    event_name.encode("utf8"), encode_sse_data(data)))
+        except StreamClosedError:
+            pass
+        finally:
+            subscription.dispose()
+
+    def on_connection_close(self):
+        """Stops the stream when the client closes the connection."""
+
+        self._closed = True
+        self._queue.put_nowait(None)
+
+
+# noinspection PyAbstractClass
+class PropertySSEHandler(BaseSSEHandler):
+    """Handler that streams the updates of a Property."""
+
+    async def get(self, thing_name, name):
+        """Streams the Property updates as Server-Sent Events."""
+
+        exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
+        valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
+        if not valid_creds:
+            handler_utils.request_auth(self, self._server.security_scheme, thing_name)
+        else:
+            observable = exposed_thing.on_property_change(exposed_thing.properties[name].name)
+            await self.stream(observable, property_item_to_sse)
+
+
+# noinspection PyAbstractClass
+class EventSSEHandler(BaseSSEHandler):
+    """Handler that streams the emissions of an Event."""
+
+    async def get(self, thing_name, name):
+        """Streams the Event emissions as Server-Sent Events."""
+
+        exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
+        valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
+        if not valid_creds:
+            handler_utils.request_auth(self, self._server.security_scheme, thing_name)
+        else:
+            observable = exposed_thing.on_event(exposed_thing.events[name].name)
+            await self.stream(observable, event_item_to_sse)
+
+
+# noinspection PyAbstractClass
+class ThingSSEHandler(BaseSSEHandler):
+    """Handler that streams the updates of all observable
+    Properties and the emissions of all Events of a Thing."""
+
+    async def get(self, thing_name):
+        """Streams all Property updates and Event emissions as Server-Sent Events."""
+
+        exposed_thing = handler_utils.get_exposed_thing(self._server, thing_name)
+        valid_creds = await self._server._check_credentials(exposed_thing.title, self.request)
+        if not valid_creds:
+            handler_utils.request_auth(self, self._server.security_scheme, thing_name)
+            return
+
+        thing = exposed_thing.thing
+
+        observables = [
+            exposed_thing.on_property_change(name).pipe(
+                ops.map(property_item_to_sse))
+            for name, proprty in thing.properties.items() if proprty.observable
+        ]
+
+        observables.extend(
+            exposed_thing.on_event(name).pipe(
+                ops.map(event_item_to_sse))
+            for name in thing.events.keys())
+
+        # noinspection PyUnresolvedReferences
+        await self.stream(reactivex.merge(*observables), lambda item: item)
@@ -5,11 +5,12 @@
 Request handler for Property interactions.
 """
 
-import json
-
 from tornado.web import HTTPError
 
-APPLICATION_JSON = "application/json"
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.utils import STRUCTURED_MEDIA_TYPES, parse_accept, parse_media_type
+
+JSON_CONTENT_TYPE = "application/json; charset=UTF-8"
 
 
 def get_exposed_thing(server, thing_name):
@@ -24,21 +25,86 @@ def get_exposed_thing(server, thing_name):
 
 def get_argument(req_handler, name, default=None):
     """Returns an argument extracted from the request.
-    Interprets the body as JSON if the Content-Type is application/json.
+    Interprets the body with the matching codec if the Content-Type is
+    a structured data media type (e.g. application/json or application/cbor).
     Reverts to the default Tornado get_argument otherwise."""
 
-    if req_handler.request.headers.get("Content-Type") != APPLICATION_JSON:
+    media_type = parse_media_type(req_handler.request.headers.get("Content-Type"))
+
+    if media_type not in STRUCTURED_MEDIA_TYPES:
         return req_handler.get_argument(name, default)
 
+    return get_body(req_handler).get(name, default)
+
+
+def get_body(req_handler):
+    """Returns the object in the request body decoded with the codec for its Content-Type.
+    The body is decoded only once per request."""
+
+    request = req_handler.request
+
     try:
-        parsed_body = json.loads(req_handler.request.body)
+        return request.wotpy_body
+    except AttributeError:
+        pass
+
+    media_type = parse_media_type(request.headers.get("Content-Type")) or MediaTypes.JSON
+
+    try:
+        codec = req_handler._server.codec_for_media_type(media_type)
+    except ValueError:
+        raise HTTPError(415, log_message="Unsupported media type: {}".format(media_type))
+
+    try:
+        parsed_body = codec.to_value(request.body)
     except Exception as ex:
-        raise HTTPError(log_message="Error decoding JSON: {}".format(ex))
+        raise HTTPError(log_message="Error decoding body: {}".format(ex))
 
     if not isinstance(parsed_body, dict):
-        raise HTTPError(log_message="Not a JSON object: {}".format(parsed_body))
+        raise HTTPError(log_message="Not an object: {}".format(parsed_body))
+
+    request.wotpy_body = parsed_body
+
+    return parsed_body
+
+
+def negotiate_codec(req_handler):
+    """Returns the server codec for the media types in the Accept header of the request."""
+
+    accepted = parse_accept(req_handler.request.headers.get("Accept"))
+
+    return req_handler._server.negotiate_codec(accepted)
+
+
+def check_version_etag(req_handler, version):
+    """Sets a weak ETag derived from the version of the resource and the negotiated media type.
+    If the ETag matches the If-None-Match header the request is finished
+    with 304 Not Modified and True is returned."""
+
+    media_type = negotiate_codec(req_handler).media_types[0]
+    req_handler.set_header("Etag", 'W/"{}.{}"'.format(version, media_type.split("/")[-1]))
+    req_handler.set_header("Vary", "Accept")
+
+    if not req_handler.check_etag_header():
+        return False
+
+    req_handler.set_status(304)
+    req_handler.finish()
+
+    return True
+
+
+def write_value(req_handler, value):
+    """Encodes the given value with the codec negotiated with
+    the Accept header and writes the bytes to the response."""
+
+    codec = negotiate_codec(req_handler)
+    media_type = codec.media_types[0]
+
+    req_handler.set_header("Content-Type", JSON_CONTENT_TYPE if media_type == MediaTypes.JSON else media_type)
+    req_handler.set_header("Vary", "Accept")
+    req_handler.write(codec.to_bytes(value))
 
-    return parsed_body.get(name, default)
 
 def request_auth(req_handler, scheme, thing_name):
     """If authentication fails request authentication from the client with the correct scheme."""
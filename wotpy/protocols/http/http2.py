@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP/2 support for the HTTP server built on top of the h2 protocol library.
+Connections that negotiate h2 with TLS ALPN are served by an HTTP/2 state machine
+that dispatches each stream to the same Tornado application used for HTTP/1.1.
+The header and body size limits of the Tornado server also apply to each stream.
+"""
+
+import asyncio
+import logging
+import ssl
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+import tornado.httpserver
+import tornado.httputil
+from tornado.iostream import SSLIOStream, StreamClosedError
+
+from wotpy.protocols.http.tls import ALPN_H2, ALPN_HTTP11, ALPN_PROTOCOLS
+
+CONNECTION_SPECIFIC_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "transfer-encoding",
+    "upgrade"
+}
+
+READ_CHUNK_SIZE = 65535
+DEFAULT_MAX_CONCURRENT_STREAMS = 100
+DEFAULT_MAX_HEADER_SIZE = 65536
+DEFAULT_MAX_BODY_SIZE = 100 * 1024 * 1024
+HEADER_ENTRY_OVERHEAD = 32
+STATUS_BODY_TOO_LARGE = 413
+STATUS_HEADERS_TOO_LARGE = 431
+
+
+# noinspection PyAbstractClass
+class HTTP2StreamConnection(tornado.httputil.HTTPConnection):
+    """Tornado HTTPConnection that writes the response of a single HTTP/2 stream.
+    Writes are chained so that the frames of the stream are always sent in order."""
+
+    def __init__(self, connection, stream_id, context):
+        self._connection = connection
+        self._stream_id = stream_id
+        self._last_write = None
+        self._close_callback = None
+        self.context = context
+
+    @property
+    def stream_id(self):
+        """ID of the HTTP/2 stream."""
+
+        return self._stream_id
+
+    def set_close_callback(self, callback):
+        """Sets a callback that is invoked when the stream is reset or the connection is lost."""
+
+        self._close_callback = callback
+
+    def on_close(self):
+        """Invokes the close callback (only once)."""
+
+        callback, self._close_callback = self._close_callback, None
+
+        if callback is not None:
+            callback()
+
+    def _enqueue(self, func, *args):
+        """Schedules a send coroutine to run after the previous ones of this stream."""
+
+        previous = self._last_write
+
+        async def run():
+            if previous is not None:
+                await previous
+
+            await func(*args)
+
+        future = asyncio.ensure_future(run())
+        future.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+        self._last_write = future
+
+        return future
+
+    def write_headers(self, start_line, headers, chunk=None):
+        """Sends the response status and headers, followed by the optional first chunk of the body."""
+
+        h2_headers = [(":status", str(start_line.code))]
+
+        h2_headers.extend(
+            (name.lower(), value) for name, value in headers.get_all()
+            if name.lower() not in CONNECTION_SPECIFIC_HEADERS)
+
+        future = self._enqueue(self._connection.send_headers, self._stream_id, h2_headers)
+
+        return self.write(chunk) if chunk else future
+
+    def write(self, chunk):
+        """Sends a chunk of the response body."""
+
+        return self._enqueue(self._connection.send_data, self._stream_id, chunk)
+
+    def finish(self):
+        """Closes the stream after all the pending chunks have been sent."""
+
+        self._enqueue(self._connection.end_stream, self._stream_id)
+
+
+class HTTP2ServerConnection:
+    """Serves the HTTP/2 streams of a client connection with a Tornado HTTPServer.
+
+    Requests go through HTTPServer.start_request, so that the xheaders option is honoured.
+    The received data is only acknowledged (opening the flow control window) once the
+    request delegate has consumed it, streams that exceed the header or body size limits
+    of the server are answered with 431 or 413 and streams over max_concurrent_streams are refused."""
+
+    def __init__(self, stream, address, server, max_concurrent_streams=DEFAULT_MAX_CONCURRENT_STREAMS):
+        self._stream = stream
+        self._address = address
+        self._server = server
+        self._streams = {}
+        self._body_sizes = {}
+        self._window_waiters = []
+        self._serve_future = None
+        self._logr = logging.getLogger(__name__)
+
+        self._max_concurrent_streams = max_concurrent_streams
+        self._max_header_size = server.conn_params.max_header_size or DEFAULT_MAX_HEADER_SIZE
+        self._max_body_size = server.conn_params.max_body_size or DEFAULT_MAX_BODY_SIZE
+
+        config = h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        self._h2 = h2.connection.H2Connection(config=config)
+
+
+    def _build_context(self):
+        """Returns a new request context for a stream.
+        Each stream has its own context because xheaders may rewrite it."""
+
+        # noinspection PyProtectedMember
+        return tornado.httpserver._HTTPRequestContext(
+            self._stream, self._address, self._server.protocol or "https",
+            self._server.trusted_downstream)
+
+    async def _flush(self):
+        """Writes the pending outbound frames to the socket."""
+
+        data = self._h2.data_to_send()
+
+        if data:
+            await self._stream.write(data)
+
+    def _notify_window(self):
+        """Wakes up the writers that are waiting for the flow control window to open."""
+
+        waiters, self._window_waiters = self._window_waiters, []
+
+        for waiter in waiters:
+            not waiter.done() and waiter.set_result(None)
+
+    async def _wait_window(self, stream_id):
+        """Waits until the flow control window of the stream is open and returns its size."""
+
+        while True:
+            try:
+                window = self._h2.local_flow_control_window(stream_id)
+            except h2.exceptions.NoSuchStreamError:
+                raise StreamClosedError()
+
+            if window > 0:
+                return window
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._window_waiters.append(waiter)
+            await waiter
+
+    async def send_headers(self, stream_id, headers):
+        """Sends a HEADERS frame on the given stream."""
+
+        try:
+            self._h2.send_headers(stream_id, headers)
+        except h2.exceptions.ProtocolError:
+            raise StreamClosedError()
+
+        await self._flush()
+
+    async def send_data(self, stream_id, data):
+        """Sends the given data on the stream, respecting the flow control window."""
+
+        data = bytes(data)
+
+        while data:
+            window = await self._wait_window(stream_id)
+            size = min(len(data), window, self._h2.max_outbound_frame_size)
+
+            try:
+                self._h2.send_data(stream_id, data[:size])
+            except h2.exceptions.ProtocolError:
+                raise StreamClosedError()
+
+            data = data[size:]
+            await self._flush()
+
+    async def end_stream(self, stream_id):
+        """Ends the response on the given stream."""
+
+        self._streams.pop(stream_id, None)
+        self._body_sizes.pop(stream_id, None)
+
+        try:
+            self._h2.end_stream(stream_id)
+        except h2.exceptions.ProtocolError:
+            raise StreamClosedError()
+
+        await self._flush()
+
+    async def _reject_stream(self, stream_id, status):
+        """Responds to a stream with an error status and stops processing its request."""
+
+        self._on_stream_closed(stream_id)
+
+        try:
+            self._h2.send_headers(stream_id, [(":status", str(status)), ("content-length", "0")], end_stream=True)
+        except h2.exceptions.ProtocolError:
+            self._h2.reset_stream(stream_id, error_code=h2.errors.ErrorCodes.REFUSED_STREAM)
+
+        await self._flush()
+
+    async def _on_request(self, stream_id, headers):
+        """Builds the Tornado request for a new stream and passes the headers to the application."""
+
+        if len(self._streams) >= self._max_concurrent_streams:
+            self._h2.reset_stream(stream_id, error_code=h2.errors.ErrorCodes.REFUSED_STREAM)
+            await self._flush()
+            return
+
+        headers_size = sum(len(name) + len(value) + HEADER_ENTRY_OVERHEAD for name, value in headers)
+
+        if headers_size > self._max_header_size:
+            await self._reject_stream(stream_id, STATUS_HEADERS_TOO_LARGE)
+            return
+
+        pseudo_headers = {}
+        http_headers = tornado.httputil.HTTPHeaders()
+
+        for name, value in headers:
+            if name.startswith(":"):
+                pseudo_headers[name] = value
+            else:
+                http_headers.add(name, value)
+
+        if ":authority" in pseudo_headers and "Host" not in http_headers:
+            http_headers["Host"] = pseudo_headers[":authority"]
+
+        try:
+            content_length = int(http_headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = 0
+
+        if content_length > self._max_body_size:
+            await self._reject_stream(stream_id, STATUS_BODY_TOO_LARGE)
+            return
+
+        start_line = tornado.httputil.RequestStartLine(
+            pseudo_headers.get(":method"), pseudo_headers.get(":path"), "HTTP/2.0")
+
+        stream_conn = HTTP2StreamConnection(self, stream_id, self._build_context())
+        message_delegate = self._server.start_request(self, stream_conn)
+        self._streams[stream_id] = (stream_conn, message_delegate)
+        self._body_sizes[stream_id] = 0
+
+        result = message_delegate.headers_received(start_line, http_headers)
+
+        if result is not None:
+            await result
+
+    async def _on_data(self, stream_id, data, flow_controlled_length):
+        """Passes a chunk of the request body to the application and
+        then acknowledges it, so that the client may send more data."""
+
+        try:
+            stream_conn, message_delegate = self._streams.get(stream_id, (None, None))
+
+            if message_delegate is None:
+                return
+
+            self._body_sizes[stream_id] += len(data)
+
+            if self._body_sizes[stream_id] > self._max_body_size:
+                await self._reject_stream(stream_id, STATUS_BODY_TOO_LARGE)
+                return
+
+            result = message_delegate.data_received(data)
+
+            if result is not None:
+                await result
+        finally:
+            self._h2.acknowledge_received_data(flow_controlled_length, stream_id)
+
+    def _on_stream_closed(self, stream_id):
+        """Notifies the application that a stream was reset by the client."""
+
+        stream_conn, message_delegate = self._streams.pop(stream_id, (None, None))
+        self._body_sizes.pop(stream_id, None)
+
+        if stream_conn is not None:
+            stream_conn.on_close()
+            message_delegate.on_connection_close()
+
+        self._notify_window()
+
+    async def _handle_event(self, event):
+        """Processes an event of the HTTP/2 state machine."""
+
+        if isinstance(event, h2.events.RequestReceived):
+            await self._on_request(event.stream_id, event.headers)
+        elif isinstance(event, h2.events.DataReceived):
+            await self._on_data(event.stream_id, event.data, event.flow_controlled_length)
+        elif isinstance(event, h2.events.StreamEnded):
+            stream_conn, message_delegate = self._streams.get(event.stream_id, (None, None))
+            message_delegate is not None and message_delegate.finish()
+        elif isinstance(event, h2.events.StreamReset):
+            self._on_stream_closed(event.stream_id)
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            self._notify_window()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            raise StreamClosedError()
+
+    def _on_connection_lost(self):
+        """Notifies all the open streams and pending writers that the connection is gone."""
+
+        for stream_id in list(self._streams.keys()):
+            self._on_stream_closed(stream_id)
+
+        waiters, self._window_waiters = self._window_waiters, []
+
+        for waiter in waiters:
+            not waiter.done() and waiter.set_exception(StreamClosedError())
+
+    async def _serve(self):
+        """Reads frames from the client until the connection is closed."""
+
+        self._h2.initiate_connection()
+
+        self._h2.update_settings({
+            h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: self._max_concurrent_streams,
+            h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE: self._max_header_size
+        })
+
+        try:
+            await self._flush()
+
+            while True:
+                data = await self._stream.read_bytes(READ_CHUNK_SIZE, partial=True)
+
+                try:
+                    events = self._h2.receive_data(data)
+                except h2.exceptions.ProtocolError as ex:
+                    self._logr.debug("HTTP/2 protocol error ({}): {}".format(self._address, ex))
+                    await self._flush()
+                    break
+
+                for event in events:
+                    await self._handle_event(event)
+
+                await self._flush()
+        except StreamClosedError:
+            pass
+        finally:
+            self._on_connection_lost()
+            self._stream.close()
+
+    async def serve(self):
+        """Serves the connection until the client or the server closes it."""
+
+        self._serve_future = asyncio.ensure_future(self._serve())
+        await self._serve_future
+
+    async def close(self):
+        """Closes the connection and waits until it is no longer being served."""
+
+        self._stream.close()
+
+        if self._serve_future is not None:
+            await self._serve_future
+
+
+class HTTP2CapableServer(tornado.httpserver.HTTPServer):
+    """Tornado HTTPServer that serves HTTP/2 to the TLS clients that
+    negotiate h2 with ALPN and HTTP/1.1 to all the others.
+    The SSLContext must advertise the ALPN_PROTOCOLS (see build_server_ssl_context)."""
+
+    # noinspection PyMethodOverriding
+    def initialize(self, *args, max_concurrent_streams=DEFAULT_MAX_CONCURRENT_STREAMS, **kwargs):
+        super().initialize(*args, **kwargs)
+        self.max_concurrent_streams = max_concurrent_streams
+
+    async def handle_stream(self, stream, address):
+        """Waits for the TLS handshake and dispatches the connection by ALPN protocol."""
+
+        if not isinstance(stream, SSLIOStream):
+            super().handle_stream(stream, address)
+            return
+
+        try:
+            await stream.wait_for_handshake()
+        except (ssl.SSLError, StreamClosedError, OSError):
+            stream.close()
+            return
+
+        if stream.socket.selected_alpn_protocol() != ALPN_H2:
+            super().handle_stream(stream, address)
+            return
+
+        conn = HTTP2ServerConnection(
+            stream, address, self, max_concurrent_streams=self.max_concurrent_streams)
+
+        self._connections.add(conn)
+
+        try:
+            await conn.serve()
+        finally:
+            self._connections.discard(conn)
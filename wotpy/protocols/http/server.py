@@ -5,18 +5,29 @@
 Class that implements the HTTP server.
 """
 
+import asyncio
+import functools
+import logging
+import time
+import uuid
+
 import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
 import tornado.web
 
 from wotpy.codecs.enums import MediaTypes
 from wotpy.protocols.enums import Protocols, InteractionVerbs
 from wotpy.protocols.http.authenticator import BaseAuthenticator
-from wotpy.protocols.http.enums import HTTPSchemes
-from wotpy.protocols.http.handlers.action import ActionInvokeHandler
+from wotpy.protocols.http.enums import ActionInvocationStatus, HTTPSchemes, HTTPSubprotocols
+from wotpy.protocols.http.handlers.action import ActionInvokeHandler, ActionInvocationHandler, invocation_status
+from wotpy.protocols.http.handlers.batch import BatchHandler
 from wotpy.protocols.http.handlers.event import EventObserverHandler
 from wotpy.protocols.http.handlers.property import PropertyObserverHandler, PropertyReadWriteHandler
+from wotpy.protocols.http.handlers.sse import PropertySSEHandler, EventSSEHandler, ThingSSEHandler
+from wotpy.protocols.http.transforms import GZipThresholdContentEncoding
 from wotpy.protocols.server import BaseProtocolServer
-from wotpy.wot.enums import InteractionTypes, SecuritySchemeType
+from wotpy.wot.enums import InteractionTypes, SecuritySchemeType, SharedStateKinds
 from wotpy.wot.form import Form
 
 
@@ -25,20 +36,62 @@ class HTTPServer(BaseProtocolServer):
 
     DEFAULT_PORT = 8080
     DEFAULT_SECURITY_SCHEME = {"scheme": SecuritySchemeType.NOSEC}
+    DEFAULT_ACTION_WAIT_SECS = 1.0
+    MAX_INVOCATION_WAIT_SECS = 30.0
+    MAX_PURGE_INTERVAL_SECS = 60
+    MAX_BATCH_OPERATIONS = 100
+    SHARED_INVOCATION_WAIT_SECS = 2.0
+    DEFAULT_COMPRESSION_MIN_LENGTH = GZipThresholdContentEncoding.DEFAULT_MIN_LENGTH
+    DEFAULT_MAX_CONCURRENT_STREAMS = 100
 
     def __init__(self, port=DEFAULT_PORT, ssl_context=None, action_ttl_secs=300,
-                 security_scheme=DEFAULT_SECURITY_SCHEME, form_port=None):
+                 security_scheme=DEFAULT_SECURITY_SCHEME, form_port=None, reuse_port=False,
+                 action_wait_secs=DEFAULT_ACTION_WAIT_SECS, http2=False,
+                 compression_min_length=DEFAULT_COMPRESSION_MIN_LENGTH,
+                 xheaders=False, max_body_size=None,
+                 max_concurrent_streams=DEFAULT_MAX_CONCURRENT_STREAMS):
+        """The ssl_context is not modified: to serve HTTP/2 it must advertise
+        the h2 protocol with ALPN (see build_server_ssl_context).
+        The xheaders and max_body_size arguments are passed to the Tornado
+        server and apply both to HTTP/1.1 and HTTP/2 requests."""
+
+        if http2 and ssl_context is None:
+            raise ValueError("HTTP/2 is only available with TLS (ALPN negotiation)")
+
         super().__init__(port=port, form_port=form_port)
         self._server = None
+        self._reuse_port = reuse_port
         self._servient = None
+        self._compression_min_length = compression_min_length
         self._app = self._build_app()
         self._ssl_context = ssl_context
+        self._http2 = http2
+        self._xheaders = xheaders
+        self._max_body_size = max_body_size
+        self._max_concurrent_streams = max_concurrent_streams
         self._scheme = HTTPSchemes.HTTPS if ssl_context is not None else HTTPSchemes.HTTP
         self._action_ttl_secs = action_ttl_secs
+        self._action_wait_secs = action_wait_secs
         self._pending_actions = {}
+        self._pending_action_things = {}
         self._invocation_check_times = {}
+        self._remote_invocations = set()
+        self._invocation_waiters = {}
+        self._purge_callback = None
+        self._logr = logging.getLogger(__name__)
         self._security_scheme = security_scheme if security_scheme.get("scheme", None) in\
             SecuritySchemeType.list() else self.DEFAULT_SECURITY_SCHEME
+        self._authenticator = None
+
+    @property
+    def authenticator(self):
+        """Returns the authenticator for the security scheme of this server.
+        It is built on first use and shared by all the requests."""
+
+        if self._authenticator is None:
+            self._authenticator = BaseAuthenticator.build(self._security_scheme)
+
+        return self._authenticator
 
     @property
     def protocol(self):
@@ -59,6 +112,12 @@ class HTTPServer(BaseProtocolServer):
 
         return self._scheme
 
+    @property
+    def http2(self):
+        """Returns True if TLS clients may negotiate HTTP/2 with this server."""
+
+        return self._http2
+
     @property
     def app(self):
         """Tornado application."""
@@ -71,6 +130,14 @@ class HTTPServer(BaseProtocolServer):
 
         return self._action_ttl_secs
 
+    @property
+    def action_wait(self):
+        """Returns the time (seconds) that an Action invocation request waits for the result
+        before responding with the URL of the invocation status resource.
+        A value of None means that requests always wait for the result."""
+
+        return self._action_wait_secs
+
     @property
     def pending_actions(self):
         """Dict of pending action invocations represented as Futures."""
@@ -83,19 +150,175 @@ class HTTPServer(BaseProtocolServer):
 
         return self._invocation_check_times
 
+    @property
+    def _shared_state_channel(self):
+        """Channel shared with the other servient workers (None when running as a single process)."""
+
+        return self._servient.shared_state_channel if self._servient else None
+
+    def add_pending_action(self, exposed_thing_name, future):
+        """Registers the Future of a running Action invocation of the given
+        ExposedThing and returns the ID of the new invocation.
+        When running as one of multiple workers the status of the invocation
+        is published, so that any worker can serve its status resource."""
+
+        invocation_id = uuid.uuid4().hex
+
+        def retrieve_exception(fut):
+            fut.cancelled() or fut.exception()
+
+        future.add_done_callback(retrieve_exception)
+
+        self._register_pending_action(exposed_thing_name, invocation_id, future)
+
+        channel = self._shared_state_channel
+
+        if channel is not None:
+            channel.publish(
+                exposed_thing_name, SharedStateKinds.INVOCATION,
+                invocation_id, invocation_status(future))
+
+            future.add_done_callback(lambda fut: channel.publish(
+                exposed_thing_name, SharedStateKinds.INVOCATION,
+                invocation_id, invocation_status(fut)))
+
+        return invocation_id
+
+    def _register_pending_action(self, exposed_thing_name, invocation_id, future):
+        """Adds an invocation to the table of pending invocations."""
+
+        self._pending_actions[invocation_id] = future
+        self._pending_action_things[invocation_id] = exposed_thing_name
+        self.add_invocation_check(invocation_id)
+
+        waiter = self._invocation_waiters.pop(invocation_id, None)
+        waiter and not waiter.done() and waiter.set_result(None)
+
+    def _on_shared_invocation(self, exposed_thing_name, invocation_id, status):
+        """Updates the local copy of an Action invocation that runs in another worker."""
+
+        future = self._pending_actions.get(invocation_id)
+
+        if future is None:
+            future = asyncio.get_event_loop().create_future()
+            future.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+            self._remote_invocations.add(invocation_id)
+            self._register_pending_action(exposed_thing_name, invocation_id, future)
+
+        if invocation_id not in self._remote_invocations or future.done():
+            return
+
+        status_name = status.get("status")
+
+        if status_name == ActionInvocationStatus.COMPLETED:
+            future.set_result(status.get("result"))
+        elif status_name == ActionInvocationStatus.FAILED:
+            future.set_exception(Exception(status.get("error")))
+        elif status_name == ActionInvocationStatus.CANCELLED:
+            future.cancel()
+
+    def _on_shared_invocation_cancel(self, exposed_thing_name, invocation_id, data):
+        """Cancels a local Action invocation on request of another worker."""
+
+        if invocation_id in self._remote_invocations:
+            return
+
+        future = self.get_pending_action(exposed_thing_name, invocation_id)
+        future is not None and future.cancel()
+
+    def get_pending_action(self, exposed_thing_name, invocation_id):
+        """Returns the Future of the given Action invocation of the
+        ExposedThing or None if the invocation does not exist."""
+
+        if self._pending_action_things.get(invocation_id) != exposed_thing_name:
+            return None
+
+        return self._pending_actions.get(invocation_id)
+
+    async def find_pending_action(self, exposed_thing_name, invocation_id):
+        """Returns the Future of the given Action invocation or None if it does not exist.
+        When running as one of multiple workers, waits a moment for the
+        status of invocations created by other workers to arrive."""
+
+        future = self.get_pending_action(exposed_thing_name, invocation_id)
+
+        if future is not None or self._shared_state_channel is None:
+            return future
+
+        waiter = self._invocation_waiters.get(invocation_id)
+
+        if waiter is None:
+            waiter = asyncio.get_event_loop().create_future()
+            self._invocation_waiters[invocation_id] = waiter
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.SHARED_INVOCATION_WAIT_SECS)
+        except asyncio.TimeoutError:
+            self._invocation_waiters.pop(invocation_id, None)
+
+        return self.get_pending_action(exposed_thing_name, invocation_id)
+
+    def cancel_pending_action(self, exposed_thing_name, invocation_id):
+        """Cancels an Action invocation. Invocations that run in another
+        worker are cancelled by the worker where they are running."""
+
+        future = self.get_pending_action(exposed_thing_name, invocation_id)
+
+        if future is None:
+            return
+
+        if invocation_id in self._remote_invocations:
+            self._shared_state_channel.publish(
+                exposed_thing_name, SharedStateKinds.INVOCATION_CANCEL, invocation_id, None)
+        else:
+            future.cancel()
+
+    def add_invocation_check(self, invocation_id):
+        """Updates the last time that the given Action invocation was checked by a client."""
+
+        self._invocation_check_times[invocation_id] = time.time()
+
+    def _purge_pending_actions(self):
+        """Removes the Action invocations that have not been checked by a client within the TTL.
+        Invocations that are still running are removed from the table but not cancelled."""
+
+        now = time.time()
+
+        expired = [
+            invocation_id for invocation_id in self._pending_actions
+            if now - self._invocation_check_times.get(invocation_id, 0) > self._action_ttl_secs
+        ]
+
+        for invocation_id in expired:
+            future = self._pending_actions.pop(invocation_id, None)
+            self._pending_action_things.pop(invocation_id, None)
+            self._invocation_check_times.pop(invocation_id, None)
+            self._remote_invocations.discard(invocation_id)
+
+            if future is not None and not future.done():
+                self._logr.debug("Expired unchecked running invocation: {}".format(invocation_id))
+
     async def _check_credentials(self, exposed_thing_name, request):
         """Checks the credentials of a request for a specific thing."""
 
         if self._servient:
             creds = self._servient.retrieve_credentials(exposed_thing_name)
-            authenticator = BaseAuthenticator.build(self._security_scheme)
-            return authenticator.authenticate(creds, request)
+            scope = (exposed_thing_name, self._servient.credentials_version)
+            return await self.authenticator.verify(creds, request, scope=scope)
         else:
             #TODO: If the server is created without a servient should it try to check credentials in some other way?
             return True
 
     def _build_app(self):
-        """Builds and returns the Tornado application for the WebSockets server."""
+        """Builds and returns the Tornado application for the WebSockets server.
+        Responses larger than the compression threshold are gzipped
+        (a threshold of None disables compression)."""
+
+        transforms = []
+
+        if self._compression_min_length is not None:
+            transforms.append(functools.partial(
+                GZipThresholdContentEncoding, min_length=self._compression_min_length))
 
         return tornado.web.Application([(
             r"/(?P<thing_name>[^\/]+)/property/(?P<name>[^\/]+)",
@@ -105,6 +328,10 @@ class HTTPServer(BaseProtocolServer):
             r"/(?P<thing_name>[^\/]+)/property/(?P<name>[^\/]+)/subscription",
             PropertyObserverHandler,
             {"http_server": self}
+        ), (
+            r"/(?P<thing_name>[^\/]+)/property/(?P<name>[^\/]+)/sse",
+            PropertySSEHandler,
+            {"http_server": self}
         ), (
             r"/(?P<thing_name>[^\/]+)/action/(?P<name>[^\/]+)",
             ActionInvokeHandler,
@@ -113,7 +340,23 @@ class HTTPServer(BaseProtocolServer):
             r"/(?P<thing_name>[^\/]+)/event/(?P<name>[^\/]+)/subscription",
             EventObserverHandler,
             {"http_server": self}
-        )])
+        ), (
+            r"/(?P<thing_name>[^\/]+)/event/(?P<name>[^\/]+)/sse",
+            EventSSEHandler,
+            {"http_server": self}
+        ), (
+            r"/(?P<thing_name>[^\/]+)/invocation/(?P<invocation_id>[^\/]+)",
+            ActionInvocationHandler,
+            {"http_server": self}
+        ), (
+            r"/(?P<thing_name>[^\/]+)/sse",
+            ThingSSEHandler,
+            {"http_server": self}
+        ), (
+            r"/(?P<thing_name>[^\/]+)/batch",
+            BatchHandler,
+            {"http_server": self}
+        )], transforms=transforms)
 
     def _build_forms_property(self, proprty, hostname):
         """Builds and returns the HTTP Form instances for the given Property interaction."""
@@ -136,9 +379,18 @@ class HTTPServer(BaseProtocolServer):
             protocol=self.protocol,
             href=href_observe,
             content_type=MediaTypes.JSON,
+            subprotocol=HTTPSubprotocols.LONGPOLL,
+            op=[InteractionVerbs.OBSERVE_PROPERTY])
+
+        form_observe_sse = Form(
+            interaction=proprty,
+            protocol=self.protocol,
+            href="{}/sse".format(href_read_write),
+            content_type=MediaTypes.EVENT_STREAM,
+            subprotocol=HTTPSubprotocols.SSE,
             op=[InteractionVerbs.OBSERVE_PROPERTY])
 
-        return [form_read_write, form_observe]
+        return [form_read_write, form_observe, form_observe_sse]
 
     def _build_forms_action(self, action, hostname):
         """Builds and returns the HTTP Form instances for the given Action interaction."""
@@ -159,18 +411,27 @@ class HTTPServer(BaseProtocolServer):
     def _build_forms_event(self, event, hostname):
         """Builds and returns the HTTP Form instances for the given Event interaction."""
 
-        href_observe = "{}://{}:{}/{}/event/{}/subscription".format(
+        href_event = "{}://{}:{}/{}/event/{}".format(
             self.scheme, hostname.rstrip("/").lstrip("/"), self.form_port,
             event.thing.url_name, event.url_name)
 
         form_observe = Form(
             interaction=event,
             protocol=self.protocol,
-            href=href_observe,
+            href="{}/subscription".format(href_event),
             content_type=MediaTypes.JSON,
+            subprotocol=HTTPSubprotocols.LONGPOLL,
+            op=[InteractionVerbs.SUBSCRIBE_EVENT])
+
+        form_observe_sse = Form(
+            interaction=event,
+            protocol=self.protocol,
+            href="{}/sse".format(href_event),
+            content_type=MediaTypes.EVENT_STREAM,
+            subprotocol=HTTPSubprotocols.SSE,
             op=[InteractionVerbs.SUBSCRIBE_EVENT])
 
-        return [form_observe]
+        return [form_observe, form_observe_sse]
 
     def build_forms(self, hostname, interaction):
         """Builds and returns a list with all Form that are
@@ -185,7 +446,43 @@ class HTTPServer(BaseProtocolServer):
         if interaction.interaction_type not in intrct_type_map:
             raise ValueError("Unsupported interaction")
 
-        return intrct_type_map[interaction.interaction_type](interaction, hostname)
+        forms = intrct_type_map[interaction.interaction_type](interaction, hostname)
+
+        return self.add_media_type_forms(forms)
+
+    def build_thing_forms(self, hostname, thing):
+        """Builds and returns the Thing-level HTTP Forms to stream all Property updates
+        and Event emissions of the given Thing and to run batches of operations."""
+
+        href_thing = "{}://{}:{}/{}".format(
+            self.scheme, hostname.rstrip("/").lstrip("/"),
+            self.form_port, thing.url_name)
+
+        href_sse = "{}/sse".format(href_thing)
+
+        form_sse = Form(
+            interaction=thing,
+            protocol=self.protocol,
+            href=href_sse,
+            content_type=MediaTypes.EVENT_STREAM,
+            subprotocol=HTTPSubprotocols.SSE,
+            op=[InteractionVerbs.OBSERVE_ALL_PROPERTIES, InteractionVerbs.SUBSCRIBE_ALL_EVENTS])
+
+        # The TD schema requires one of the Thing-level verbs in this Form, but the
+        # batch resource does not take the standard multiple-properties payloads:
+        # it takes {"operations": [...]} with any mix of readproperty, writeproperty
+        # and invokeaction operations (see BatchHandler). Clients must pick the
+        # resource by its batch subprotocol and not by these verbs.
+
+        form_batch = Form(
+            interaction=thing,
+            protocol=self.protocol,
+            href="{}/batch".format(href_thing),
+            content_type=MediaTypes.JSON,
+            subprotocol=HTTPSubprotocols.BATCH,
+            op=[InteractionVerbs.READ_MULTIPLE_PROPERTIES, InteractionVerbs.WRITE_MULTIPLE_PROPERTIES])
+
+        return [form_sse, form_batch]
 
     def build_base_url(self, hostname, thing):
         """Returns the base URL for the given Thing in the context of this server."""
@@ -202,12 +499,44 @@ class HTTPServer(BaseProtocolServer):
 
         self._servient = servient
 
-        self._server = tornado.httpserver.HTTPServer(self.app, ssl_options=self._ssl_context)
-        self._server.listen(self.port)
+        if self._http2:
+            from wotpy.protocols.http.http2 import HTTP2CapableServer
+            self._server = HTTP2CapableServer(
+                self.app, ssl_options=self._ssl_context, xheaders=self._xheaders,
+                max_body_size=self._max_body_size,
+                max_concurrent_streams=self._max_concurrent_streams)
+        else:
+            self._server = tornado.httpserver.HTTPServer(
+                self.app, ssl_options=self._ssl_context, xheaders=self._xheaders,
+                max_body_size=self._max_body_size)
+
+        if self._reuse_port:
+            self._server.add_sockets(tornado.netutil.bind_sockets(self.port, reuse_port=True))
+        else:
+            self._server.listen(self.port)
+
+        if self._shared_state_channel is not None:
+            self._shared_state_channel.set_handler(
+                SharedStateKinds.INVOCATION, self._on_shared_invocation)
+            self._shared_state_channel.set_handler(
+                SharedStateKinds.INVOCATION_CANCEL, self._on_shared_invocation_cancel)
+
+        purge_interval_secs = min(self._action_ttl_secs, self.MAX_PURGE_INTERVAL_SECS)
+        self._purge_callback = tornado.ioloop.PeriodicCallback(
+            self._purge_pending_actions, purge_interval_secs * 1000)
+        self._purge_callback.start()
 
     async def stop(self):
         """Stops the HTTP server."""
 
+        if self._purge_callback:
+            self._purge_callback.stop()
+            self._purge_callback = None
+
+        if self._shared_state_channel is not None:
+            self._shared_state_channel.remove_handler(SharedStateKinds.INVOCATION)
+            self._shared_state_channel.remove_handler(SharedStateKinds.INVOCATION_CANCEL)
+
         if not self._server:
             return
 
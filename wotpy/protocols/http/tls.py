@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functions to build the TLS configuration of the HTTP server.
+"""
+
+import ssl
+
+DEFAULT_NUM_TICKETS = 2
+
+ALPN_H2 = "h2"
+ALPN_HTTP11 = "http/1.1"
+ALPN_PROTOCOLS = [ALPN_H2, ALPN_HTTP11]
+
+
+def build_server_ssl_context(certfile, keyfile, session_tickets=True,
+                             num_tickets=DEFAULT_NUM_TICKETS, min_version=None, alpn_protocols=None):
+    """Builds the SSLContext of a TLS server with session resumption enabled.
+    Clients may resume sessions with the stateless session tickets (TLS 1.2 and 1.3)
+    or with the session IDs kept in the server session cache (TLS 1.2).
+    The min_version argument is the name of a member of ssl.TLSVersion (e.g. TLSv1_2).
+    The alpn_protocols argument is the list of protocols advertised with ALPN
+    (e.g. ALPN_PROTOCOLS to serve HTTP/2)."""
+
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+
+    if session_tickets:
+        ssl_context.options &= ~ssl.OP_NO_TICKET
+        ssl_context.num_tickets = num_tickets
+    else:
+        ssl_context.options |= ssl.OP_NO_TICKET
+        ssl_context.num_tickets = 0
+
+    if min_version is not None:
+        try:
+            ssl_context.minimum_version = ssl.TLSVersion[min_version]
+        except KeyError:
+            raise ValueError("Unknown TLS version: {}".format(min_version))
+
+    if alpn_protocols:
+        ssl_context.set_alpn_protocols(alpn_protocols)
+
+    return ssl_context
+
+
+def session_stats(ssl_context):
+    """Returns the handshake and session resumption counters of the given SSLContext."""
+
+    stats = ssl_context.session_stats()
+
+    return {
+        "accepted": stats.get("accept_good", 0),
+        "resumed": stats.get("hits", 0),
+        "misses": stats.get("misses", 0)
+    }
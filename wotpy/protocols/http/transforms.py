@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Output transforms applied to the responses of the HTTP server.
+"""
+
+from tornado.web import GZipContentEncoding
+
+from wotpy.codecs.enums import MediaTypes
+
+
+class GZipThresholdContentEncoding(GZipContentEncoding):
+    """Applies gzip to the Interaction payloads that are larger than the size threshold
+    when the client accepts it. Event streams are never compressed."""
+
+    DEFAULT_MIN_LENGTH = 1024
+
+    CONTENT_TYPES = {
+        MediaTypes.JSON,
+        MediaTypes.CBOR
+    }
+
+    def __init__(self, request, min_length=DEFAULT_MIN_LENGTH):
+        super().__init__(request)
+        self.MIN_LENGTH = min_length
+
+    def _compressible_type(self, ctype):
+        """Returns True if responses with the given media type may be compressed."""
+
+        return ctype in self.CONTENT_TYPES
@@ -9,6 +9,7 @@ MQTT Protocol Binding implementation.
 
     wotpy.protocols.mqtt.handlers
     wotpy.protocols.mqtt.client
+    wotpy.protocols.mqtt.connection
     wotpy.protocols.mqtt.enums
     wotpy.protocols.mqtt.runner
     wotpy.protocols.mqtt.server
@@ -8,41 +8,37 @@ Classes that contain the client logic for the MQTT protocol.
 import asyncio
 import copy
 import datetime
-import json
 import logging
-import pprint
-import time
 import uuid
+import warnings
 from urllib import parse
 
-import amqtt.client
 from amqtt.mqtt.constants import QOS_0, QOS_1, QOS_2
 import reactivex
 
+from wotpy.codecs.json_codec import JSON_CODEC
 from wotpy.protocols.client import BaseProtocolClient
 from wotpy.protocols.enums import InteractionVerbs, Protocols
 from wotpy.protocols.exceptions import (ClientRequestTimeout,
                                         FormNotFoundException)
+from wotpy.protocols.mqtt.connection import MQTTBrokerConnection
 from wotpy.protocols.mqtt.enums import MQTTSchemes
 from wotpy.protocols.mqtt.handlers.action import ActionMQTTHandler
 from wotpy.protocols.mqtt.handlers.property import PropertyMQTTHandler
 from wotpy.protocols.refs import ConnRefCounter
-from wotpy.protocols.utils import is_scheme_form
-from wotpy.utils.utils import handle_observer_finalization
+from wotpy.protocols.utils import is_scheme_form, memoized_pick
+from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.events import (EmittedEvent, PropertyChangeEmittedEvent,
                               PropertyChangeEventInit)
 
 
 class MQTTClient(BaseProtocolClient):
-    """Implementation of the protocol client interface for the MQTT protocol."""
-
-    DELIVER_TERMINATE_LOOP_SLEEP_SECS = 0.1
-    SLEEP_SECS_DELIVER_ERR = 1.0
+    """Implementation of the protocol client interface for the MQTT protocol.
+    Requests and subscriptions to the same broker share a single connection."""
 
     DEFAULT_DELIVER_TIMEOUT_SECS = 1
-    DEFAULT_MSG_WAIT_TIMEOUT_SECS = 5
-    DEFAULT_MSG_TTL_SECS = 15
-    DEFAULT_STOP_LOOP_TIMEOUT_SECS = 60
+    DEFAULT_IDLE_DISCONNECT_SECS = 30
+    DEFAULT_MAX_INFLIGHT_PUBLISHES = MQTTBrokerConnection.DEFAULT_MAX_INFLIGHT
 
     # Highly permissive default keep_alive to avoid
     # disconnections from broker on high throughput scenarios:
@@ -54,25 +50,42 @@ class MQTTClient(BaseProtocolClient):
 
     def __init__(self,
                  deliver_timeout_secs=DEFAULT_DELIVER_TIMEOUT_SECS,
-                 msg_wait_timeout_secs=DEFAULT_MSG_WAIT_TIMEOUT_SECS,
-                 msg_ttl_secs=DEFAULT_MSG_TTL_SECS,
+                 msg_wait_timeout_secs=None,
+                 msg_ttl_secs=None,
                  timeout_default=None,
                  amqtt_config=None,
                  ca_file=None,
-                 stop_loop_timeout_secs=DEFAULT_STOP_LOOP_TIMEOUT_SECS):
+                 stop_loop_timeout_secs=None,
+                 idle_disconnect_secs=DEFAULT_IDLE_DISCONNECT_SECS,
+                 max_inflight_publishes=DEFAULT_MAX_INFLIGHT_PUBLISHES):
+        """The msg_wait_timeout_secs, msg_ttl_secs and stop_loop_timeout_secs arguments
+        are deprecated and ignored: responses are now routed to the waiting requests
+        as soon as they are delivered, so messages are no longer buffered or polled."""
+
+        deprecated = {
+            "msg_wait_timeout_secs": msg_wait_timeout_secs,
+            "msg_ttl_secs": msg_ttl_secs,
+            "stop_loop_timeout_secs": stop_loop_timeout_secs
+        }
+
+        for name, value in deprecated.items():
+            if value is not None:
+                warnings.warn(
+                    "MQTTClient argument {} is deprecated and ignored".format(name),
+                    DeprecationWarning, stacklevel=2)
+
         self._deliver_timeout_secs = deliver_timeout_secs
-        self._msg_wait_timeout_secs = msg_wait_timeout_secs
-        self._msg_ttl_secs = msg_ttl_secs
         self._timeout_default = timeout_default
         self._amqtt_config = amqtt_config
         self.ca_file = ca_file
-        self._stop_loop_timeout_secs = stop_loop_timeout_secs
-        self._lock_client = asyncio.Lock()
-        self._deliver_stop_events = {}
-        self._msg_conditions = {}
-        self._clients = {}
-        self._messages = {}
-        self._topics = {}
+        self._idle_disconnect_secs = idle_disconnect_secs
+        self._max_inflight_publishes = max_inflight_publishes
+        self._broker_locks = {}
+        self._connections = {}
+        self._idle_handles = {}
+        self._response_topics = {}
+        self._pending = {}
+        self._topic_waiters = {}
         self._ref_counter = ConnRefCounter()
         self._logr = logging.getLogger(__name__)
 
@@ -90,273 +103,180 @@ class MQTTClient(BaseProtocolClient):
 
         return config
 
-    async def _new_message(self, broker_url, msg):
-        """Adds the message to the internal queue and notifies all topic listeners."""
+    def _resolve_response(self, broker_url, msg, correlation_key):
+        """Resolves the Futures waiting for the message delivered in a response topic.
+        Messages are matched by the correlation ID in the given key of the payload.
+        When the key is None the message resolves all the Futures waiting on the topic."""
 
-        assert broker_url in self._msg_conditions, "Unknown broker in conditions"
-        assert msg.topic in self._msg_conditions[broker_url], "Unknown topic"
+        msg_data = JSON_CODEC.to_value(msg.data)
 
-        if broker_url not in self._messages:
-            self._messages[broker_url] = {}
+        if correlation_key is None:
+            futures = self._topic_waiters.pop((broker_url, msg.topic), [])
+        else:
+            correlation_id = msg_data.get(correlation_key, None) if isinstance(msg_data, dict) else None
+            future = self._pending.pop((broker_url, msg.topic, correlation_id), None)
+            futures = [future] if future is not None else []
 
-        if msg.topic not in self._messages[broker_url]:
-            self._messages[broker_url][msg.topic] = []
+        for future in futures:
+            not future.done() and future.set_result(msg_data)
 
-        self._messages[broker_url][msg.topic].append({
-            "id": uuid.uuid4().hex,
-            "data": json.loads(msg.data.decode()),
-            "time": time.time()
-        })
+    def _build_response_listener(self, broker_url, correlation_key):
+        """Builds the connection listener that resolves the Futures of a response topic."""
 
-        async with self._msg_conditions[broker_url][msg.topic]:
-            self._msg_conditions[broker_url][msg.topic].notify_all()
+        def listener(msg):
+            self._resolve_response(broker_url, msg, correlation_key)
 
-        self._clean_messages(broker_url)
+        return listener
 
-    async def _reconnect_client(self, broker_url):
-        """Reconnects an existing client that has been disconnected."""
+    def _expect_response(self, broker_url, topic, correlation_id=None):
+        """Returns a Future that resolves with the payload of the response with the given
+        correlation ID or with the next message in the topic if the ID is None."""
 
-        assert broker_url in self._clients, "Unknown broker"
+        future = asyncio.get_running_loop().create_future()
 
-        self._logr.info("Reconnecting MQTT client: {}".format(broker_url))
+        if correlation_id is None:
+            self._topic_waiters.setdefault((broker_url, topic), []).append(future)
+        else:
+            self._pending[(broker_url, topic, correlation_id)] = future
 
-        await self._clients[broker_url].reconnect(cleansession=False)
+        return future
 
-        topics = self._topics.get(broker_url, set())
+    def _discard_response(self, broker_url, topic, future, correlation_id=None):
+        """Stops waiting for a response."""
 
-        if not len(topics):
+        if correlation_id is not None:
+            self._pending.pop((broker_url, topic, correlation_id), None)
             return
 
-        self._logr.info("Resubscribing MQTT client on {} to topics:\n{}".format(
-            broker_url, pprint.pformat(topics)))
+        waiters = self._topic_waiters.get((broker_url, topic), [])
 
-        await self._clients[broker_url].subscribe([(topic, qos) for topic, qos in topics])
+        if future in waiters:
+            waiters.remove(future)
 
-    def _build_deliver(self, broker_url, stop_event):
-        """Factory for functions to get messages delivered by the broker into the messages queue."""
-
-        async def reconnect():
-            """Sleeps for a while and tries to reconnect and resubscribe afterwards."""
-
-            try:
-                self._logr.debug("Sleeping for {} s".format(
-                    self.SLEEP_SECS_DELIVER_ERR))
-                await asyncio.sleep(self.SLEEP_SECS_DELIVER_ERR)
-                await self._reconnect_client(broker_url)
-            except Exception as ex_reconn:
-                self._logr.warning("Error reconnecting: {}".format(
-                    ex_reconn), exc_info=True)
+        if not len(waiters):
+            self._topic_waiters.pop((broker_url, topic), None)
 
-        async def deliver():
-            """Loop that receives the messages from the broker."""
-
-            assert broker_url in self._clients
-
-            self._logr.debug(
-                "Entering message delivery loop: {}".format(broker_url))
-
-            while not stop_event.is_set():
-                try:
-                    msg = await self._clients[broker_url].deliver_message(
-                        timeout=self._deliver_timeout_secs)
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as ex:
-                    self._logr.warning(
-                        "Error delivering message: {}".format(ex))
-                    await reconnect()
-                    continue
+    async def _wait_response(self, future, timeout):
+        """Waits for the response Future, raising ClientRequestTimeout on timeout."""
 
-                try:
-                    await self._new_message(broker_url, msg)
-                except Exception as ex:
-                    self._logr.warning(
-                        "Error processing message: {}".format(ex),
-                        exc_info=True)
-
-            self._logr.debug(
-                "Exiting message delivery loop: {}".format(broker_url))
-
-            stop_event.clear()
-
-        return deliver
-
-    async def _start_deliver_loop(self, broker_url):
-        """Starts the message delivery loop in the background."""
-
-        assert broker_url not in self._deliver_stop_events, "Stop event is already defined"
-
-        stop_event = asyncio.Event()
-        self._deliver_stop_events[broker_url] = stop_event
-        deliver_loop_cb = self._build_deliver(broker_url, stop_event)
-        asyncio.create_task(deliver_loop_cb())
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ClientRequestTimeout
 
-    async def _stop_deliver_loop(self, broker_url):
-        """Asks the message delivery loop to stop gracefully."""
+    def _broker_lock(self, broker_url):
+        """Returns the lock that serializes the connection lifecycle changes of a broker.
+        Each broker has its own lock so that a slow broker does not block the others."""
 
-        assert broker_url in self._deliver_stop_events, "Unknown broker"
+        if broker_url not in self._broker_locks:
+            self._broker_locks[broker_url] = asyncio.Lock()
 
-        assert not self._deliver_stop_events[broker_url].is_set(), \
-            "Stop event is already set"
+        return self._broker_locks[broker_url]
 
-        self._deliver_stop_events[broker_url].set()
+    async def _init_client(self, broker_url, ref_id):
+        """Adds a reference to the shared connection to the given broker URL,
+        connecting to the broker if there is no open connection."""
 
-        now = time.time()
+        async with self._broker_lock(broker_url):
+            self._ref_counter.increase(broker_url, ref_id)
 
-        def raise_timeout():
-            """Checks if enought time has passed to raise a timeout error."""
+            idle_handle = self._idle_handles.pop(broker_url, None)
+            idle_handle and idle_handle.cancel()
 
-            if self._stop_loop_timeout_secs is None:
+            if broker_url in self._connections:
                 return
 
-            if (time.time() - now) > self._stop_loop_timeout_secs:
-                raise asyncio.TimeoutError(
-                    "Timeout waiting for message delivery loop")
+            connection = MQTTBrokerConnection(
+                broker_url, self._build_client_config(),
+                ca_file=self.ca_file, deliver_timeout_secs=self._deliver_timeout_secs,
+                max_inflight=self._max_inflight_publishes)
 
-        while self._deliver_stop_events[broker_url].is_set():
-            raise_timeout()
-            await asyncio.sleep(self.DELIVER_TERMINATE_LOOP_SLEEP_SECS)
+            await connection.connect()
 
-        self._deliver_stop_events.pop(broker_url)
+            self._connections[broker_url] = connection
 
-    async def _init_client(self, broker_url, ref_id):
-        """Initializes and connects a client to the given broker URL."""
+    async def _close_connection(self, broker_url):
+        """Closes the connection to the given broker if it does not have any references."""
 
-        async with self._lock_client:
-            self._ref_counter.increase(broker_url, ref_id)
+        async with self._broker_lock(broker_url):
+            self._idle_handles.pop(broker_url, None)
 
-            if broker_url in self._clients:
+            if self._ref_counter.has_any(broker_url):
                 return
 
-            config = self._build_client_config()
-
-            self._logr.debug("Connecting MQTT client to {} with config: {}".format(
-                broker_url, pprint.pformat(config)))
-
-            self._clients[broker_url] = amqtt.client.MQTTClient(config=config)
+            connection = self._connections.pop(broker_url, None)
+            self._response_topics.pop(broker_url, None)
 
-            await self._clients[broker_url].connect(broker_url, cafile=self.ca_file, cleansession=False)
-
-            await self._start_deliver_loop(broker_url)
+            if connection is not None:
+                await connection.close()
 
     async def _disconnect_client(self, broker_url, ref_id):
-        """Decreases the reference counter for the client on the given broker and cleans
-        all resources when the client does not have any more references pointing to it."""
+        """Decreases the reference counter for the connection on the given broker.
+        The connection is closed when it has been idle (without references) for a while."""
 
-        async with self._lock_client:
+        async with self._broker_lock(broker_url):
             self._ref_counter.decrease(broker_url, ref_id)
 
-            if self._ref_counter.has_any(broker_url):
+            if self._ref_counter.has_any(broker_url) or broker_url in self._idle_handles:
                 return
 
-            try:
-                self._logr.debug(
-                    "Stopping message delivery loop: {}".format(broker_url))
-                await self._stop_deliver_loop(broker_url)
-            except Exception as ex:
-                self._logr.warning(
-                    "Error stopping deliver loop: {}".format(ex),
-                    exc_info=True)
-
-            try:
-                self._logr.debug(
-                    "Disconnecting MQTT client: {}".format(broker_url))
-                await self._clients[broker_url].disconnect()
-            except Exception as ex:
-                self._logr.warning(
-                    "Error disconnecting: {}".format(ex),
-                    exc_info=True)
-
-            self._clients.pop(broker_url, None)
-            self._messages.pop(broker_url, None)
-            self._msg_conditions.pop(broker_url, None)
-            self._topics.pop(broker_url, None)
-
-    async def _subscribe(self, broker_url, topic, qos):
-        """Subscribes to a topic."""
-
-        async with self._lock_client:
-            if broker_url not in self._clients:
+            if not self._idle_disconnect_secs:
+                asyncio.ensure_future(self._close_connection(broker_url))
                 return
 
-            if broker_url not in self._msg_conditions:
-                self._msg_conditions[broker_url] = {}
-
-            if topic not in self._msg_conditions[broker_url]:
-                self._msg_conditions[broker_url][topic] = \
-                    asyncio.Condition()
+            self._idle_handles[broker_url] = asyncio.get_running_loop().call_later(
+                self._idle_disconnect_secs,
+                lambda: asyncio.ensure_future(self._close_connection(broker_url)))
 
-            if broker_url not in self._topics:
-                self._topics[broker_url] = set()
+    async def close(self):
+        """Closes the connections to all brokers."""
 
-            self._topics[broker_url].add((topic, qos))
+        for broker_url in list(self._connections.keys()):
+            async with self._broker_lock(broker_url):
+                idle_handle = self._idle_handles.pop(broker_url, None)
+                idle_handle and idle_handle.cancel()
 
-            await self._clients[broker_url].subscribe([(topic, qos)])
+                connection = self._connections.pop(broker_url, None)
+                self._response_topics.pop(broker_url, None)
 
-    async def _publish(self, broker_url, topic, payload, qos):
-        """Publishes a message with the given payload in a topic."""
-
-        async with self._lock_client:
-            if broker_url not in self._clients:
-                return
-
-            await self._clients[broker_url].publish(topic, payload, qos=qos)
-
-    def _topic_messages(self, broker_url, topic, from_time=None, ignore_ids=None):
-        """Returns a generator that yields the messages in the
-        delivered messages queue for the given topic."""
-
-        if broker_url not in self._messages:
-            return
-
-        if topic not in self._messages[broker_url]:
-            return
+                if connection is not None:
+                    await connection.close()
 
-        for msg in self._messages[broker_url][topic]:
-            is_on_time = from_time is None or msg["time"] >= from_time
-            is_ignored = ignore_ids is not None and msg["id"] in ignore_ids
+        self._ref_counter = ConnRefCounter()
 
-            if is_on_time and not is_ignored:
-                yield msg["id"], msg["data"], msg["time"]
+    async def _subscribe(self, broker_url, topic, qos, correlation_key=None):
+        """Subscribes to a response topic. The subscription is kept
+        for as long as the connection to the broker is open.
+        Concurrent requests on the same topic wait for the same subscription."""
 
-    def _clean_messages(self, broker_url):
-        """Removes the messages that have expired according to the TTL."""
+        connection = self._connections.get(broker_url, None)
 
-        if broker_url not in self._messages:
+        if connection is None:
             return
 
-        now = time.time()
-
-        self._messages[broker_url] = {
-            topic: [
-                msg for msg in self._messages[broker_url][topic]
-                if (now - msg["time"]) < self._msg_ttl_secs
-            ] for topic in self._messages[broker_url]
-        }
+        topics = self._response_topics.setdefault(broker_url, {})
 
-    def _next_match(self, broker_url, topic, func):
-        """Returns the first message match in the internal messages queue or None."""
+        if topic not in topics:
+            topics[topic] = asyncio.ensure_future(connection.add_listener(
+                topic, qos, self._build_response_listener(broker_url, correlation_key),
+                persistent=True))
 
-        return next((item for item in self._topic_messages(broker_url, topic) if func(item)), None)
+        try:
+            await asyncio.shield(topics[topic])
+        except Exception:
+            topics.pop(topic, None)
+            raise
 
-    async def _wait_condition(self, condition):
-        """Acquires the lock of the condition and waits on it."""
-        async with condition:
-            await condition.wait()
+    async def _publish(self, broker_url, topic, payload, qos):
+        """Publishes a message with the given payload in a topic.
+        Publications are pipelined in the queue of the broker connection."""
 
-    async def _wait_on_message(self, broker_url, topic):
-        """Waits for the arrival of a message in the given topic."""
+        connection = self._connections.get(broker_url, None)
 
-        assert broker_url in self._msg_conditions, "Unknown broker URL"
-        assert topic in self._msg_conditions[broker_url], "Unknown topic"
+        if connection is None:
+            return
 
-        try:
-            await asyncio.wait_for(
-                self._wait_condition(
-                    self._msg_conditions[broker_url][topic]),
-                    timeout=self._msg_wait_timeout_secs)
-        except asyncio.TimeoutError:
-            pass
+        await connection.publish(topic, payload, qos)
 
     @classmethod
     def _pick_mqtt_href(cls, td, forms, op=None):
@@ -414,7 +334,7 @@ class MQTTClient(BaseProtocolClient):
         timeout = timeout if timeout else self._timeout_default
         ref_id = uuid.uuid4().hex
 
-        href = self._pick_mqtt_href(td, td.get_action_forms(name))
+        href = memoized_pick(td, Protocols.MQTT, InteractionTypes.ACTION, name, self._pick_mqtt_href)
 
         if href is None:
             raise FormNotFoundException()
@@ -425,45 +345,38 @@ class MQTTClient(BaseProtocolClient):
         topic_invoke = parsed_href["topic"]
         topic_result = ActionMQTTHandler.to_result_topic(topic_invoke)
 
+        invocation_id = uuid.uuid4().hex
+        future = None
+
         try:
             await self._init_client(broker_url, ref_id)
-            await self._subscribe(broker_url, topic_result, qos_subscribe)
+
+            await self._subscribe(
+                broker_url, topic_result, qos_subscribe,
+                correlation_key=ActionMQTTHandler.KEY_INVOCATION_ID)
 
             input_data = {
-                "id": uuid.uuid4().hex,
+                ActionMQTTHandler.KEY_INVOCATION_ID: invocation_id,
                 "input": input_value
             }
 
-            input_payload = json.dumps(input_data).encode()
+            input_payload = JSON_CODEC.to_bytes(input_data)
+            future = self._expect_response(broker_url, topic_result, invocation_id)
 
             await self._publish(broker_url, topic_invoke, input_payload, qos_publish)
 
-            ini = time.time()
-
-            while True:
-                self._logr.debug(
-                    "Checking invocation topic: {}".format(topic_result))
-
-                if timeout and (time.time() - ini) > timeout:
-                    self._logr.warning(
-                        "Timeout invoking Action: {}".format(topic_result))
-                    raise ClientRequestTimeout
-
-                msg_match = self._next_match(
-                    broker_url, topic_result,
-                    lambda item: item[1].get("id") == input_data.get("id"))
-
-                if not msg_match:
-                    await self._wait_on_message(broker_url, topic_result)
-                    continue
-
-                msg_id, msg_data, msg_time = msg_match
-
-                if msg_data.get("error", None) is not None:
-                    raise Exception(msg_data.get("error"))
-                else:
-                    return msg_data.get("result")
+            try:
+                msg_data = await self._wait_response(future, timeout)
+            except ClientRequestTimeout:
+                self._logr.warning("Timeout invoking Action: {}".format(topic_result))
+                raise
+
+            if msg_data.get("error", None) is not None:
+                raise Exception(msg_data.get("error"))
+            else:
+                return msg_data.get("result")
         finally:
+            future and self._discard_response(broker_url, topic_result, future, invocation_id)
             await self._disconnect_client(broker_url, ref_id)
 
     async def write_property(self, td, name, value, timeout=None,
@@ -476,9 +389,9 @@ class MQTTClient(BaseProtocolClient):
         timeout = timeout if timeout else self._timeout_default
         ref_id = uuid.uuid4().hex
 
-        href_write = self._pick_mqtt_href(
-            td, td.get_property_forms(name),
-            op=InteractionVerbs.WRITE_PROPERTY)
+        href_write = memoized_pick(
+            td, Protocols.MQTT, InteractionTypes.PROPERTY, name,
+            self._pick_mqtt_href, op=InteractionVerbs.WRITE_PROPERTY)
 
         if href_write is None:
             raise FormNotFoundException()
@@ -489,43 +402,37 @@ class MQTTClient(BaseProtocolClient):
         topic_write = parsed_href_write["topic"]
         topic_ack = PropertyMQTTHandler.to_write_ack_topic(topic_write)
 
+        ack_id = uuid.uuid4().hex
+        future = None
+
         try:
             await self._init_client(broker_url, ref_id)
-            await self._subscribe(broker_url, topic_ack, qos_subscribe)
+
+            await self._subscribe(
+                broker_url, topic_ack, qos_subscribe,
+                correlation_key=PropertyMQTTHandler.KEY_ACK)
 
             write_data = {
                 "action": "write",
                 "value": value,
-                "ack": uuid.uuid4().hex
+                PropertyMQTTHandler.KEY_ACK: ack_id
             }
 
-            write_payload = json.dumps(write_data).encode()
+            write_payload = JSON_CODEC.to_bytes(write_data)
+            future = self._expect_response(broker_url, topic_ack, ack_id) if wait_ack else None
 
             await self._publish(broker_url, topic_write, write_payload, qos_publish)
 
             if not wait_ack:
                 return
 
-            ini = time.time()
-
-            while True:
-                self._logr.debug(
-                    "Checking write ACK topic: {}".format(topic_ack))
-
-                if timeout and (time.time() - ini) > timeout:
-                    self._logr.warning(
-                        "Timeout writing Property: {}".format(topic_ack))
-                    raise ClientRequestTimeout
-
-                msg_match = self._next_match(
-                    broker_url, topic_ack,
-                    lambda item: item[1].get("ack") == write_data.get("ack"))
-
-                if msg_match:
-                    break
-
-                await self._wait_on_message(broker_url, topic_ack)
+            try:
+                await self._wait_response(future, timeout)
+            except ClientRequestTimeout:
+                self._logr.warning("Timeout writing Property: {}".format(topic_ack))
+                raise
         finally:
+            future and self._discard_response(broker_url, topic_ack, future, ack_id)
             await self._disconnect_client(broker_url, ref_id)
 
     async def read_property(self, td, name, timeout=None,
@@ -536,15 +443,13 @@ class MQTTClient(BaseProtocolClient):
         timeout = timeout if timeout else self._timeout_default
         ref_id = uuid.uuid4().hex
 
-        forms = td.get_property_forms(name)
-
-        href_read = self._pick_mqtt_href(
-            td, forms,
-            op=InteractionVerbs.READ_PROPERTY)
+        href_read = memoized_pick(
+            td, Protocols.MQTT, InteractionTypes.PROPERTY, name,
+            self._pick_mqtt_href, op=InteractionVerbs.READ_PROPERTY)
 
-        href_obsv = self._pick_mqtt_href(
-            td, forms,
-            op=InteractionVerbs.OBSERVE_PROPERTY)
+        href_obsv = memoized_pick(
+            td, Protocols.MQTT, InteractionTypes.PROPERTY, name,
+            self._pick_mqtt_href, op=InteractionVerbs.OBSERVE_PROPERTY)
 
         if href_read is None or href_obsv is None:
             raise FormNotFoundException()
@@ -558,92 +463,90 @@ class MQTTClient(BaseProtocolClient):
         broker_read = parsed_href_read["broker_url"]
         broker_obsv = parsed_href_obsv["broker_url"]
 
+        future = None
+
         try:
             await self._init_client(broker_read, ref_id)
             broker_obsv != broker_read and (await self._init_client(broker_obsv, ref_id))
 
             await self._subscribe(broker_obsv, topic_obsv, qos_subscribe)
 
-            read_time = time.time()
-            read_payload = json.dumps({"action": "read"}).encode()
+            read_payload = JSON_CODEC.to_bytes({"action": "read"})
+            future = self._expect_response(broker_obsv, topic_obsv)
 
             await self._publish(broker_read, topic_read, read_payload, qos_publish)
 
-            ini = time.time()
-
-            while True:
-                self._logr.debug(
-                    "Checking property update topic: {}".format(topic_obsv))
-
-                if timeout and (time.time() - ini) > timeout:
-                    self._logr.warning(
-                        "Timeout reading Property: {}".format(topic_obsv))
-                    raise ClientRequestTimeout
-
-                msg_match = self._next_match(
-                    broker_obsv, topic_obsv,
-                    lambda item: item[2] >= read_time)
-
-                if not msg_match:
-                    await self._wait_on_message(broker_obsv, topic_obsv)
-                    continue
-
-                msg_id, msg_data, msg_time = msg_match
+            try:
+                msg_data = await self._wait_response(future, timeout)
+            except ClientRequestTimeout:
+                self._logr.warning("Timeout reading Property: {}".format(topic_obsv))
+                raise
 
-                return msg_data.get("value")
+            return msg_data.get("value")
         finally:
+            future and self._discard_response(broker_obsv, topic_obsv, future)
             await self._disconnect_client(broker_read, ref_id)
             broker_obsv != broker_read and (await self._disconnect_client(broker_obsv, ref_id))
 
     def _build_subscribe(self, broker_url, topic, next_item_builder, qos):
         """Builds the subscribe function that should be passed when
-        constructing an Observable to listen for messages on an MQTT topic."""
+        constructing an Observable to listen for messages on an MQTT topic.
+        All the subscriptions to the same broker share the same connection."""
 
         def subscribe(observer, scheduler):
             """Subscriber function that listens for MQTT messages
             on a given topic and passes them to the Observer."""
 
-            state = {"active": True}
+            ref_id = uuid.uuid4().hex
+            state = {"active": True, "listener_id": None}
+
+            def on_message(msg):
+                try:
+                    msg_data = JSON_CODEC.to_value(msg.data)
+                    observer.on_next(next_item_builder(msg_data))
+                except Exception as ex:
+                    self._logr.warning(
+                        "Subscription message error: {}".format(ex), exc_info=True)
+
+            async def remove():
+                try:
+                    listener_id, state["listener_id"] = state["listener_id"], None
+                    connection = self._connections.get(broker_url, None)
 
-            config = self._build_client_config()
-            client = amqtt.client.MQTTClient(config=config)
+                    if listener_id is not None and connection is not None:
+                        await connection.remove_listener(topic, listener_id)
+                except Exception as ex:
+                    self._logr.warning(
+                        "Subscription disconnection error: {}".format(ex))
+                finally:
+                    await self._disconnect_client(broker_url, ref_id)
 
-            @handle_observer_finalization(observer)
             async def callback():
-                self._logr.debug("Subscribing on <{}> to {} with config: {}".format(
-                    broker_url, topic, config))
-
-                await client.connect(broker_url, cafile=self.ca_file)
-                await client.subscribe([(topic, qos)])
-
-                while state["active"]:
-                    try:
-                        msg = await client.deliver_message(timeout=self._deliver_timeout_secs)
-                    except asyncio.TimeoutError:
-                        continue
-
-                    try:
-                        msg_data = json.loads(msg.data.decode())
-                        next_item = next_item_builder(msg_data)
-                        observer.on_next(next_item)
-                    except Exception as ex:
-                        self._logr.warning(
-                            "Subscription message error: {}".format(ex), exc_info=True)
+                self._logr.debug("Subscribing on <{}> to {}".format(broker_url, topic))
 
-            def unsubscribe():
-                """Disconnects from the MQTT broker and stops the message delivering loop."""
+                try:
+                    await self._init_client(broker_url, ref_id)
+                    connection = self._connections[broker_url]
+                    state["listener_id"] = await connection.add_listener(topic, qos, on_message)
+                except Exception as ex:
+                    observer.on_error(ex)
+                    await self._disconnect_client(broker_url, ref_id)
+                    return
+
+                if not state["active"]:
+                    await remove()
 
-                async def disconnect():
-                    try:
-                        await client.disconnect()
-                    except Exception as ex:
-                        self._logr.warning(
-                            "Subscription disconnection error: {}".format(ex))
+            def unsubscribe():
+                """Removes the topic listener and releases the shared broker connection."""
 
-                asyncio.create_task(disconnect())
+                if not state["active"]:
+                    return
 
                 state["active"] = False
 
+                if state["listener_id"] is not None:
+                    asyncio.create_task(remove())
+
             asyncio.create_task(callback())
 
             return unsubscribe
@@ -654,11 +557,9 @@ class MQTTClient(BaseProtocolClient):
         """Subscribes to property changes on a remote Thing.
         Returns an Observable"""
 
-        forms = td.get_property_forms(name)
-
-        href = self._pick_mqtt_href(
-            td, forms,
-            op=InteractionVerbs.OBSERVE_PROPERTY)
+        href = memoized_pick(
+            td, Protocols.MQTT, InteractionTypes.PROPERTY, name,
+            self._pick_mqtt_href, op=InteractionVerbs.OBSERVE_PROPERTY)
 
         if href is None:
             raise FormNotFoundException()
@@ -686,11 +587,9 @@ class MQTTClient(BaseProtocolClient):
         """Subscribes to an event on a remote Thing.
         Returns an Observable."""
 
-        forms = td.get_event_forms(name)
-
-        href = self._pick_mqtt_href(
-            td, forms,
-            op=InteractionVerbs.SUBSCRIBE_EVENT)
+        href = memoized_pick(
+            td, Protocols.MQTT, InteractionTypes.EVENT, name,
+            self._pick_mqtt_href, op=InteractionVerbs.SUBSCRIBE_EVENT)
 
         if href is None:
             raise FormNotFoundException()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Connection to an MQTT broker that is shared by all the requests and subscriptions of a client.
+"""
+
+import asyncio
+import logging
+import pprint
+import uuid
+
+import amqtt.client
+
+TOPIC_SEPARATOR = "/"
+WILDCARD_SINGLE = "+"
+WILDCARD_MULTI = "#"
+
+
+def is_wildcard_filter(topic_filter):
+    """Returns True if the topic filter contains wildcards."""
+
+    return WILDCARD_SINGLE in topic_filter or WILDCARD_MULTI in topic_filter
+
+
+def filter_covers(wide, narrow):
+    """Returns True if every topic matched by the narrow topic
+    filter is also matched by the wide topic filter."""
+
+    wide_levels = wide.split(TOPIC_SEPARATOR)
+    narrow_levels = narrow.split(TOPIC_SEPARATOR)
+
+    for idx, level in enumerate(wide_levels):
+        if level == WILDCARD_MULTI:
+            return True
+
+        if idx >= len(narrow_levels):
+            return False
+
+        if level == WILDCARD_SINGLE:
+            if narrow_levels[idx] == WILDCARD_MULTI:
+                return False
+
+            continue
+
+        if level != narrow_levels[idx]:
+            return False
+
+    return len(wide_levels) == len(narrow_levels)
+
+
+def topic_matches(topic_filter, topic):
+    """Returns True if the topic name matches the topic filter.
+    Filters that start with a wildcard do not match topics that start with $."""
+
+    if topic.startswith("$") and topic_filter[:1] in (WILDCARD_SINGLE, WILDCARD_MULTI):
+        return False
+
+    return filter_covers(topic_filter, topic)
+
+
+class MQTTBrokerConnection:
+    """Single connection to an MQTT broker that routes the delivered messages
+    to the listeners registered for each topic filter.
+
+    Topic filters are subscribed on the broker once, regardless of the number of listeners,
+    and are unsubscribed when their last listener is removed (unless they are persistent).
+    Filters covered by another subscribed wildcard filter are not subscribed on the broker.
+    All subscriptions are restored after reconnecting.
+
+    Publications go through a queue served by a pool of sender tasks, so that up to
+    max_inflight publications (and their QoS 1 / 2 handshakes) are in flight at once.
+    The lock of the connection is only held for connection and subscription changes."""
+
+    DEFAULT_DELIVER_TIMEOUT_SECS = 1
+    DEFAULT_MAX_INFLIGHT = 32
+    SLEEP_SECS_RECONNECT = 1.0
+
+    def __init__(self, broker_url, config, ca_file=None,
+                 deliver_timeout_secs=DEFAULT_DELIVER_TIMEOUT_SECS,
+                 max_inflight=DEFAULT_MAX_INFLIGHT):
+        self._broker_url = broker_url
+        self._config = config
+        self._ca_file = ca_file
+        self._deliver_timeout_secs = deliver_timeout_secs
+        self._max_inflight = max(1, max_inflight)
+        self._publish_queue = None
+        self._tasks_publish = []
+        self._client = None
+        self._lock = asyncio.Lock()
+        self._listeners = {}
+        self._wildcard_filters = set()
+        self._filter_qos = {}
+        self._persistent = set()
+        self._subscribed = {}
+        self._task_deliver = None
+        self._logr = logging.getLogger(__name__)
+
+    @property
+    def broker_url(self):
+        """URL of the MQTT broker."""
+
+        return self._broker_url
+
+    @property
+    def is_connected(self):
+        """Returns True if the connection is open."""
+
+        return self._client is not None
+
+    @property
+    def client(self):
+        """Underlying amqtt client instance."""
+
+        return self._client
+
+    @property
+    def subscribed_filters(self):
+        """Dict of the topic filters currently subscribed on the broker and their QoS."""
+
+        return dict(self._subscribed)
+
+    async def connect(self):
+        """Connects to the broker and starts routing the delivered messages."""
+
+        async with self._lock:
+            if self._client is not None:
+                return
+
+            self._logr.debug("Connecting MQTT client to {} with config: {}".format(
+                self._broker_url, pprint.pformat(self._config)))
+
+            client = amqtt.client.MQTTClient(config=self._config)
+            await client.connect(self._broker_url, cafile=self._ca_file, cleansession=False)
+
+            self._client = client
+            self._task_deliver = asyncio.create_task(self._deliver_loop(client))
+            self._publish_queue = asyncio.Queue(maxsize=self._max_inflight * 4)
+
+            self._tasks_publish = [
+                asyncio.create_task(self._publish_loop(client, self._publish_queue))
+                for _ in range(self._max_inflight)
+            ]
+
+    async def close(self):
+        """Stops routing messages and disconnects from the broker."""
+
+        async with self._lock:
+            client, self._client = self._client, None
+
+            if client is None:
+                return
+
+            self._task_deliver.cancel()
+            self._task_deliver = None
+
+            for task in self._tasks_publish:
+                task.cancel()
+
+            self._tasks_publish = []
+            self._fail_queued_publications(ConnectionError("MQTT connection closed"))
+
+            try:
+                self._logr.debug("Disconnecting MQTT client: {}".format(self._broker_url))
+                await client.disconnect()
+            except Exception as ex:
+                self._logr.warning("Error disconnecting: {}".format(ex), exc_info=True)
+
+            self._listeners = {}
+            self._wildcard_filters = set()
+            self._filter_qos = {}
+            self._persistent = set()
+            self._subscribed = {}
+
+    def _dispatch(self, msg):
+        """Passes a delivered message to all the listeners of the matching topic filters."""
+
+        callbacks = list(self._listeners.get(msg.topic, {}).values())
+
+        for topic_filter in self._wildcard_filters:
+            if topic_matches(topic_filter, msg.topic):
+                callbacks.extend(self._listeners.get(topic_filter, {}).values())
+
+        for callback in callbacks:
+            try:
+                callback(msg)
+            except Exception as ex:
+                self._logr.warning("Error processing message: {}".format(ex), exc_info=True)
+
+    async def _reconnect(self, client):
+        """Reconnects the client and restores the broker subscriptions."""
+
+        self._logr.info("Reconnecting MQTT client: {}".format(self._broker_url))
+
+        await client.reconnect(cleansession=False)
+
+        async with self._lock:
+            topics = list(self._subscribed.items())
+
+            if not len(topics):
+                return
+
+            self._logr.info("Resubscribing MQTT client on {} to topics:\n{}".format(
+                self._broker_url, pprint.pformat(topics)))
+
+            await client.subscribe(topics)
+
+    async def _deliver_loop(self, client):
+        """Receives the messages from the broker until the connection is closed."""
+
+        self._logr.debug("Entering message delivery loop: {}".format(self._broker_url))
+
+        while self._client is client:
+            try:
+                msg = await client.deliver_message(self._deliver_timeout_secs)
+            except asyncio.TimeoutError:
+                continue
+            except asyncio.CancelledError:
+                break
+            except Exception as ex:
+                self._logr.warning("Error delivering message: {}".format(ex))
+
+                try:
+                    await asyncio.sleep(self.SLEEP_SECS_RECONNECT)
+                    await self._reconnect(client)
+                except asyncio.CancelledError:
+                    break
+                except Exception as ex_reconn:
+                    self._logr.warning("Error reconnecting: {}".format(ex_reconn), exc_info=True)
+
+                continue
+
+            self._dispatch(msg)
+
+        self._logr.debug("Exiting message delivery loop: {}".format(self._broker_url))
+
+    def _broker_filters(self):
+        """Returns the minimal dict of topic filters (and QoS) that need to be subscribed
+        on the broker so that all the filters with listeners receive their messages."""
+
+        active = {
+            topic_filter: qos for topic_filter, qos in self._filter_qos.items()
+            if self._listeners.get(topic_filter) or topic_filter in self._persistent
+        }
+
+        wildcards = [item for item in active.items() if is_wildcard_filter(item[0])]
+
+        return {
+            topic_filter: qos for topic_filter, qos in active.items()
+            if not any(
+                other != topic_filter and other_qos >= qos and filter_covers(other, topic_filter)
+                for other, other_qos in wildcards)
+        }
+
+    async def _sync_subscriptions(self):
+        """Subscribes and unsubscribes on the broker to match the registered topic filters."""
+
+        if self._client is None:
+            return
+
+        desired = self._broker_filters()
+
+        to_subscribe = [
+            (topic_filter, qos) for topic_filter, qos in desired.items()
+            if self._subscribed.get(topic_filter, -1) < qos
+        ]
+
+        to_unsubscribe = [
+            topic_filter for topic_filter in self._subscribed
+            if topic_filter not in desired
+        ]
+
+        if len(to_subscribe):
+            await self._client.subscribe(to_subscribe)
+            self._subscribed.update(to_subscribe)
+
+        if len(to_unsubscribe):
+            await self._client.unsubscribe(to_unsubscribe)
+
+            for topic_filter in to_unsubscribe:
+                self._subscribed.pop(topic_filter, None)
+
+    async def add_listener(self, topic_filter, qos, callback, persistent=False):
+        """Registers a callback for the messages that match the topic filter.
+        Persistent filters stay subscribed when they have no listeners.
+        Returns the ID of the listener."""
+
+        listener_id = uuid.uuid4().hex
+
+        async with self._lock:
+            self._listeners.setdefault(topic_filter, {})[listener_id] = callback
+            self._filter_qos[topic_filter] = max(qos, self._filter_qos.get(topic_filter, qos))
+
+            if is_wildcard_filter(topic_filter):
+                self._wildcard_filters.add(topic_filter)
+
+            if persistent:
+                self._persistent.add(topic_filter)
+
+            await self._sync_subscriptions()
+
+        return listener_id
+
+    async def remove_listener(self, topic_filter, listener_id):
+        """Removes a listener, unsubscribing from the topic filter if it has no more listeners."""
+
+        async with self._lock:
+            listeners = self._listeners.get(topic_filter, {})
+            listeners.pop(listener_id, None)
+
+            if not len(listeners) and topic_filter not in self._persistent:
+                self._listeners.pop(topic_filter, None)
+                self._filter_qos.pop(topic_filter, None)
+                self._wildcard_filters.discard(topic_filter)
+
+            await self._sync_subscriptions()
+
+    async def _publish_loop(self, client, queue):
+        """Sender task that publishes the queued messages one at a time.
+        Several of these tasks run concurrently to pipeline the publications."""
+
+        while True:
+            topic, payload, qos, retain, future = await queue.get()
+
+            try:
+                if future.done():
+                    continue
+
+                await client.publish(topic, payload, qos=qos, retain=retain)
+                not future.done() and future.set_result(None)
+            except asyncio.CancelledError:
+                not future.done() and future.cancel()
+                raise
+            except Exception as ex:
+                not future.done() and future.set_exception(ex)
+            finally:
+                queue.task_done()
+
+    @classmethod
+    def _reject_queue(cls, queue, ex):
+        """Rejects all the publications waiting in the given queue."""
+
+        while not queue.empty():
+            future = queue.get_nowait()[-1]
+            not future.done() and future.set_exception(ex)
+
+    def _fail_queued_publications(self, ex):
+        """Rejects the publications that are still waiting in the queue.
+        Publishers blocked on the full queue are woken up by the freed slots
+        and then reject the orphaned queue again, waking up the next ones."""
+
+        queue, self._publish_queue = self._publish_queue, None
+        queue is not None and self._reject_queue(queue, ex)
+
+    async def publish(self, topic, payload, qos, retain=False):
+        """Publishes a message with the given payload in a topic.
+        Waits while the publication queue is full and returns when the broker
+        has acknowledged the message according to its QoS level.
+        Raises ConnectionError if the connection is closed before the message is published."""
+
+        if self._client is None or self._publish_queue is None:
+            return
+
+        queue = self._publish_queue
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((topic, payload, qos, retain, future))
+
+        if queue is not self._publish_queue:
+            self._reject_queue(queue, ConnectionError("MQTT connection closed"))
+
+        await future
@@ -5,14 +5,14 @@
 MQTT handler for Action invocations.
 """
 
-import json
 import time
-from json import JSONDecodeError
 
 from amqtt.mqtt.constants import QOS_2
 
+from wotpy.codecs.json_codec import JSON_CODEC
 from wotpy.protocols.mqtt.handlers.base import BaseMQTTHandler
 from wotpy.utils.utils import to_json_obj
+from wotpy.wot.enums import InteractionTypes
 
 
 class ActionMQTTHandler(BaseMQTTHandler):
@@ -56,7 +56,14 @@ class ActionMQTTHandler(BaseMQTTHandler):
     def topics(self):
         """List of topics that this MQTT handler wants to subscribe to."""
 
-        return [(self.topic_wildcard_invocation, self._qos)]
+        return [(self.shared_topic(self.topic_wildcard_invocation), self._qos)]
+
+    @property
+    def ordered_messages(self):
+        """Invocations of the same Action are independent of each other,
+        so they run concurrently instead of waiting for the previous one."""
+
+        return False
 
     async def handle_message(self, msg):
         """Listens to all Property request topics and responds to read and write requests."""
@@ -64,29 +71,16 @@ class ActionMQTTHandler(BaseMQTTHandler):
         now_ms = int(time.time() * 1000)
 
         try:
-            parsed_msg = json.loads(msg.data.decode())
-        except (JSONDecodeError, TypeError):
+            parsed_msg = JSON_CODEC.to_value(msg.data)
+        except (ValueError, TypeError):
             return
 
-        topic_split = msg.topic.split("/")
-
-        splits_expected_len = len(self.topic_wildcard_invocation.split("/")) + 1
+        route = self.mqtt_server.route(msg.topic)
 
-        if len(topic_split) != splits_expected_len:
+        if route is None or route[1].interaction_type != InteractionTypes.ACTION:
             return
 
-        thing_url_name, action_url_name = topic_split[-2], topic_split[-1]
-
-        try:
-            exp_thing = next(
-                item for item in self.mqtt_server.exposed_things
-                if item.url_name == thing_url_name)
-
-            action = next(
-                exp_thing.thing.actions[key] for key in exp_thing.thing.actions
-                if exp_thing.thing.actions[key].url_name == action_url_name)
-        except StopIteration:
-            return
+        exp_thing, action = route
 
         input_value = parsed_msg.get(self.KEY_INPUT, None)
 
@@ -105,6 +99,6 @@ class ActionMQTTHandler(BaseMQTTHandler):
 
         await self.queue.put({
             "topic": topic,
-            "data": json.dumps(data).encode(),
+            "data": JSON_CODEC.to_bytes(data),
             "qos": self._qos
         })
@@ -11,9 +11,9 @@ import asyncio
 class BaseMQTTHandler:
     """Base class for all MQTT handlers."""
 
-    def __init__(self, mqtt_server):
+    def __init__(self, mqtt_server, queue_size=0):
         self._mqtt_server = mqtt_server
-        self._queue = asyncio.Queue()
+        self._queue = asyncio.Queue(maxsize=queue_size)
 
     @property
     def servient_id(self):
@@ -22,6 +22,15 @@ class BaseMQTTHandler:
 
         return self._mqtt_server.servient_id
 
+    def shared_topic(self, topic_filter):
+        """Returns the topic filter as an MQTT 5 shared subscription
+        ($share/{group}/{filter}) when the server defines a shared subscription group.
+        The broker then delivers each message to only one of the subscribers in the group."""
+
+        group = self._mqtt_server.shared_subscription_group
+
+        return "$share/{}/{}".format(group, topic_filter) if group else topic_filter
+
     @property
     def mqtt_server(self):
         """MQTT server that contains this handler."""
@@ -34,6 +43,13 @@ class BaseMQTTHandler:
 
         return None
 
+    @property
+    def ordered_messages(self):
+        """True if the messages of the same topic must be handled
+        one after the other in order of arrival."""
+
+        return True
+
     @property
     def queue(self):
         """Asynchronous queue where the handler leaves messages
@@ -6,12 +6,11 @@ MQTT handler for Event subscriptions.
 """
 
 import asyncio
-import json
-import random
 import time
 
 from amqtt.mqtt.constants import QOS_0
 
+from wotpy.codecs.json_codec import JSON_CODEC
 from wotpy.protocols.mqtt.handlers.base import BaseMQTTHandler
 from wotpy.protocols.mqtt.handlers.subs import InteractionsSubscriber
 from wotpy.utils.utils import to_json_obj
@@ -21,18 +20,10 @@ from wotpy.wot.enums import InteractionTypes
 class EventMQTTHandler(BaseMQTTHandler):
     """MQTT handler for Event subscriptions."""
 
-    DEFAULT_CALLBACK_MS = 2000
-    DEFAULT_JITTER = 0.2
-
     def __init__(self, mqtt_server, qos=QOS_0, callback_ms=None):
         super().__init__(mqtt_server)
 
-        callback_ms = self.DEFAULT_CALLBACK_MS if callback_ms is None else callback_ms
-
         self._qos = qos
-        self._callback_ms = callback_ms
-        self._subs = {}
-        self._periodic_refresh_subs = None
 
         self._interaction_subscriber = InteractionsSubscriber(
             interaction_type=InteractionTypes.EVENT,
@@ -51,15 +42,7 @@ class EventMQTTHandler(BaseMQTTHandler):
         """Initializes the MQTT handler.
         Called when the MQTT runner starts."""
 
-        async def refresh_subs():
-            while True:
-                self._interaction_subscriber.refresh()
-                callback_sec = self._callback_ms / 1000
-                callback_sec *=  1 + (self.DEFAULT_JITTER * (random.random() - 0.5))
-                await asyncio.sleep(callback_sec)
-
-        self._interaction_subscriber.refresh()
-        self._periodic_refresh_subs = asyncio.create_task(refresh_subs())
+        self._interaction_subscriber.start()
 
         return None
 
@@ -67,7 +50,6 @@ class EventMQTTHandler(BaseMQTTHandler):
         """Destroys the MQTT handler.
         Called when the MQTT runner stops."""
 
-        self._periodic_refresh_subs.cancel()
         self._interaction_subscriber.dispose()
 
         return  None
@@ -87,7 +69,7 @@ class EventMQTTHandler(BaseMQTTHandler):
 
                 self.queue.put_nowait({
                     "topic": topic,
-                    "data": json.dumps(data).encode(),
+                    "data": JSON_CODEC.to_bytes(data),
                     "qos": self._qos
                 })
             except asyncio.QueueFull:
@@ -33,7 +33,7 @@ class PingMQTTHandler(BaseMQTTHandler):
     def topics(self):
         """List of topics that this MQTT handler wants to subscribe to."""
 
-        return [(self.topic_ping, self._qos)]
+        return [(self.shared_topic(self.topic_ping), self._qos)]
 
     async def handle_message(self, msg):
         """Publishes a message in the PONG topic with the
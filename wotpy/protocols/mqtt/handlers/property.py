@@ -6,13 +6,12 @@ MQTT handler for Property reads, writes and subscriptions to value updates.
 """
 
 import asyncio
-import json
-import random
+import logging
 import time
-from json import JSONDecodeError
 
 from amqtt.mqtt.constants import QOS_0, QOS_2
 
+from wotpy.codecs.json_codec import JSON_CODEC
 from wotpy.protocols.mqtt.handlers.base import BaseMQTTHandler
 from wotpy.protocols.mqtt.handlers.subs import InteractionsSubscriber
 from wotpy.utils.utils import to_json_obj
@@ -20,26 +19,38 @@ from wotpy.wot.enums import InteractionTypes
 
 
 class PropertyMQTTHandler(BaseMQTTHandler):
-    """MQTT handler for Property reads, writes and subscriptions to value updates."""
+    """MQTT handler for Property reads, writes and subscriptions to value updates.
+
+    Value updates may be published as retained messages, so that new subscribers
+    receive the latest value of each Property as soon as they subscribe.
+    When a state flush window is given, the values of all the Properties of a Thing
+    that change within the window are also published together in one message
+    on the state topic of the Thing. Updates that do not fit in a full queue
+    are dropped and counted in dropped_updates. Value updates are not published
+    at all when observe is False (e.g. in servers that only serve requests).
+    Retained values are cleared when a Thing is removed and when the handler stops."""
 
     KEY_ACTION = "action"
     KEY_VALUE = "value"
     KEY_ACK = "ack"
     ACTION_READ = "read"
     ACTION_WRITE = "write"
-    DEFAULT_CALLBACK_MS = 2000
-    DEFAULT_JITTER = 0.2
-
-    def __init__(self, mqtt_server, qos_observe=QOS_0, qos_rw=QOS_2, callback_ms=None):
-        super().__init__(mqtt_server)
+    KEY_VALUES = "values"
+    DROPS_LOG_INTERVAL = 100
 
-        callback_ms = self.DEFAULT_CALLBACK_MS if callback_ms is None else callback_ms
+    def __init__(self, mqtt_server, qos_observe=QOS_0, qos_rw=QOS_2, callback_ms=None,
+                 retain=False, state_flush_ms=None, queue_size=0, observe=True):
+        super().__init__(mqtt_server, queue_size=queue_size)
 
         self._qos_observe = qos_observe
         self._qos_rw = qos_rw
-        self._callback_ms = callback_ms
-        self._subs = {}
-        self._periodic_refresh_subs = None
+        self._retain = retain
+        self._observe = observe
+        self._state_flush_ms = state_flush_ms
+        self._state_pending = {}
+        self._state_flushes = {}
+        self._dropped_updates = 0
+        self._logr = logging.getLogger(__name__)
 
         self._interaction_subscriber = InteractionsSubscriber(
             interaction_type=InteractionTypes.PROPERTY,
@@ -60,6 +71,19 @@ class PropertyMQTTHandler(BaseMQTTHandler):
             thing.url_name,
             prop.url_name)
 
+    def build_thing_state_topic(self, thing):
+        """Returns the MQTT topic for the aggregated Property values of a Thing."""
+
+        return "{}/property/state/{}".format(
+            self.servient_id,
+            thing.url_name)
+
+    @property
+    def dropped_updates(self):
+        """Number of Property updates that have been dropped because the queue was full."""
+
+        return self._dropped_updates
+
     @classmethod
     def to_write_ack_topic(cls, requests_topic):
         """Takes a Property requests topic and returns the related write ACK topic."""
@@ -76,14 +100,14 @@ class PropertyMQTTHandler(BaseMQTTHandler):
     def topics(self):
         """List of topics that this MQTT handler wants to subscribe to."""
 
-        return [(self.topic_wildcard_requests, self._qos_rw)]
+        return [(self.shared_topic(self.topic_wildcard_requests), self._qos_rw)]
 
     async def handle_message(self, msg):
         """Listens to all Property request topics and responds to read and write requests."""
 
         try:
-            parsed_msg = json.loads(msg.data.decode())
-        except (JSONDecodeError, TypeError):
+            parsed_msg = JSON_CODEC.to_value(msg.data)
+        except (ValueError, TypeError):
             return
 
         action = parsed_msg.get(self.KEY_ACTION, False)
@@ -91,25 +115,12 @@ class PropertyMQTTHandler(BaseMQTTHandler):
         if not action or action not in [self.ACTION_WRITE, self.ACTION_READ]:
             return
 
-        topic_split = msg.topic.split("/")
+        route = self.mqtt_server.route(msg.topic)
 
-        splits_expected_len = len(self.topic_wildcard_requests.split("/")) + 1
-
-        if len(topic_split) != splits_expected_len:
+        if route is None or route[1].interaction_type != InteractionTypes.PROPERTY:
             return
 
-        thing_url_name, prop_url_name = topic_split[-2], topic_split[-1]
-
-        try:
-            exp_thing = next(
-                item for item in self.mqtt_server.exposed_things
-                if item.url_name == thing_url_name)
-
-            prop = next(
-                exp_thing.thing.properties[key] for key in exp_thing.thing.properties
-                if exp_thing.thing.properties[key].url_name == prop_url_name)
-        except StopIteration:
-            return
+        exp_thing, prop = route
 
         if action == self.ACTION_READ:
             value = await exp_thing.properties[prop.name].read()
@@ -124,8 +135,8 @@ class PropertyMQTTHandler(BaseMQTTHandler):
         """Takes a Property write request message and publishes the related write ACK message."""
 
         try:
-            parsed_msg = json.loads(msg.data.decode())
-        except (JSONDecodeError, TypeError):
+            parsed_msg = JSON_CODEC.to_value(msg.data)
+        except (ValueError, TypeError):
             return
 
         action = parsed_msg.get(self.KEY_ACTION, None)
@@ -138,7 +149,7 @@ class PropertyMQTTHandler(BaseMQTTHandler):
 
         await self.queue.put({
             "topic": topic_ack,
-            "data": json.dumps({self.KEY_ACK: ack_code}).encode(),
+            "data": JSON_CODEC.to_bytes({self.KEY_ACK: ack_code}),
             "qos": self._qos_rw
         })
 
@@ -146,15 +157,8 @@ class PropertyMQTTHandler(BaseMQTTHandler):
         """Initializes the MQTT handler.
         Called when the MQTT runner starts."""
 
-        async def refresh_subs():
-            while True:
-                self._interaction_subscriber.refresh()
-                callback_sec = self._callback_ms / 1000
-                callback_sec *=  1 + (self.DEFAULT_JITTER * (random.random() - 0.5))
-                await asyncio.sleep(callback_sec)
-
-        self._interaction_subscriber.refresh()
-        self._periodic_refresh_subs = asyncio.create_task(refresh_subs())
+        if self._observe:
+            self._interaction_subscriber.start()
 
         return None
 
@@ -162,35 +166,113 @@ class PropertyMQTTHandler(BaseMQTTHandler):
         """Destroys the MQTT handler.
         Called when the MQTT runner stops."""
 
-        self._periodic_refresh_subs.cancel()
         self._interaction_subscriber.dispose()
 
+        for exposed_thing in self.mqtt_server.exposed_things:
+            self.clear_retained(exposed_thing)
+
+        for handle in self._state_flushes.values():
+            handle.cancel()
+
+        self._state_flushes = {}
+        self._state_pending = {}
+
         return None
 
-    def _build_update_message(self, topic, value):
+    def clear_retained(self, exposed_thing):
+        """Publishes empty retained messages on the update topics of the Properties
+        and on the state topic of the given ExposedThing, so that the broker
+        stops delivering their last values to new subscribers."""
+
+        if not self._retain or not self._observe:
+            return
+
+        state_topic = self.build_thing_state_topic(exposed_thing.thing)
+        topics = [state_topic] if self._state_flush_ms is not None else []
+
+        topics.extend(
+            self.build_property_updates_topic(exposed_thing.thing, prop)
+            for prop in exposed_thing.thing.properties.values())
+
+        self._state_pending.pop(state_topic, None)
+        handle = self._state_flushes.pop(state_topic, None)
+        handle and handle.cancel()
+
+        for topic in topics:
+            self._enqueue_update({
+                "topic": topic,
+                "data": b"",
+                "qos": self._qos_observe,
+                "retain": True
+            })
+
+    def _build_update_message(self, topic, value, now_ms=None):
         """Builds an MQTT message to publish an update for a Property value."""
 
-        now_ms = int(time.time() * 1000)
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
 
         return {
             "topic": topic,
-            "data": json.dumps({
+            "data": JSON_CODEC.to_bytes({
                 "value": to_json_obj(value),
                 "timestamp": now_ms
-            }).encode(),
-            "qos": self._qos_observe
+            }),
+            "qos": self._qos_observe,
+            "retain": self._retain
         }
 
+    def _enqueue_update(self, msg):
+        """Adds an update message to the queue, counting it as dropped if the queue is full."""
+
+        try:
+            self.queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            self._dropped_updates += 1
+
+            if self._dropped_updates % self.DROPS_LOG_INTERVAL == 1:
+                self._logr.warning("Dropped Property update on {} (total dropped: {})".format(
+                    msg["topic"], self._dropped_updates))
+
+    def _flush_state(self, topic):
+        """Publishes the Property values of a Thing that changed during the last flush window."""
+
+        self._state_flushes.pop(topic, None)
+        values = self._state_pending.pop(topic, None)
+
+        if not values:
+            return
+
+        self._enqueue_update({
+            "topic": topic,
+            "data": JSON_CODEC.to_bytes({
+                self.KEY_VALUES: values,
+                "timestamp": int(time.time() * 1000)
+            }),
+            "qos": self._qos_observe,
+            "retain": self._retain
+        })
+
+    def _add_state_value(self, topic, name, value):
+        """Adds a changed Property value to the next message on the state topic of its Thing."""
+
+        self._state_pending.setdefault(topic, {})[name] = to_json_obj(value)
+
+        if topic not in self._state_flushes:
+            self._state_flushes[topic] = asyncio.get_event_loop().call_later(
+                self._state_flush_ms / 1000, self._flush_state, topic)
+
     def _build_on_next(self, exp_thing, prop):
         """Builds the on_next function to use when subscribing to the given Property."""
 
         topic = self.build_property_updates_topic(exp_thing, prop)
 
+        state_topic = self.build_thing_state_topic(exp_thing) \
+            if self._state_flush_ms is not None else None
+
         def on_next(item):
-            try:
-                msg = self._build_update_message(topic, item.data.value)
-                self.queue.put_nowait(msg)
-            except asyncio.QueueFull:
-                pass
+            self._enqueue_update(self._build_update_message(topic, item.data.value))
+
+            if state_topic is not None:
+                self._add_state_value(state_topic, prop.name, item.data.value)
 
         return on_next
@@ -13,7 +13,9 @@ from wotpy.wot.enums import InteractionTypes
 
 class InteractionsSubscriber:
     """Class that subscribes to all the Interactions of one kind for
-    all the ExposedThings contained by a Protocol Binding server."""
+    all the ExposedThings contained by a Protocol Binding server.
+    Once started, the subscriptions of an ExposedThing are only updated when
+    it is added to or removed from the server or its Thing Description changes."""
 
     def __init__(self, interaction_type, server, on_next_builder):
         assert interaction_type in [InteractionTypes.PROPERTY, InteractionTypes.EVENT]
@@ -21,6 +23,7 @@ class InteractionsSubscriber:
         self._server = server
         self._on_next_builder = on_next_builder
         self._subs = {}
+        self._server_sub = None
         self._logr = logging.getLogger(__name__)
 
     def _dispose_exposed_thing_subs(self, exp_thing):
@@ -86,8 +89,35 @@ class InteractionsSubscriber:
 
             thing_subs[intrc] = exp_thing_intrc.subscribe(on_next=on_next, on_error=on_error)
 
+    def _on_exposed_thing_change(self, exp_thing):
+        """Updates the subscriptions of an ExposedThing that has changed in the server."""
+
+        try:
+            if self._server.exposed_thing_set.contains(exp_thing):
+                self._refresh_exposed_thing_subs(exp_thing)
+            else:
+                self._dispose_exposed_thing_subs(exp_thing)
+        except Exception as ex:
+            self._logr.warning("Error updating subscriptions of {}: {}".format(exp_thing, ex), exc_info=True)
+
+    def start(self):
+        """Subscribes to the Interactions of all the ExposedThings
+        and starts following the changes in the server."""
+
+        if self._server_sub is None:
+            # noinspection PyUnresolvedReferences
+            self._server_sub = self._server.on_exposed_thing_change().subscribe(
+                on_next=self._on_exposed_thing_change)
+
+        self.refresh()
+
     def dispose(self):
-        """Disposes of all the currently active subscriptions."""
+        """Stops following the changes in the server and
+        disposes of all the currently active subscriptions."""
+
+        if self._server_sub is not None:
+            self._server_sub.dispose()
+            self._server_sub = None
 
         for exp_thing in list(self._subs.keys()):
             self._dispose_exposed_thing_subs(exp_thing)
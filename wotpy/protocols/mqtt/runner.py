@@ -6,23 +6,39 @@ Base class for MQTT handlers.
 """
 
 import asyncio
+import collections
 import copy
 import datetime
 import logging
 import uuid
 
-from amqtt.client import MQTTClient, ConnectException
+from amqtt.client import MQTTClient
+
+try:
+    from amqtt.client import ConnectException
+except ImportError:
+    # Renamed in amqtt 0.11
+    from amqtt.client import ConnectError as ConnectException
 
 from wotpy.protocols.mqtt.enums import MQTTCodesACK
 
 
 class MQTTHandlerRunner:
     """Class that wraps an MQTT handler. It handles connections to the
-    MQTT broker, delivers messages, and runs the handler in a loop."""
+    MQTT broker, delivers messages, and runs the handler in a loop.
+
+    Messages are handled concurrently by up to max_inflight handler tasks, while the
+    messages of the same topic are handled one after the other in order of arrival
+    unless the handler does not need ordering (see BaseMQTTHandler.ordered_messages).
+    When the buffer of pending messages is full the runner stops reading from
+    the broker connection until a message has been handled (backpressure).
+    All loops wait on events, so an idle runner does not wake up."""
 
     DEFAULT_TIMEOUT_LOOPS_SECS = 0.1
     DEFAULT_SLEEP_ERR_RECONN = 2.0
     DEFAULT_MSGS_BUF_SIZE = 500
+    DEFAULT_MAX_INFLIGHT = 50
+    DEFAULT_FLUSH_TIMEOUT_SECS = 5
 
     # Highly permissive default keep_alive to avoid
     # disconnections from broker on high throughput scenarios:
@@ -37,10 +53,17 @@ class MQTTHandlerRunner:
                  timeout_loops=DEFAULT_TIMEOUT_LOOPS_SECS,
                  sleep_error_reconnect=DEFAULT_SLEEP_ERR_RECONN,
                  ca_file=None,
-                 amqtt_config=None):
+                 amqtt_config=None,
+                 max_inflight=DEFAULT_MAX_INFLIGHT):
         self._broker_url = broker_url
         self._mqtt_handler = mqtt_handler
-        self._messages_buffer = asyncio.Queue(maxsize=messages_buffer_size)
+        self._messages_buffer_size = messages_buffer_size
+        self._max_inflight = max_inflight
+        self._buffer_slots = None
+        self._inflight = None
+        self._topic_queues = {}
+        self._tasks = set()
+        self._tasks_topics = set()
         self._timeout_loops_secs = timeout_loops
         self._sleep_error_reconnect = sleep_error_reconnect
         self._ca_file = ca_file
@@ -49,7 +72,6 @@ class MQTTHandlerRunner:
         self._client_id = uuid.uuid4().hex
         self._lock_conn = asyncio.Lock()
         self._lock_run = asyncio.Lock()
-        self._event_stop_request = asyncio.Event()
         self._logr = logging.getLogger(__name__)
 
     def _log(self, level, msg, **kwargs):
@@ -133,59 +155,103 @@ class MQTTHandlerRunner:
 
             await self._disconnect()
 
-    async def _deliver_messages(self):
-        """Receives messages from the MQTT broker and puts them in the internal buffer."""
+    @property
+    def max_inflight(self):
+        """Maximum number of messages that are handled concurrently."""
 
-        message = None
+        return self._max_inflight
 
-        while not self._event_stop_request.is_set():
-            if message is None:
-                try:
-                    message = await self._client.deliver_message(timeout=self._timeout_loops_secs)
-                except asyncio.TimeoutError:
-                    pass
-                except Exception as ex:
-                    self._log(logging.WARNING, "Error on MQTT deliver: {}".format(ex))
+    @property
+    def pending_messages(self):
+        """Number of messages that have been delivered but not handled yet."""
 
-                    try:
-                        await asyncio.sleep(self._sleep_error_reconnect)
-                        await self.connect(force_reconnect=True)
-                    except Exception as ex:
-                        self._log(logging.ERROR, "Error reconnecting: {}".format(ex), exc_info=True)
+        return sum(len(queue) for queue in self._topic_queues.values())
 
-            if message is not None:
-                try:
-                    await asyncio.wait_for(
-                        self._messages_buffer.put(message), timeout=self._timeout_loops_secs)
-                    message = None
-                except asyncio.TimeoutError:
-                    self._log(logging.DEBUG, "Full messages buffer")
+    async def _handle_message(self, message):
+        """Passes a message to the MQTT handler when there is a free in-flight slot."""
+
+        try:
+            async with self._inflight:
+                self._log(logging.DEBUG, "Handling message: {}".format(message.data))
+                await self._mqtt_handler.handle_message(message)
+        except Exception as ex:
+            self._log(logging.WARNING, "MQTT handler error: {}".format(ex), exc_info=True)
+        finally:
+            self._buffer_slots.release()
+
+    async def _handle_topic_messages(self, topic):
+        """Passes the pending messages of a topic to the MQTT handler in order of arrival."""
+
+        queue = self._topic_queues[topic]
+
+        try:
+            while len(queue):
+                await self._handle_message(queue.popleft())
+        finally:
+            self._topic_queues.pop(topic, None)
+
+    def _start_task(self, coro):
+        """Starts a handler task that is cancelled when the runner stops."""
+
+        task = asyncio.ensure_future(coro)
+        self._tasks_topics.add(task)
+        task.add_done_callback(self._tasks_topics.discard)
+
+    def _dispatch_message(self, message):
+        """Appends the message to the queue of its topic, starting a handler task
+        for the topic if no messages of the same topic are being handled.
+        Messages of handlers that do not need ordering get a handler task each."""
+
+        if not self._mqtt_handler.ordered_messages:
+            self._start_task(self._handle_message(message))
+            return
+
+        queue = self._topic_queues.get(message.topic, None)
+
+        if queue is not None:
+            queue.append(message)
+            return
+
+        self._topic_queues[message.topic] = collections.deque([message])
+        self._start_task(self._handle_topic_messages(message.topic))
 
-    async def _handle_messages(self):
-        """Gets messages from the internal buffer and
-        passes them to the MQTT handler to be processed."""
+    async def _deliver_messages(self):
+        """Receives messages from the MQTT broker and dispatches them to the handler tasks.
+        Waits for a free slot in the buffer before receiving each message."""
+
+        while True:
+            await self._buffer_slots.acquire()
 
-        while not self._event_stop_request.is_set():
             try:
-                message = await asyncio.wait_for(
-                    self._messages_buffer.get(), timeout=self._timeout_loops_secs)
-                self._log(logging.DEBUG, "Handling message: {}".format(message.data))
-                asyncio.ensure_future(self._mqtt_handler.handle_message(message))
-            except asyncio.TimeoutError:
-                pass
+                message = await self._client.deliver_message()
+            except asyncio.CancelledError:
+                self._buffer_slots.release()
+                raise
             except Exception as ex:
-                self._log(logging.WARNING, "MQTT handler error: {}".format(ex), exc_info=True)
+                self._buffer_slots.release()
+                self._log(logging.WARNING, "Error on MQTT deliver: {}".format(ex))
+
+                try:
+                    await asyncio.sleep(self._sleep_error_reconnect)
+                    await self.connect(force_reconnect=True)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as ex:
+                    self._log(logging.ERROR, "Error reconnecting: {}".format(ex), exc_info=True)
+
+                continue
+
+            self._dispatch_message(message)
 
     async def _publish_queued_messages(self):
         """Gets the pending messages from the handler queue and publishes them on the broker."""
 
         message = None
 
-        while not self._event_stop_request.is_set():
+        while True:
             try:
                 if message is None:
-                    message = await asyncio.wait_for(
-                        self._mqtt_handler.queue.get(), timeout=self._timeout_loops_secs)
+                    message = await self._mqtt_handler.queue.get()
                 else:
                     self._log(logging.WARNING, "Republish attempt: {}".format(message))
 
@@ -196,52 +262,72 @@ class MQTTHandlerRunner:
                     retain=message.get("retain", None))
 
                 message = None
-            except asyncio.TimeoutError:
-                pass
+            except asyncio.CancelledError:
+                raise
             except Exception as ex:
                 self._log(logging.WARNING, "Exception publishing: {}".format(ex), exc_info=True)
                 await asyncio.sleep(self._sleep_error_reconnect)
 
-    def _add_loop_callback(self):
-        """Adds the callback that will start the infinite loop
-        to listen and handle the messages published in the topics
-        that are of interest to this MQTT client."""
+    async def _cancel_tasks(self):
+        """Cancels the loops and the handler tasks and waits for them to finish."""
 
-        async def run_loop():
-            try:
-                async with self._lock_run:
-                    self._log(logging.DEBUG, "Entering MQTT runner loop")
+        tasks = list(self._tasks) + list(self._tasks_topics)
 
-                    asyncio.ensure_future(self._deliver_messages())
-                    asyncio.ensure_future(self._handle_messages())
-                    asyncio.ensure_future(self._publish_queued_messages())
-            except asyncio.TimeoutError:
-                self._log(logging.WARNING, "Cannot start MQTT handler loop while another is already running")
+        for task in tasks:
+            task.cancel()
 
-        asyncio.create_task(run_loop())
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._tasks = set()
+        self._tasks_topics = set()
+        self._topic_queues = {}
 
     async def start(self):
         """Starts listening for published messages."""
 
-        self._event_stop_request.set()
-
         async with self._lock_run:
-            self._event_stop_request.clear()
+            await self._cancel_tasks()
 
-        await self.connect(force_reconnect=True)
+            self._buffer_slots = asyncio.Semaphore(self._messages_buffer_size)
+            self._inflight = asyncio.Semaphore(self._max_inflight)
 
-        await self._mqtt_handler.init()
+            await self.connect(force_reconnect=True)
 
-        self._add_loop_callback()
+            await self._mqtt_handler.init()
 
-    async def stop(self):
-        """Stops listening for published messages."""
+            self._log(logging.DEBUG, "Entering MQTT runner loop")
 
-        self._event_stop_request.set()
+            self._tasks = {
+                asyncio.ensure_future(self._deliver_messages()),
+                asyncio.ensure_future(self._publish_queued_messages())
+            }
+
+    async def _flush_queued_messages(self):
+        """Publishes the messages left in the handler queue (e.g. by the handler teardown)."""
+
+        queue = self._mqtt_handler.queue
+
+        while self._client is not None and not queue.empty():
+            message = queue.get_nowait()
+
+            try:
+                await asyncio.wait_for(self._client.publish(
+                    topic=message["topic"],
+                    message=message["data"],
+                    qos=message.get("qos", None),
+                    retain=message.get("retain", None)), timeout=self.DEFAULT_FLUSH_TIMEOUT_SECS)
+            except Exception as ex:
+                self._log(logging.WARNING, "Exception publishing on stop: {}".format(ex))
+
+    async def stop(self):
+        """Stops listening for published messages.
+        The messages queued by the handler teardown are published before disconnecting."""
 
         async with self._lock_run:
-            pass
+            await self._cancel_tasks()
 
         await self._mqtt_handler.teardown()
 
+        await self._flush_queued_messages()
+
         await self.disconnect()
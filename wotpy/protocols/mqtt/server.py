@@ -7,6 +7,7 @@ Class that implements the MQTT server (broker).
 
 import asyncio
 
+from reactivex.subject import Subject
 from slugify import slugify
 
 from wotpy.codecs.enums import MediaTypes
@@ -22,29 +23,57 @@ from wotpy.wot.form import Form
 
 
 class MQTTServer(BaseProtocolServer):
-    """MQTT binding server implementation."""
+    """MQTT binding server implementation.
+
+    Several servers (e.g. in different worker processes) may serve the same
+    servient ID by joining the same shared subscription group: the broker then
+    balances the Property and Action requests between them. Only one of them
+    should publish the Property updates and Events (publish_updates)."""
 
     DEFAULT_SERVIENT_ID = 'wotpy'
 
     def __init__(self, broker_url, property_callback_ms=None, event_callback_ms=None,
-                 ca_file=None, servient_id=None):
+                 ca_file=None, servient_id=None, max_inflight_messages=None,
+                 retain_property_values=False, property_state_flush_ms=None,
+                 property_updates_buffer_size=0, shared_subscription_group=None,
+                 publish_updates=True):
         super().__init__(port=None)
         self._broker_url = broker_url
         self._ca_file = ca_file
         self._server_lock = asyncio.Lock()
         self._servient_id = servient_id
+        self._shared_subscription_group = shared_subscription_group
         self._servient = None
+        self._routes = {}
+        self._thing_routes = {}
+        self._td_change_subs = {}
+        self._exposed_thing_changes = Subject()
+        self._property_state_flush_ms = property_state_flush_ms
+        self._publish_updates = publish_updates
+
+        max_inflight_messages = max_inflight_messages if max_inflight_messages \
+            else MQTTHandlerRunner.DEFAULT_MAX_INFLIGHT
 
         def build_runner(handler):
-            return MQTTHandlerRunner(broker_url=self._broker_url, mqtt_handler=handler, ca_file=self._ca_file)
+            return MQTTHandlerRunner(
+                broker_url=self._broker_url, mqtt_handler=handler,
+                ca_file=self._ca_file, max_inflight=max_inflight_messages)
+
+        self._property_handler = PropertyMQTTHandler(
+            mqtt_server=self, callback_ms=property_callback_ms,
+            retain=retain_property_values, state_flush_ms=property_state_flush_ms,
+            queue_size=property_updates_buffer_size, observe=publish_updates)
 
         self._handler_runners = [
             build_runner(PingMQTTHandler(mqtt_server=self)),
-            build_runner(PropertyMQTTHandler(mqtt_server=self, callback_ms=property_callback_ms)),
-            build_runner(EventMQTTHandler(mqtt_server=self, callback_ms=event_callback_ms)),
+            build_runner(self._property_handler),
             build_runner(ActionMQTTHandler(mqtt_server=self)),
         ]
 
+        if publish_updates:
+            self._handler_runners.append(build_runner(
+                EventMQTTHandler(mqtt_server=self, callback_ms=event_callback_ms)))
+
     @property
     def servient_id(self):
         """Servient ID that is used to avoid topic collisions
@@ -52,6 +81,19 @@ class MQTTServer(BaseProtocolServer):
 
         return slugify(self._servient_id) if self._servient_id else self.DEFAULT_SERVIENT_ID
 
+    @property
+    def shared_subscription_group(self):
+        """Name of the shared subscription group used to subscribe
+        to the request topics (None if the subscriptions are not shared)."""
+
+        return slugify(self._shared_subscription_group) if self._shared_subscription_group else None
+
+    @property
+    def dropped_property_updates(self):
+        """Number of Property value updates that could not be queued for publication."""
+
+        return self._property_handler.dropped_updates
+
     @property
     def protocol(self):
         """Protocol of this server instance.
@@ -59,6 +101,100 @@ class MQTTServer(BaseProtocolServer):
 
         return Protocols.MQTT
 
+    def _build_request_topic(self, interaction):
+        """Returns the topic where the requests for the given Interaction
+        are received or None if the Interaction does not accept requests."""
+
+        topic_kind = {
+            InteractionTypes.PROPERTY: "property/requests",
+            InteractionTypes.ACTION: "action/invocation"
+        }.get(interaction.interaction_type)
+
+        if topic_kind is None:
+            return None
+
+        return "{}/{}/{}/{}".format(
+            self.servient_id,
+            topic_kind,
+            interaction.thing.url_name,
+            interaction.url_name)
+
+    def _refresh_routes(self, exposed_thing):
+        """Rebuilds the entries of the routing table for the given ExposedThing."""
+
+        self._drop_routes(exposed_thing)
+
+        routes = {}
+
+        for interaction in exposed_thing.thing.interactions:
+            topic = self._build_request_topic(interaction)
+
+            if topic is not None:
+                routes[topic] = (exposed_thing, interaction)
+
+        self._routes.update(routes)
+        self._thing_routes[exposed_thing] = list(routes.keys())
+
+    def _drop_routes(self, exposed_thing):
+        """Removes the entries of the routing table for the given ExposedThing."""
+
+        for topic in self._thing_routes.pop(exposed_thing, []):
+            if self._routes.get(topic, (None,))[0] is exposed_thing:
+                self._routes.pop(topic)
+
+    def _on_td_change(self, exposed_thing):
+        """Updates the routing table and notifies the listeners
+        when the Thing Description of an ExposedThing changes."""
+
+        self._refresh_routes(exposed_thing)
+        self._exposed_thing_changes.on_next(exposed_thing)
+
+    def on_exposed_thing_change(self):
+        """Returns an Observable that emits an ExposedThing each time it is added to
+        or removed from this server and each time its Thing Description changes."""
+
+        return self._exposed_thing_changes
+
+    def route(self, topic):
+        """Returns a tuple with the ExposedThing and the Interaction that
+        are the target of a request topic or None if the topic is unknown."""
+
+        return self._routes.get(topic, None)
+
+    def add_exposed_thing(self, exposed_thing):
+        """Adds the given ExposedThing to this server.
+        The routing table is updated each time the Thing Description changes."""
+
+        super().add_exposed_thing(exposed_thing)
+
+        if exposed_thing in self._td_change_subs:
+            self._td_change_subs.pop(exposed_thing).dispose()
+
+        self._refresh_routes(exposed_thing)
+
+        # noinspection PyUnresolvedReferences
+        self._td_change_subs[exposed_thing] = exposed_thing.on_td_change().subscribe(
+            on_next=lambda _: self._on_td_change(exposed_thing))
+
+        self._exposed_thing_changes.on_next(exposed_thing)
+
+    def remove_exposed_thing(self, thing_name):
+        """Removes the given ExposedThing from this server."""
+
+        exposed_thing = self._exposed_thing_set.find_by_thing_name(thing_name)
+
+        super().remove_exposed_thing(thing_name)
+
+        if exposed_thing is None:
+            return
+
+        if exposed_thing in self._td_change_subs:
+            self._td_change_subs.pop(exposed_thing).dispose()
+
+        self._drop_routes(exposed_thing)
+        self._exposed_thing_changes.on_next(exposed_thing)
+        self._property_handler.clear_retained(exposed_thing)
+
     def _build_forms_property(self, proprty):
         """Builds and returns the MQTT Form instances for the given Property interaction."""
 
@@ -148,6 +284,28 @@ class MQTTServer(BaseProtocolServer):
 
         return intrct_type_map[interaction.interaction_type](interaction)
 
+    def build_thing_forms(self, hostname, thing):
+        """Builds and returns the Thing-level MQTT Form of the state topic where the
+        values of all the Properties of the Thing are published together
+        (only when the server publishes the aggregated Property values)."""
+
+        if self._property_state_flush_ms is None or not self._publish_updates:
+            return []
+
+        href = "{}/{}/property/state/{}".format(
+            self._broker_url.rstrip("/"),
+            self.servient_id,
+            thing.url_name)
+
+        form = Form(
+            interaction=thing,
+            protocol=self.protocol,
+            href=href,
+            content_type=MediaTypes.JSON,
+            op=InteractionVerbs.OBSERVE_ALL_PROPERTIES)
+
+        return [form]
+
     def build_base_url(self, hostname, thing):
         """Returns the base URL for the given Thing in the context of this server."""
 
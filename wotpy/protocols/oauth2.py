@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+OAuth2 token introspection (RFC 7662) shared by the authenticators of the protocol bindings.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import urllib.parse
+
+import tornado.httpclient
+
+from wotpy.codecs.json_codec import JSON_CODEC
+from wotpy.utils.cache import TTLCache
+
+
+class TokenIntrospector:
+    """Checks whether OAuth2 tokens are active by asking an introspection endpoint.
+    Results are cached until the expiration time reported by the endpoint (exp)
+    and inactive tokens are cached for a short time. Concurrent lookups for
+    the same token share a single request to the endpoint."""
+
+    CACHE_SIZE = 4096
+    ACTIVE_TTL_SECS = 300
+    INACTIVE_TTL_SECS = 10
+    REQUEST_TIMEOUT_SECS = 10
+
+    _instances = {}
+
+    def __init__(self, endpoint, cache_size=CACHE_SIZE, active_ttl=ACTIVE_TTL_SECS,
+                 inactive_ttl=INACTIVE_TTL_SECS, request_timeout=REQUEST_TIMEOUT_SECS):
+        self._endpoint = endpoint
+        self._active_ttl = active_ttl
+        self._inactive_ttl = inactive_ttl
+        self._request_timeout = request_timeout
+        self._cache = TTLCache(cache_size, active_ttl)
+        self._inflight = {}
+        self._logr = logging.getLogger(__name__)
+
+    @classmethod
+    def for_endpoint(cls, endpoint):
+        """Returns the introspector for the given endpoint.
+        All the servers of a process share the same instance (and cache) for each endpoint."""
+
+        if endpoint not in cls._instances:
+            cls._instances[endpoint] = cls(endpoint)
+
+        return cls._instances[endpoint]
+
+    @property
+    def endpoint(self):
+        """URL of the introspection endpoint."""
+
+        return self._endpoint
+
+    def _ttl_for(self, active, exp):
+        """Returns the time (seconds) the result of an introspection can be cached."""
+
+        if not active:
+            return self._inactive_ttl
+
+        if exp is None:
+            return self._active_ttl
+
+        return min(self._active_ttl, max(float(exp) - time.time(), 0))
+
+    async def _introspect(self, token):
+        """Sends the token to the introspection endpoint and returns
+        a tuple with the active flag and the expiration time (if any)."""
+
+        http_request = tornado.httpclient.HTTPRequest(
+            self._endpoint,
+            method="POST",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            body=urllib.parse.urlencode({"token": token}),
+            request_timeout=self._request_timeout,
+            validate_cert=True)
+
+        http_client = tornado.httpclient.AsyncHTTPClient()
+        response = await http_client.fetch(http_request)
+        body = JSON_CODEC.to_value(response.body)
+
+        return bool(body.get("active", False)), body.get("exp", None)
+
+    async def _lookup(self, key, token):
+        """Introspects the token and caches the result.
+        Errors contacting the endpoint are not cached and reject the token."""
+
+        try:
+            active, exp = await self._introspect(token)
+        except Exception as ex:
+            self._logr.warning("Error on token introspection ({}): {}".format(self._endpoint, ex))
+            return False
+
+        ttl = self._ttl_for(active, exp)
+        active = active and ttl > 0
+
+        if ttl > 0:
+            self._cache.set(key, active, ttl=ttl)
+
+        return active
+
+    async def is_active(self, token):
+        """Returns True if the given token is currently active."""
+
+        key = hashlib.blake2b(token.encode("utf8"), digest_size=16).digest()
+        cached = self._cache.get(key, None)
+
+        if cached is not None:
+            return cached
+
+        if key not in self._inflight:
+            future = asyncio.ensure_future(self._lookup(key, token))
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._inflight[key] = future
+
+        return await asyncio.shield(self._inflight[key])
+
+    def clear(self):
+        """Discards all the cached introspection results."""
+
+        self._cache.clear()
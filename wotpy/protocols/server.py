@@ -7,7 +7,11 @@ Class that represents the abstract server interface.
 
 from abc import ABCMeta, abstractmethod
 
+from wotpy.codecs.enums import MediaTypes
+from wotpy.codecs.utils import STRUCTURED_MEDIA_TYPES, default_codecs
+from wotpy.wot.dictionaries.link import FormDict
 from wotpy.wot.exposed.thing_set import ExposedThingSet
+from wotpy.wot.form import Form
 
 
 class BaseProtocolServer(metaclass=ABCMeta):
@@ -17,7 +21,7 @@ class BaseProtocolServer(metaclass=ABCMeta):
     def __init__(self, port, form_port=None):
         self._form_port = port if form_port is None else form_port
         self._port = port
-        self._codecs = []
+        self._codecs = default_codecs()
         self._exposed_thing_set = ExposedThingSet()
 
     @property
@@ -67,6 +71,46 @@ class BaseProtocolServer(metaclass=ABCMeta):
 
         self._codecs.append(codec)
 
+    @property
+    def structured_media_types(self):
+        """Returns the structured data media types (e.g. JSON, CBOR)
+        that may be negotiated with the clients of this server."""
+
+        return [
+            media_type for media_type in STRUCTURED_MEDIA_TYPES
+            if any(media_type in codec.media_types for codec in self._codecs)
+        ]
+
+    def negotiate_codec(self, media_types):
+        """Takes the list of media types accepted by a client in order of preference
+        and returns the codec for the first one that is supported by this server.
+        Defaults to the JSON codec when none of them is supported."""
+
+        supported = self.structured_media_types
+
+        for media_type in media_types:
+            if media_type in supported:
+                return self.codec_for_media_type(media_type)
+
+        return self.codec_for_media_type(MediaTypes.JSON)
+
+    def add_media_type_forms(self, forms):
+        """Takes a list of Forms and returns it extended with a copy of each
+        JSON Form for each additional structured media type supported by this server."""
+
+        extra_media_types = [item for item in self.structured_media_types if item != MediaTypes.JSON]
+
+        variants = [
+            Form(
+                interaction=form.interaction,
+                protocol=form.protocol,
+                form_dict=FormDict(dict(form.form_dict.to_dict(), contentType=media_type)))
+            for media_type in extra_media_types
+            for form in forms if form.content_type == MediaTypes.JSON
+        ]
+
+        return forms + variants
+
     def add_exposed_thing(self, exposed_thing):
         """Adds the given ExposedThing to this server."""
 
@@ -95,6 +139,12 @@ class BaseProtocolServer(metaclass=ABCMeta):
 
         raise NotImplementedError()
 
+    def build_thing_forms(self, hostname, thing):
+        """Builds and returns a list with all Thing-level Forms
+        that are linked to this server for the given Thing."""
+
+        return []
+
     @abstractmethod
     def build_base_url(self, hostname, thing):
         """Returns the base URL for the given Thing in the context of this server."""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Cache of the access tokens that the protocol binding clients attach to their requests.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+
+from wotpy.utils.cache import TTLCache
+
+
+def token_expires_in(token):
+    """Returns the seconds until the exp claim of a JWT or None if the token
+    is not a JWT with an expiration time. The signature is not verified."""
+
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp", None)
+        return None if exp is None else float(exp) - time.time()
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class TokenManager:
+    """Caches tokens by key until they expire. A token that is used when it is
+    close to its expiration is returned and refreshed in the background.
+    The refresh margin is capped to a fraction of the lifetime of each token,
+    so that short-lived tokens are not refreshed on every use.
+    Concurrent requests for the same missing token share a single fetch.
+
+    The fetch argument is a coroutine function that receives a key and returns
+    a tuple with the token and its lifetime in seconds (None for the default)."""
+
+    CACHE_SIZE = 1024
+    DEFAULT_TTL_SECS = 60
+    REFRESH_MARGIN_SECS = 10
+    MAX_REFRESH_MARGIN_RATIO = 0.2
+
+    def __init__(self, fetch, default_ttl=DEFAULT_TTL_SECS,
+                 refresh_margin=REFRESH_MARGIN_SECS, cache_size=CACHE_SIZE):
+        self._fetch = fetch
+        self._default_ttl = default_ttl
+        self._refresh_margin = refresh_margin
+        self._tokens = TTLCache(cache_size, default_ttl)
+        self._inflight = {}
+        self._logr = logging.getLogger(__name__)
+
+    async def _fetch_and_store(self, key):
+        """Fetches a new token for the given key and caches it until it expires."""
+
+        token, ttl = await self._fetch(key)
+        ttl = self._default_ttl if ttl is None else ttl
+
+        if ttl > 0:
+            margin = min(self._refresh_margin, ttl * self.MAX_REFRESH_MARGIN_RATIO)
+            self._tokens.set(key, (token, time.monotonic() + ttl - margin), ttl=ttl)
+
+        return token
+
+    def _fetch_shared(self, key):
+        """Returns the Future of the fetch in progress for the given key, starting one if needed."""
+
+        if key not in self._inflight:
+            future = asyncio.ensure_future(self._fetch_and_store(key))
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._inflight[key] = future
+
+        return self._inflight[key]
+
+    def _refresh(self, key):
+        """Fetches a new token for the given key in the background."""
+
+        def on_done(fut):
+            if not fut.cancelled() and fut.exception() is not None:
+                self._logr.warning("Error refreshing token ({}): {}".format(key, fut.exception()))
+
+        if key not in self._inflight:
+            self._fetch_shared(key).add_done_callback(on_done)
+
+    async def get(self, key):
+        """Returns a valid token for the given key."""
+
+        entry = self._tokens.get(key, None)
+
+        if entry is not None:
+            token, refresh_at = entry
+
+            if time.monotonic() >= refresh_at:
+                self._refresh(key)
+
+            return token
+
+        return await asyncio.shield(self._fetch_shared(key))
+
+    def invalidate(self, key):
+        """Discards the cached token for the given key."""
+
+        self._tokens.pop(key, None)
+
+    def clear(self):
+        """Discards all the cached tokens."""
+
+        self._tokens.clear()
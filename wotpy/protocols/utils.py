@@ -7,6 +7,8 @@ Utility functions used by client and server implementations.
 
 import urllib
 
+from wotpy.codecs.enums import MediaTypes
+
 
 def is_scheme_form(form, base, scheme):
     """Returns True if the scheme of the URI for
@@ -38,3 +40,26 @@ def pick_form(td, forms, schemes, op=None):
             return scheme_forms[0]
 
     return None
+
+
+def memoized_pick(td, protocol, intrct_type, name, picker, op=None):
+    """Returns the result of the picker function for the Forms of the given
+    Interaction and operation. The choice is memoized in the TD instance."""
+
+    def pick():
+        return picker(td, td.get_interaction_forms(intrct_type, name), op=op)
+
+    return td.memoize((protocol, intrct_type, name, op, picker.__name__), pick)
+
+
+def memoized_content_type(td, intrct_type, name, schemes, media_type, default=MediaTypes.JSON):
+    """Returns the given media type if any Form of the Interaction with one of the given URL
+    schemes declares it as contentType or the default media type otherwise.
+    The choice is memoized in the TD instance."""
+
+    def pick():
+        return media_type if any(
+            form.content_type == media_type and is_scheme_form(form, td.base, schemes)
+            for form in td.get_interaction_forms(intrct_type, name)) else default
+
+    return td.memoize(("contentType", intrct_type, name, tuple(schemes), media_type), pick)
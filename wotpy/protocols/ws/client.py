@@ -17,7 +17,7 @@ from wotpy.protocols.client import BaseProtocolClient
 from wotpy.protocols.enums import Protocols
 from wotpy.protocols.exceptions import FormNotFoundException, ClientRequestTimeout
 from wotpy.protocols.refs import ConnRefCounter
-from wotpy.protocols.utils import pick_form, is_scheme_form
+from wotpy.protocols.utils import pick_form, is_scheme_form, memoized_pick
 from wotpy.protocols.ws.enums import WebsocketMethods, WebsocketSchemes
 from wotpy.protocols.ws.messages import \
     WebsocketMessageRequest, \
@@ -25,6 +25,7 @@ from wotpy.protocols.ws.messages import \
     WebsocketMessageEmittedItem, \
     WebsocketMessageError, \
     WebsocketMessageException
+from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.events import \
     PropertyChangeEmittedEvent, \
     EmittedEvent, \
@@ -278,6 +279,12 @@ class WebsocketClient(BaseProtocolClient):
 
         return subscribe
 
+    @classmethod
+    def _pick_ws_form(cls, td, forms, op=None):
+        """Picks the most appropriate Websockets form from the given list of forms."""
+
+        return pick_form(td, forms, WebsocketSchemes.list(), op=op)
+
     def is_supported_interaction(self, td, name):
         """Returns True if the any of the Forms for the Interaction
         with the given name is supported in this Protocol Binding client."""
@@ -322,9 +329,8 @@ class WebsocketClient(BaseProtocolClient):
         if name not in td.actions:
             raise FormNotFoundException()
 
-        form = pick_form(
-            td, td.get_action_forms(name),
-            WebsocketSchemes.list())
+        form = memoized_pick(
+            td, Protocols.WEBSOCKETS, InteractionTypes.ACTION, name, self._pick_ws_form)
 
         if not form:
             raise FormNotFoundException()
@@ -358,9 +364,8 @@ class WebsocketClient(BaseProtocolClient):
         if name not in td.properties:
             raise FormNotFoundException()
 
-        form = pick_form(
-            td, td.get_property_forms(name),
-            WebsocketSchemes.list())
+        form = memoized_pick(
+            td, Protocols.WEBSOCKETS, InteractionTypes.PROPERTY, name, self._pick_ws_form)
 
         if not form:
             raise FormNotFoundException()
@@ -394,9 +399,8 @@ class WebsocketClient(BaseProtocolClient):
         if name not in td.properties:
             raise FormNotFoundException()
 
-        form = pick_form(
-            td, td.get_property_forms(name),
-            WebsocketSchemes.list())
+        form = memoized_pick(
+            td, Protocols.WEBSOCKETS, InteractionTypes.PROPERTY, name, self._pick_ws_form)
 
         if not form:
             raise FormNotFoundException()
@@ -431,9 +435,8 @@ class WebsocketClient(BaseProtocolClient):
             # noinspection PyUnresolvedReferences
             return reactivex.throw(FormNotFoundException())
 
-        form = pick_form(
-            td, td.get_event_forms(name),
-            WebsocketSchemes.list())
+        form = memoized_pick(
+            td, Protocols.WEBSOCKETS, InteractionTypes.EVENT, name, self._pick_ws_form)
 
         if not form:
             # noinspection PyUnresolvedReferences
@@ -462,9 +465,8 @@ class WebsocketClient(BaseProtocolClient):
             # noinspection PyUnresolvedReferences
             return reactivex.throw(FormNotFoundException())
 
-        form = pick_form(
-            td, td.get_property_forms(name),
-            WebsocketSchemes.list())
+        form = memoized_pick(
+            td, Protocols.WEBSOCKETS, InteractionTypes.PROPERTY, name, self._pick_ws_form)
 
         if not form:
             # noinspection PyUnresolvedReferences
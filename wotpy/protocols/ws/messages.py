@@ -5,10 +5,10 @@
 Classes that represent JSON-RPC messages exchanged over WebSockets.
 """
 
-import json
 
 from jsonschema import validate, ValidationError
 
+from wotpy.codecs.json_codec import JSON_CODEC
 from wotpy.protocols.ws.enums import WebsocketErrors
 from wotpy.protocols.ws.schemas import \
     SCHEMA_REQUEST, \
@@ -56,7 +56,7 @@ class WebsocketMessageRequest:
         Raises WebsocketMessageException if the message is invalid."""
 
         try:
-            msg = json.loads(raw_msg)
+            msg = JSON_CODEC.to_value(raw_msg)
             validate(msg, SCHEMA_REQUEST)
 
             return WebsocketMessageRequest(
@@ -95,9 +95,9 @@ class WebsocketMessageRequest:
         return msg
 
     def to_json(self):
-        """Returns this message as a JSON string."""
+        """Returns this message as an UTF8 bytes JSON string."""
 
-        return json.dumps(self.to_dict())
+        return JSON_CODEC.to_bytes(self.to_dict())
 
 
 class WebsocketMessageResponse:
@@ -109,7 +109,7 @@ class WebsocketMessageResponse:
         Raises WebsocketMessageException if the message is invalid."""
 
         try:
-            msg = json.loads(raw_msg)
+            msg = JSON_CODEC.to_value(raw_msg)
             validate(msg, SCHEMA_RESPONSE)
 
             return WebsocketMessageResponse(
@@ -145,9 +145,9 @@ class WebsocketMessageResponse:
         return msg
 
     def to_json(self):
-        """Returns this message as a JSON string."""
+        """Returns this message as an UTF8 bytes JSON string."""
 
-        return json.dumps(self.to_dict())
+        return JSON_CODEC.to_bytes(self.to_dict())
 
 
 class WebsocketMessageError:
@@ -159,7 +159,7 @@ class WebsocketMessageError:
         Raises WebsocketMessageException if the message is invalid."""
 
         try:
-            msg = json.loads(raw_msg)
+            msg = JSON_CODEC.to_value(raw_msg)
             validate(msg, SCHEMA_ERROR)
 
             return WebsocketMessageError(
@@ -203,9 +203,9 @@ class WebsocketMessageError:
         return msg
 
     def to_json(self):
-        """Returns this message as a JSON string."""
+        """Returns this message as an UTF8 bytes JSON string."""
 
-        return json.dumps(self.to_dict())
+        return JSON_CODEC.to_bytes(self.to_dict())
 
 
 class WebsocketMessageEmittedItem:
@@ -217,7 +217,7 @@ class WebsocketMessageEmittedItem:
         Raises WebsocketMessageException if the message is invalid."""
 
         try:
-            msg = json.loads(raw_msg)
+            msg = JSON_CODEC.to_value(raw_msg)
             validate(msg, SCHEMA_EMITTED_ITEM)
 
             return WebsocketMessageEmittedItem(
@@ -249,6 +249,6 @@ class WebsocketMessageEmittedItem:
         return msg
 
     def to_json(self):
-        """Returns this message as a JSON string."""
+        """Returns this message as an UTF8 bytes JSON string."""
 
-        return json.dumps(self.to_dict())
+        return JSON_CODEC.to_bytes(self.to_dict())
@@ -7,6 +7,7 @@ Class that implements the WebSockets server.
 
 from tornado import web
 from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
 
 from wotpy.codecs.enums import MediaTypes
 from wotpy.protocols.enums import Protocols
@@ -22,9 +23,10 @@ class WebsocketServer(BaseProtocolServer):
 
     DEFAULT_PORT = 8081
 
-    def __init__(self, port=DEFAULT_PORT, ssl_context=None):
+    def __init__(self, port=DEFAULT_PORT, ssl_context=None, reuse_port=False):
         super().__init__(port=port)
         self._server = None
+        self._reuse_port = reuse_port
         self._app = self._build_app()
         self._ssl_context = ssl_context
         self._servient = None
@@ -98,7 +100,11 @@ class WebsocketServer(BaseProtocolServer):
         self._servient = servient
 
         self._server = HTTPServer(self.app, ssl_options=self._ssl_context)
-        self._server.listen(self.port)
+
+        if self._reuse_port:
+            self._server.add_sockets(bind_sockets(self.port, reuse_port=True))
+        else:
+            self._server.listen(self.port)
 
     async def stop(self):
         """Stops the WebSockets server."""
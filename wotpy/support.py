@@ -5,6 +5,7 @@
 Functions to check if some functionalities are enabled in the current platform.
 """
 
+import importlib.util
 import platform
 import sys
 
@@ -62,3 +63,9 @@ def is_mqtt_supported():
 
     return is_supported(FEATURE_MQTT)
 
+
+def is_pycurl_available():
+    """Returns True if the pycurl package used by the curl HTTP client backend is installed."""
+
+    return importlib.util.find_spec("pycurl") is not None
+
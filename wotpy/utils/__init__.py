@@ -7,6 +7,7 @@ Utility functions and classes.
 .. autosummary::
     :toctree: _utils
 
+    wotpy.utils.cache
     wotpy.utils.enums
     wotpy.utils.proxy
     wotpy.utils.utils
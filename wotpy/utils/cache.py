@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bounded in-memory caches.
+"""
+
+import collections
+import time
+
+
+class TTLCache:
+    """Least recently used cache in which each entry expires after a fixed time to live.
+    Expired entries are discarded lazily when they are accessed or evicted."""
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("Invalid cache size: {}".format(maxsize))
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, None) is not None
+
+    @property
+    def maxsize(self):
+        """Maximum number of entries."""
+
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        """Default time to live (seconds) of the entries."""
+
+        return self._ttl
+
+    def get(self, key, default=None):
+        """Returns the value for the given key or the default if it is missing or expired."""
+
+        entry = self._entries.get(key, None)
+
+        if entry is None:
+            return default
+
+        expires, value = entry
+
+        if expires <= self._timer():
+            self._entries.pop(key, None)
+            return default
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Stores the value for the given key, evicting the least recently used entry when full.
+        The ttl argument overrides the default time to live of the cache for this entry."""
+
+        ttl = self._ttl if ttl is None else ttl
+
+        self._entries[key] = (self._timer() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes the entry for the given key and returns its value."""
+
+        entry = self._entries.pop(key, None)
+
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Removes all the entries."""
+
+        self._entries.clear()
@@ -5,11 +5,14 @@
 Some utility functions for the WoT data type wrappers.
 """
 
-import json
 import socket
 import collections.abc
 from functools import wraps
 
+from wotpy.codecs.json_codec import JSON_CODEC
+
+JSON_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
 
 def merge_args_kwargs_dict(args, kwargs):
     """Takes a tuple of args and dict of kwargs.
@@ -51,11 +54,14 @@ def to_json_obj(obj):
     """Recursive function that attempts to convert
     any given object to a JSON-serializable object."""
 
+    if isinstance(obj, JSON_PRIMITIVE_TYPES):
+        return obj
+
     if isinstance(obj, set):
         return list(obj)
 
     try:
-        json.dumps(obj)
+        JSON_CODEC.to_bytes(obj)
         return obj
     except TypeError:
         pass
@@ -5,9 +5,12 @@
 Class that represents a Thing consumed by a servient.
 """
 
+import asyncio
+
 from reactivex.scheduler.eventloop import IOLoopScheduler
 from tornado import ioloop
 
+from wotpy.protocols.enums import Protocols, InteractionVerbs
 from wotpy.wot.consumed.interaction_map import \
     ConsumedThingPropertyDict, \
     ConsumedThingActionDict, \
@@ -21,6 +24,8 @@ class ConsumedThing:
     def __init__(self, servient, td):
         self._servient = servient
         self._td = td
+        self._routes = {}
+        self._routes_version = None
 
     def __str__(self):
         return "<{}> {}".format(self.__class__.__name__, self.td.id)
@@ -44,13 +49,40 @@ class ConsumedThing:
 
         return self._td
 
+    @td.setter
+    def td(self, value):
+        """Replaces the TD of this Consumed Thing and invalidates the cached routes."""
+
+        self._td = value
+        self.invalidate_routes()
+
+    def invalidate_routes(self):
+        """Discards the Protocol Binding clients selected for each Interaction."""
+
+        self._routes = {}
+
+    def _select_client(self, name):
+        """Returns the Protocol Binding client for the Interaction with the given name.
+        The selection is cached until the TD or the servient clients change."""
+
+        clients_version = self.servient.clients_version
+
+        if clients_version != self._routes_version:
+            self._routes = {}
+            self._routes_version = clients_version
+
+        if name not in self._routes:
+            self._routes[name] = self.servient.select_client(self.td, name)
+
+        return self._routes[name]
+
     async def invoke_action(self, name, input_value=None, timeout=None, client_kwargs=None):
         """Takes the Action name from the name argument and the list of parameters,
         then requests from the underlying platform and the Protocol Bindings to invoke
         the Action on the remote Thing and return the result.
         Returns a Future that resolves with the return value or rejects with an Error."""
 
-        client = self.servient.select_client(self.td, name)
+        client = self._select_client(name)
         client_kwargs = client_kwargs if client_kwargs else {}
 
         result = await client.invoke_action(
@@ -66,7 +98,7 @@ class ConsumedThing:
         to update the Property on the remote Thing and return the result.
         Returns a Future that resolves on success or rejects with an Error."""
 
-        client = self.servient.select_client(self.td, name)
+        client = self._select_client(name)
         client_kwargs = client_kwargs if client_kwargs else {}
 
         await client.write_property(
@@ -80,7 +112,7 @@ class ConsumedThing:
         on the remote Thing and return the result.
         Returns a Future that resolves with the Property value or rejects with an Error."""
 
-        client = self.servient.select_client(self.td, name)
+        client = self._select_client(name)
         client_kwargs = client_kwargs if client_kwargs else {}
 
         value = await client.read_property(
@@ -90,11 +122,69 @@ class ConsumedThing:
 
         return value
 
+    async def _run_operation(self, operation, timeout=None, client_kwargs=None):
+        """Runs a single batch operation with the regular Interaction methods
+        and returns its result document (value, result or error)."""
+
+        verb = operation.get("op")
+        name = operation.get("name")
+
+        try:
+            if verb == InteractionVerbs.READ_PROPERTY:
+                value = await self.read_property(name, timeout=timeout, client_kwargs=client_kwargs)
+                return {"value": value}
+
+            if verb == InteractionVerbs.WRITE_PROPERTY:
+                await self.write_property(
+                    name, operation.get("value"),
+                    timeout=timeout, client_kwargs=client_kwargs)
+                return {}
+
+            if verb == InteractionVerbs.INVOKE_ACTION:
+                result = await self.invoke_action(
+                    name, operation.get("input"),
+                    timeout=timeout, client_kwargs=client_kwargs)
+                return {"result": result}
+        except Exception as ex:
+            return {"error": str(ex)}
+
+        return {"error": "Unsupported operation: {}".format(verb)}
+
+    async def batch(self, operations, timeout=None, client_kwargs=None):
+        """Runs a list of operations on the remote Thing. Each operation is a dict
+        with the op (readproperty, writeproperty or invokeaction), the Interaction name
+        and the value or input when required. The operations are sent in a single
+        request when the TD advertises an HTTP batch Form, otherwise they are run
+        concurrently as individual Interactions. There are no ordering guarantees.
+        Returns a Future that resolves with the list of result documents in the same order.
+        Errors are never raised: a failed batch request yields an error document for every operation."""
+
+        operations = list(operations)
+        http_client = self.servient.clients.get(Protocols.HTTP)
+
+        if http_client is not None and http_client.pick_http_batch_href(self.td) is not None:
+            client_kwargs = client_kwargs if client_kwargs else {}
+
+            try:
+                return await http_client.batch(
+                    self.td, operations,
+                    timeout=timeout,
+                    **client_kwargs.get(Protocols.HTTP, {}))
+            except Exception as ex:
+                return [{"error": str(ex)} for _ in operations]
+
+        results = await asyncio.gather(*[
+            self._run_operation(operation, timeout=timeout, client_kwargs=client_kwargs)
+            for operation in operations
+        ])
+
+        return list(results)
+
     def on_event(self, name, client_kwargs=None):
         """Returns an Observable for the Event specified in the name argument,
         allowing subscribing to and unsubscribing from notifications."""
 
-        client = self.servient.select_client(self.td, name)
+        client = self._select_client(name)
         client_kwargs = client_kwargs if client_kwargs else {}
 
         return client.on_event(
@@ -105,7 +195,7 @@ class ConsumedThing:
         """Returns an Observable for the Property specified in the name argument,
         allowing subscribing to and unsubscribing from notifications."""
 
-        client = self.servient.select_client(self.td, name)
+        client = self._select_client(name)
         client_kwargs = client_kwargs if client_kwargs else {}
 
         return client.on_property_change(
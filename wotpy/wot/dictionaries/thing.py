@@ -7,7 +7,7 @@ Wrapper class for dictionaries to represent Things.
 
 from wotpy.wot.dictionaries.base import WotBaseDict
 from wotpy.wot.dictionaries.interaction import PropertyFragmentDict, ActionFragmentDict, EventFragmentDict
-from wotpy.wot.dictionaries.link import LinkDict
+from wotpy.wot.dictionaries.link import LinkDict, FormDict
 from wotpy.wot.dictionaries.security import SecuritySchemeDict
 from wotpy.utils.utils import to_camel
 from wotpy.wot.dictionaries.version import VersioningDict
@@ -182,6 +182,13 @@ class ThingFragment(WotBaseDict):
 
         return [LinkDict(item) for item in self._init.get("links", [])]
 
+    @property
+    def forms(self):
+        """Set of Thing-level form hypermedia controls that describe
+        how operations on all (or multiple) Interactions can be performed."""
+
+        return [FormDict(item) for item in self._init.get("forms", [])]
+
     @property
     def version(self):
         """Provides version information."""
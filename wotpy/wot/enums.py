@@ -76,3 +76,13 @@ class InteractionTypes(EnumListMixin):
     PROPERTY = "Property"
     ACTION = "Action"
     EVENT = "Event"
+
+
+class SharedStateKinds(EnumListMixin):
+    """Enumeration of the kinds of ExposedThing changes
+    that are shared between servient worker processes."""
+
+    PROPERTY = "property"
+    EVENT = "event"
+    INVOCATION = "invocation"
+    INVOCATION_CANCEL = "invocationCancel"
@@ -5,6 +5,7 @@
 Classes that represent Things exposed by a servient.
 """
 import asyncio
+import uuid
 
 import reactivex
 from reactivex.scheduler.eventloop import IOLoopScheduler
@@ -70,6 +71,9 @@ class ExposedThing:
             self.HandlerKeys.INVOKE_ACTION: {}
         }
 
+        self._property_versions = {}
+        self._versions_epoch = uuid.uuid4().hex[:8]
+
         self._events_stream = Subject()
 
     def __str__(self):
@@ -102,6 +106,12 @@ class ExposedThing:
 
         prop_values = self.InteractionStateKeys.PROPERTY_VALUES
         self._interaction_states[prop_values][prop] = value
+        self._bump_property_version(prop.name)
+
+    def _bump_property_version(self, name):
+        """Increments the version counter of a Property."""
+
+        self._property_versions[name] = self._property_versions.get(name, 0) + 1
 
     def _get_property_value(self, prop):
         """Returns a Property value."""
@@ -230,6 +240,37 @@ class ExposedThing:
 
         self._events_stream.on_next(emitted_event)
 
+        if self._servient.shared_state_channel:
+            self._servient.shared_state_channel.publish_property_change(self.title, name, value)
+
+    def apply_property_change(self, name, value):
+        """Applies a Property update that originated in another servient worker
+        process: updates the local value and notifies the local subscribers."""
+
+        prop = self._find_interaction(name=name)
+        self._set_property_value(prop, value)
+        event_init = PropertyChangeEventInit(name=prop.name, value=value)
+        self._events_stream.on_next(PropertyChangeEmittedEvent(init=event_init))
+
+    def apply_event(self, name, payload):
+        """Applies an Event emission that originated in another
+        servient worker process by notifying the local subscribers."""
+
+        event = self._find_interaction(name=name)
+        self._events_stream.on_next(EmittedEvent(name=event.name, init=payload))
+
+    def property_version(self, name):
+        """Returns an opaque token that changes every time the value of the Property is updated.
+        Returns None if the Property has a read handler, given that the value
+        could then change without being written through this ExposedThing."""
+
+        proprty = self.thing.properties[name]
+
+        if self._handlers.get(self.HandlerKeys.RETRIEVE_PROPERTY, {}).get(proprty, None):
+            return None
+
+        return "{}.{}".format(self._versions_epoch, self._property_versions.get(proprty.name, 0))
+
     async def read_property(self, name):
         """Takes the Property name as the name argument, then requests from
         the underlying platform and the Protocol Bindings to retrieve the
@@ -276,6 +317,7 @@ class ExposedThing:
         else:
             await self._default_update_property_handler(name, value)
 
+        self._bump_property_version(proprty.name)
         self._write_property_to_db(name, value)
         self._emit_property_change_event(name, value)
 
@@ -373,6 +415,9 @@ class ExposedThing:
 
         self._events_stream.on_next(event)
 
+        if self._servient.shared_state_channel:
+            self._servient.shared_state_channel.publish_event(self.title, event_name, payload)
+
     def add_property(self, name, property_init, value=None):
         """Adds a Property defined by the argument and updates the Thing Description.
         Takes an instance of ThingPropertyInit as argument."""
@@ -12,6 +12,7 @@ class ExposedThingSet:
 
     def __init__(self):
         self._exposed_things = {}
+        self._url_names = {}
 
     @property
     def exposed_things(self):
@@ -23,6 +24,9 @@ class ExposedThingSet:
     def contains(self, exposed_thing):
         """Returns True if this group contains the given ExposedThing."""
 
+        if self._exposed_things.get(exposed_thing.thing.title) is exposed_thing:
+            return True
+
         return exposed_thing in self._exposed_things.values()
 
     def add(self, exposed_thing):
@@ -32,6 +36,7 @@ class ExposedThingSet:
             raise ValueError("Duplicate Exposed Thing: {}".format(exposed_thing.title))
 
         self._exposed_things[exposed_thing.thing.title] = exposed_thing
+        self._url_names[exposed_thing.thing.url_name] = exposed_thing.thing.title
 
     def remove(self, thing_name):
         """Removes an existing ExposedThing by Name."""
@@ -44,12 +49,21 @@ class ExposedThingSet:
         assert exposed_thing.thing.title in self._exposed_things
         self._exposed_things.pop(exposed_thing.thing.title)
 
+        if self._url_names.get(exposed_thing.thing.url_name) == exposed_thing.thing.title:
+            self._url_names.pop(exposed_thing.thing.url_name)
+
     def find_by_thing_name(self, thing_name):
         """Finds an existing ExposedThing by Thing Name."""
 
         def is_match(exp_thing):
             return exp_thing.thing.title == thing_name or exp_thing.thing.url_name == thing_name
 
+        title = thing_name if thing_name in self._exposed_things else self._url_names.get(thing_name)
+        exposed_thing = self._exposed_things.get(title) if title is not None else None
+
+        if exposed_thing is not None and is_match(exposed_thing):
+            return exposed_thing
+
         return next((item for item in self._exposed_things.values() if is_match(item)), None)
 
     def find_by_interaction(self, interaction):
@@ -58,4 +72,9 @@ class ExposedThingSet:
         def is_match(exp_thing):
             return exp_thing.thing is interaction.thing
 
+        exposed_thing = self._exposed_things.get(interaction.thing.title)
+
+        if exposed_thing is not None and is_match(exposed_thing):
+            return exposed_thing
+
         return next((item for item in self._exposed_things.values() if is_match(item)), None)
@@ -30,7 +30,7 @@ class Form:
 
     @property
     def interaction(self):
-        """Interaction that contains this Form."""
+        """Interaction (or Thing, for Thing-level Forms) that contains this Form."""
 
         return self._interaction
 
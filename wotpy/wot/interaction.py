@@ -83,6 +83,8 @@ class InteractionPattern(metaclass=ABCMeta):
     def forms(self):
         """Sequence of forms linked to this interaction."""
 
+        self._thing.load_forms()
+
         return self._td_forms + self._autogenerated_forms
 
     def clean_forms(self):
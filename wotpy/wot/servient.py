@@ -12,13 +12,11 @@ import re
 import socket
 
 import tornado.web
-from influxdb_client import InfluxDBClient
 from wotpy.protocols.enums import Protocols
 from wotpy.protocols.http.client import HTTPClient
 from wotpy.protocols.ws.client import WebsocketClient
 from wotpy.support import (is_coap_supported, is_mqtt_supported)
 from wotpy.utils.utils import get_main_ipv4_address
-from wotpy.database.influxdb_database import InfluxDB
 from wotpy.database.sqlite_database import SQLiteDatabase
 from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.exposed.thing_set import ExposedThingSet
@@ -116,10 +114,31 @@ class Servient:
     send requests and interact with IoT devices exposed by other WoT servients
     or servers using the capabilities of a Web client such as Web browser."""
 
+    PROTOCOL_PREFERENCE_MAP = {
+        InteractionTypes.PROPERTY: [
+            Protocols.MQTT,
+            Protocols.HTTP,
+            Protocols.COAP,
+            Protocols.WEBSOCKETS,
+        ],
+        InteractionTypes.ACTION: [
+            Protocols.HTTP,
+            Protocols.WEBSOCKETS,
+            Protocols.MQTT,
+            Protocols.COAP
+        ],
+        InteractionTypes.EVENT: [
+            Protocols.WEBSOCKETS,
+            Protocols.MQTT,
+            Protocols.COAP,
+            Protocols.HTTP
+        ]
+    }
+
     def __init__(self, hostname=None, catalogue_port=9090,
                  clients=None, clients_config=None, create_default_forms=True,
                  influxdb_enabled=False, influxdb_token=None, influxdb_url=None,
-                 sqlite_db_path=None, init_logging=True):
+                 sqlite_db_path=None, init_logging=True, shared_state_channel=None):
         self._hostname = hostname if hostname is not None else _get_hostname_fallback()
 
         if not isinstance(self._hostname, str):
@@ -130,6 +149,8 @@ class Servient:
 
         self._servers = {}
         self._clients = clients if clients else {}
+        self._default_clients_pending = not len(self._clients)
+        self._clients_version = 0
         self._clients_config = clients_config
         self._catalogue_port = catalogue_port
         self._catalogue_server = None
@@ -139,10 +160,13 @@ class Servient:
         self._create_default_forms = create_default_forms
         self._enabled_exposed_thing_names = set()
         self._credential_store = {}
+        self._credentials_version = 0
+        self._shared_state_channel = shared_state_channel
         self._influxdb_enabled = influxdb_enabled
         self._sqlite_db = SQLiteDatabase(sqlite_db_path)
         self._influxdb = None
         if influxdb_enabled:
+            from wotpy.database.influxdb_database import InfluxDB
             self._influxdb = InfluxDB(url=influxdb_url, org="wot", token=influxdb_token)
             if not self._influxdb.is_reachable:
                 raise ConnectionError(f"Connection to the InfluxDB database failed")
@@ -151,63 +175,30 @@ class Servient:
             LOGGER = logging.getLogger()
             LOGGER.setLevel(logging.INFO)
 
-        if not len(self._clients):
-            self._build_default_clients()
-
     @staticmethod
     def _default_select_client(clients, td, name):
         """Default implementation of the function to select
         a Protocol Binding client for an Interaction."""
 
-        protocol_preference_map = {
-            InteractionTypes.PROPERTY: [
-                Protocols.MQTT,
-                Protocols.HTTP,
-                Protocols.COAP,
-                Protocols.WEBSOCKETS,
-            ],
-            InteractionTypes.ACTION: [
-                Protocols.HTTP,
-                Protocols.WEBSOCKETS,
-                Protocols.MQTT,
-                Protocols.COAP
-            ],
-            InteractionTypes.EVENT: [
-                Protocols.WEBSOCKETS,
-                Protocols.MQTT,
-                Protocols.COAP,
-                Protocols.HTTP
-            ]
-        }
-
-        supported_protocols = [
-            client.protocol for client in clients
-            if client.is_supported_interaction(td, name)
-        ]
-
-        intrct_names = {
-            InteractionTypes.PROPERTY: td.properties.keys(),
-            InteractionTypes.ACTION: td.actions.keys(),
-            InteractionTypes.EVENT: td.events.keys()
-        }
-
-        try:
-            intrct_type = next(key for key, names in
-                intrct_names.items() if name in names)
-        except StopIteration:
+        if name in td.properties:
+            intrct_type = InteractionTypes.PROPERTY
+        elif name in td.actions:
+            intrct_type = InteractionTypes.ACTION
+        elif name in td.events:
+            intrct_type = InteractionTypes.EVENT
+        else:
             raise ValueError("Unknown interaction: {}".format(name))
 
-        protocol_prefs = protocol_preference_map[intrct_type]
-        protocol_choices = set(protocol_prefs).intersection(
-            set(supported_protocols))
+        clients = list(clients)
+        clients_by_protocol = {client.protocol: client for client in clients}
 
-        if not len(protocol_choices):
-            return list(clients)[0]
+        for protocol in Servient.PROTOCOL_PREFERENCE_MAP[intrct_type]:
+            client = clients_by_protocol.get(protocol)
 
-        protocol = next(
-            proto for proto in protocol_prefs if proto in protocol_choices)
+            if client is not None and client.is_supported_interaction(td, name):
+                return client
 
-        return next(client for client in clients if client.protocol == protocol)
+        return clients[0]
 
     @property
     def influxdb(self):
@@ -221,6 +212,13 @@ class Servient:
 
         return self._sqlite_db
 
+    @property
+    def shared_state_channel(self):
+        """Returns the channel used to share ExposedThing state with other
+        servient worker processes (None when running as a single process)."""
+
+        return self._shared_state_channel
+
     @property
     def is_running(self):
         """Returns True if the Servient is currently running
@@ -263,7 +261,12 @@ class Servient:
 
     @property
     def clients(self):
-        """Returns the dict of Protocol Binding clients attached to this servient."""
+        """Returns the dict of Protocol Binding clients attached to this servient.
+        The default clients are built on first access if none were given."""
+
+        if self._default_clients_pending:
+            self._default_clients_pending = False
+            self._build_default_clients()
 
         return self._clients
 
@@ -334,6 +337,7 @@ class Servient:
         contained in this Servient."""
 
         for exposed_thing in self._exposed_thing_set.exposed_things:
+            exposed_thing.thing.clean_forms()
             for interaction in exposed_thing.thing.interactions:
                 interaction.clean_forms()
 
@@ -353,6 +357,10 @@ class Servient:
             for form in forms_to_remove:
                 interaction.remove_form(form)
 
+        for form in exposed_thing.thing.autogenerated_forms:
+            if form.protocol == protocol:
+                exposed_thing.thing.remove_form(form)
+
     def _server_has_exposed_thing(self, server, exposed_thing):
         """Returns True if the given server contains the ExposedThing."""
 
@@ -374,15 +382,29 @@ class Servient:
             for form in forms:
                 interaction.add_form(form)
 
-    def _regenerate_server_forms(self, server):
-        """Cleans and regenerates Forms for the given server in all ExposedThings."""
+        for form in server.build_thing_forms(hostname=self._hostname, thing=exposed_thing.thing):
+            exposed_thing.thing.add_form(form)
 
-        assert server in self._servers.values()
+    def _build_exposed_thing_forms(self, exposed_thing):
+        """Cleans and regenerates the Forms of all servers for the given ExposedThing."""
+
+        if not self._exposed_thing_set.contains(exposed_thing):
+            exposed_thing.thing.clean_forms()
+            for interaction in exposed_thing.thing.interactions:
+                interaction.clean_forms()
+            return
+
+        for server in self._servers.values():
+            self._clean_protocol_forms(exposed_thing, server.protocol)
+            if self._server_has_exposed_thing(server, exposed_thing):
+                self._add_interaction_forms(server, exposed_thing)
 
-        for exp_thing in self._exposed_thing_set.exposed_things:
-            self._clean_protocol_forms(exp_thing, server.protocol)
-            if self._server_has_exposed_thing(server, exp_thing):
-                self._add_interaction_forms(server, exp_thing)
+    def _invalidate_forms(self, exposed_thing):
+        """Schedules the regeneration of the Forms for the given ExposedThing.
+        Forms are lazily built the next time they are accessed (e.g. when the TD is requested)."""
+
+        exposed_thing.thing.set_forms_loader(
+            functools.partial(self._build_exposed_thing_forms, exposed_thing))
 
     def get_thing_base_url(self, exposed_thing):
         """Return the base URL for the given ExposedThing
@@ -412,11 +434,27 @@ class Servient:
             else:
                 self._credential_store[thing_name] = creds
 
+        self._credentials_version += 1
+
     def retrieve_credentials(self, exposed_thing_title):
         """Retrieves all the credentials associated with the given thing."""
 
         return self._credential_store.get(exposed_thing_title, None)
 
+    @property
+    def credentials_version(self):
+        """Returns a counter that is increased each time credentials are added.
+        Used to invalidate cached authentication results."""
+
+        return self._credentials_version
+
+    @property
+    def clients_version(self):
+        """Returns a counter that is increased each time a Protocol Binding client
+        is added or removed. Used to invalidate cached client selections."""
+
+        return self._clients_version
+
     def select_client(self, td, name):
         """Returns the Protocol Binding client instance to
         communicate with the given Interaction."""
@@ -427,13 +465,15 @@ class Servient:
     def add_client(self, client):
         """Adds a new Protocol Binding client to this servient."""
 
-        self._clients[client.protocol] = client
+        self.clients[client.protocol] = client
+        self._clients_version += 1
 
     @_stopped_servient_only
     def remove_client(self, protocol):
         """Removes the Protocol Binding client with the given protocol from this servient."""
 
-        self._clients.pop(protocol, None)
+        self.clients.pop(protocol, None)
+        self._clients_version += 1
 
     @_stopped_servient_only
     def add_server(self, server):
@@ -453,8 +493,8 @@ class Servient:
 
         self._clean_forms()
 
-        for server in self._servers.values():
-            self._regenerate_server_forms(server)
+        for exposed_thing in self._exposed_thing_set.exposed_things:
+            self._invalidate_forms(exposed_thing)
 
     def enable_exposed_thing(self, thing_name):
         """Enables the ExposedThing with the given Name.
@@ -464,7 +504,8 @@ class Servient:
 
         for server in self._servers.values():
             server.add_exposed_thing(exposed_thing)
-            self._regenerate_server_forms(server)
+
+        self._invalidate_forms(exposed_thing)
 
         self._enabled_exposed_thing_names.add(exposed_thing.title)
 
@@ -480,7 +521,8 @@ class Servient:
 
         for server in self._servers.values():
             server.remove_exposed_thing(exposed_thing.title)
-            self._regenerate_server_forms(server)
+
+        self._invalidate_forms(exposed_thing)
 
         self._enabled_exposed_thing_names.remove(exposed_thing.title)
 
@@ -521,6 +563,8 @@ class Servient:
         async with self._servient_lock:
             if self._influxdb_enabled:
                 self.influxdb.init_apis()
+            if self._shared_state_channel:
+                await self._shared_state_channel.connect(self)
             if self._create_default_forms:
                 self.refresh_forms()
             for server in self._servers.values():
@@ -531,12 +575,19 @@ class Servient:
             return WoT(servient=self)
 
     async def shutdown(self):
-        """Stops the server configured under this servient."""
+        """Stops the servers configured under this servient and closes the Protocol Binding clients."""
 
         async with self._servient_lock:
             if self._influxdb_enabled:
                 self.influxdb.close_apis()
             for server in self._servers.values():
                 await server.stop()
+            if self._shared_state_channel:
+                await self._shared_state_channel.close()
+            for client in self._clients.values():
+                try:
+                    await client.close()
+                except Exception as ex:
+                    logging.getLogger(__name__).warning("Error closing client: {}".format(ex))
             self._stop_catalogue()
             self._is_running = False
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Classes that keep the state of ExposedThings consistent between
+multiple servient worker processes through a local Unix socket broker.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+
+from wotpy.utils.utils import to_json_obj
+from wotpy.wot.enums import SharedStateKinds
+
+STREAM_LIMIT = 2 ** 24
+MAX_WRITE_BUFFER_SIZE = 4 * STREAM_LIMIT
+
+
+def write_line(writer, line):
+    """Writes a line on the stream unless the peer is not reading and the write
+    buffer is over MAX_WRITE_BUFFER_SIZE. Returns False if the line was dropped."""
+
+    if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_SIZE:
+        return False
+
+    writer.write(line)
+
+    return True
+
+
+class SharedStateBroker:
+    """Broker that listens on a Unix socket and forwards each message
+    published by a worker to all the other connected workers.
+    Messages for a worker that does not keep up are dropped."""
+
+    def __init__(self, path):
+        self._path = path
+        self._server = None
+        self._server_id = None
+        self._writers = set()
+        self._logr = logging.getLogger(__name__)
+
+    @property
+    def path(self):
+        """Path of the Unix socket of this broker."""
+
+        return self._path
+
+    @property
+    def num_workers(self):
+        """Number of workers connected to this broker."""
+
+        return len(self._writers)
+
+    async def _handle_worker(self, reader, writer, server_id=None):
+        """Forwards the lines received from a worker to all the other workers.
+        Connections accepted by a server that has been stopped in the meantime are closed."""
+
+        if server_id is not self._server_id:
+            writer.close()
+            return
+
+        self._writers.add(writer)
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                for other in list(self._writers):
+                    if other is writer or other.is_closing():
+                        continue
+
+                    if not write_line(other, line):
+                        self._logr.warning("Dropped shared state message for a slow worker")
+        except Exception as ex:
+            self._logr.warning("Shared state worker error: {}".format(ex))
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self):
+        """Starts listening for worker connections."""
+
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+        self._server_id = object()
+
+        self._server = await asyncio.start_unix_server(
+            functools.partial(self._handle_worker, server_id=self._server_id),
+            path=self._path, limit=STREAM_LIMIT)
+
+    async def stop(self):
+        """Stops the broker, disconnects all workers and removes the socket."""
+
+        if not self._server:
+            return
+
+        self._server.close()
+        self._server_id = None
+
+        for writer in list(self._writers):
+            writer.close()
+
+        await self._server.wait_closed()
+        self._server = None
+
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+class SharedStateChannel:
+    """Connection of a servient worker to the SharedStateBroker.
+    Publishes local Property changes and Event emissions and applies
+    the ones that originate in other workers to the local ExposedThings.
+    Other kinds of messages are passed to the handlers registered with set_handler.
+    Reconnects when the broker closes the connection; the messages
+    published while disconnected are not delivered."""
+
+    DEFAULT_CONNECT_RETRIES = 50
+    DEFAULT_CONNECT_RETRY_SECS = 0.1
+
+    def __init__(self, path, connect_retries=DEFAULT_CONNECT_RETRIES,
+                 connect_retry_secs=DEFAULT_CONNECT_RETRY_SECS):
+        self._path = path
+        self._connect_retries = connect_retries
+        self._connect_retry_secs = connect_retry_secs
+        self._servient = None
+        self._writer = None
+        self._task_read = None
+        self._handlers = {}
+        self._logr = logging.getLogger(__name__)
+
+    async def _open_connection(self):
+        """Connects to the broker, retrying while the socket is not available yet."""
+
+        for retry in range(self._connect_retries):
+            try:
+                return await asyncio.open_unix_connection(path=self._path, limit=STREAM_LIMIT)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if retry == self._connect_retries - 1:
+                    raise
+
+                await asyncio.sleep(self._connect_retry_secs)
+
+    def set_handler(self, kind, handler):
+        """Sets the function that receives the messages of the given kind from the other workers.
+        The handler is called with the Thing name, the message name and the message data."""
+
+        self._handlers[kind] = handler
+
+    def remove_handler(self, kind):
+        """Removes the handler of the given kind of messages."""
+
+        self._handlers.pop(kind, None)
+
+    def _apply(self, msg):
+        """Applies a message received from another worker to the local ExposedThing."""
+
+        handler = self._handlers.get(msg.get("kind"))
+
+        if handler is not None:
+            handler(msg.get("thing"), msg.get("name"), msg.get("data"))
+            return
+
+        exposed_thing = self._servient.exposed_thing_set.find_by_thing_name(msg.get("thing"))
+
+        if exposed_thing is None:
+            return
+
+        if msg.get("kind") == SharedStateKinds.PROPERTY:
+            exposed_thing.apply_property_change(msg.get("name"), msg.get("data"))
+        elif msg.get("kind") == SharedStateKinds.EVENT:
+            exposed_thing.apply_event(msg.get("name"), msg.get("data"))
+
+    async def _reconnect(self):
+        """Opens a new connection to the broker. Returns the new reader or None on failure."""
+
+        self._writer.close()
+
+        try:
+            reader, self._writer = await self._open_connection()
+        except OSError as ex:
+            self._logr.error("Cannot reconnect to the shared state broker: {}".format(ex))
+            return None
+
+        self._logr.info("Reconnected to the shared state broker")
+
+        return reader
+
+    async def _read_loop(self, reader):
+        """Receives the messages forwarded by the broker."""
+
+        while True:
+            try:
+                line = await reader.readline()
+            except (ConnectionError, ValueError) as ex:
+                self._logr.warning("Error reading from the shared state broker: {}".format(ex))
+                line = None
+
+            if not line:
+                self._logr.warning("Shared state broker closed the connection: reconnecting")
+                reader = await self._reconnect()
+
+                if reader is None:
+                    return
+
+                continue
+
+            try:
+                self._apply(json.loads(line))
+            except Exception as ex:
+                self._logr.warning("Error applying shared state: {}".format(ex), exc_info=True)
+
+    async def connect(self, servient):
+        """Connects to the broker and starts applying remote changes to the given servient."""
+
+        self._servient = servient
+        reader, self._writer = await self._open_connection()
+        self._task_read = asyncio.create_task(self._read_loop(reader))
+
+    async def close(self):
+        """Disconnects from the broker."""
+
+        if self._task_read:
+            self._task_read.cancel()
+            self._task_read = None
+
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def publish(self, thing_name, kind, name, data):
+        """Publishes a local change so that it is applied in the other workers."""
+
+        if self._writer is None or self._writer.is_closing():
+            return
+
+        try:
+            line = json.dumps({
+                "thing": thing_name,
+                "kind": kind,
+                "name": name,
+                "data": to_json_obj(data)
+            })
+        except (TypeError, ValueError) as ex:
+            self._logr.warning("Cannot share non-serializable state: {}".format(ex))
+            return
+
+        if not write_line(self._writer, line.encode() + b"\n"):
+            self._logr.warning("Dropped shared state message: the broker is not reading")
+
+    def publish_property_change(self, thing_name, name, value):
+        """Publishes a Property value update."""
+
+        self.publish(thing_name, SharedStateKinds.PROPERTY, name, value)
+
+    def publish_event(self, thing_name, name, payload):
+        """Publishes an Event emission."""
+
+        self.publish(thing_name, SharedStateKinds.EVENT, name, payload)
@@ -10,6 +10,7 @@ import json
 import jsonschema
 
 from wotpy.wot.dictionaries.thing import ThingFragment
+from wotpy.wot.enums import InteractionTypes
 from wotpy.wot.thing import Thing
 from wotpy.wot.validation import SCHEMA_THING, InvalidDescription
 
@@ -24,6 +25,7 @@ class ThingDescription:
 
         self._doc = json.loads(doc) if isinstance(doc, (str, bytes)) else doc
         self._thing_fragment = ThingFragment(self._doc)
+        self._memo = {}
 
         self.validate(doc=self._thing_fragment.to_dict())
 
@@ -69,6 +71,30 @@ class ThingDescription:
 
         return Thing(thing_fragment=self.to_thing_fragment())
 
+    def memoize(self, key, func):
+        """Returns the value derived from this TD for the given key.
+        The value is computed with func on the first call and then cached,
+        given that the contents of a TD instance do not change."""
+
+        if key not in self._memo:
+            self._memo[key] = func()
+
+        return self._memo[key]
+
+    def get_interaction_forms(self, intrct_type, name):
+        """Returns a list of FormDict for the interaction of the given type that matches the given name."""
+
+        if intrct_type == InteractionTypes.PROPERTY:
+            return self.get_property_forms(name)
+
+        if intrct_type == InteractionTypes.ACTION:
+            return self.get_action_forms(name)
+
+        if intrct_type == InteractionTypes.EVENT:
+            return self.get_event_forms(name)
+
+        raise ValueError("Unknown interaction type: {}".format(intrct_type))
+
     def get_forms(self, name):
         """Returns a list of FormDict for the interaction that matches the given name."""
 
@@ -54,6 +54,8 @@ class Thing:
         self._properties = {}
         self._actions = {}
         self._events = {}
+        self._autogenerated_forms = []
+        self._forms_loader = None
         self._init_fragment_data()
 
     def __getattr__(self, name):
@@ -105,6 +107,8 @@ class Thing:
 
             return ret
 
+        self.load_forms()
+
         doc = self._thing_fragment.to_dict()
 
         doc.update({
@@ -128,19 +132,26 @@ class Thing:
             }
         })
 
+        if len(self._autogenerated_forms):
+            doc.update({
+                "forms": doc.get("forms", []) + [
+                    form.form_dict.to_dict() for form in self._autogenerated_forms
+                ]
+            })
+
         return ThingFragment(doc)
 
     @property
     def id(self):
         """Thing ID."""
 
-        return self.thing_fragment.id
+        return self._thing_fragment.id
 
     @property
     def title(self):
         """Thing title."""
 
-        return self.thing_fragment.title
+        return self._thing_fragment.title
 
     @property
     def url_name(self):
@@ -187,6 +198,54 @@ class Thing:
             self._actions.values(),
             self._events.values())
 
+    @property
+    def autogenerated_forms(self):
+        """Sequence of autogenerated Thing-level forms (i.e. not linked to an Interaction)."""
+
+        self.load_forms()
+
+        return list(self._autogenerated_forms)
+
+    def clean_forms(self):
+        """Removes all autogenerated Thing-level Forms."""
+
+        self._autogenerated_forms = []
+
+    def add_form(self, form):
+        """Add a new autogenerated Thing-level Form."""
+
+        assert form.interaction is self
+
+        existing = next((True for item in self._autogenerated_forms if item.id == form.id), False)
+
+        if existing:
+            raise ValueError("Duplicate Form: {}".format(form))
+
+        self._autogenerated_forms.append(form)
+
+    def remove_form(self, form):
+        """Remove an existing autogenerated Thing-level Form."""
+
+        try:
+            pop_idx = self._autogenerated_forms.index(form)
+            self._autogenerated_forms.pop(pop_idx)
+        except ValueError:
+            pass
+
+    def set_forms_loader(self, loader):
+        """Sets a callable that builds the autogenerated Forms of this Thing.
+        The loader is invoked once, the next time the Forms are accessed."""
+
+        self._forms_loader = loader
+
+    def load_forms(self):
+        """Invokes the pending Forms loader (if any) to materialise the autogenerated Forms."""
+
+        loader, self._forms_loader = self._forms_loader, None
+
+        if loader is not None:
+            loader()
+
     def find_interaction(self, name):
         """Finds an existing Interaction by name.
         The name argument may be the original name or the URL-safe version."""
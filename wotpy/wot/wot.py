@@ -9,7 +9,7 @@ import json
 import logging
 
 import reactivex
-from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
 
 from wotpy.protocols.http.credential import OIDC4VPCredential
 from wotpy.wot.consumed.thing import ConsumedThing
@@ -83,9 +83,8 @@ class WoT:
             if requester is None:
                 raise ValueError("Missing Verifiable credentials requester URL/IP")
 
-            token = await OIDC4VPCredential.holder_token_request(
-                holder_url, url, "GET", requester
-            )
+            token_manager = OIDC4VPCredential.token_manager(holder_url, requester)
+            token = await token_manager.get(OIDC4VPCredential.token_key(url, "GET"))
             headers = { "X-Auth-token": token }
             return headers
 
@@ -189,7 +188,15 @@ class WoT:
 
         headers = await self._get_verifiable_creds_token(url, credentials_dict)
 
-        td_str = await self.fetch(url, headers=headers, timeout_secs=timeout_secs)
+        try:
+            td_str = await self.fetch(url, headers=headers, timeout_secs=timeout_secs)
+        except HTTPClientError as ex:
+            if ex.code == 401 and headers is not None:
+                OIDC4VPCredential.token_manager(
+                    credentials_dict["holder_url"],
+                    credentials_dict["requester"]).invalidate(OIDC4VPCredential.token_key(url, "GET"))
+
+            raise
         consumed_thing = self.consume(td_str)
 
         return consumed_thing